@@ -0,0 +1,89 @@
+import datetime
+import mmap
+
+from records import TWEET_DATE_FORMAT
+from shards import _ELEMENT_START, _decode_element, _map_file
+
+# Tweets já migrados seguidos que encerram a leitura de um arquivo do mais novo ao mais antigo
+INCREMENTAL_STOP_AFTER = 200
+
+def iter_archive(path):
+    """Percorre os elementos do tweets.js um a um, na ordem do arquivo
+
+    O arquivo é mapeado (mmap, como em `shards.ShardedArchive`) e os
+    elementos são localizados sob demanda: quem para no meio só lê as
+    páginas do começo do arquivo, sem carregá-lo nem decodificá-lo inteiro.
+    """
+    data = _map_file(path)
+    try:
+        start = None
+        for match in _ELEMENT_START.finditer(data):
+            if start is not None:
+                yield _decode_element(data, start, match.start())
+            start = match.start()
+        if start is not None:
+            yield _decode_element(data, start, len(data))
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+def tweet_sort_key(tweet_data):
+    return datetime.datetime.strptime(tweet_data['tweet']['created_at'], TWEET_DATE_FORMAT)
+
+def update_watermark(watermark, tweet):
+    """Marca d'água da migração: maior ID de tweet migrado e sua data"""
+    tweet_id = tweet.get('id_str')
+    if tweet_id and (not watermark or int(tweet_id) > int(watermark['id'])):
+        return {'id': tweet_id, 'created_at': tweet.get('created_at')}
+    return watermark
+
+def watermark_from_tweets(tweets):
+    watermark = None
+    for tweet in tweets:
+        watermark = update_watermark(watermark, tweet)
+    return watermark
+
+def load_new_tweets(path, watermark, completed=()):
+    """Tweets do arquivo mais novos que a marca d'água, do mais antigo ao mais novo
+
+    O export do Twitter vem do mais novo ao mais antigo, então a leitura para
+    depois de INCREMENTAL_STOP_AFTER tweets seguidos já cobertos pela marca
+    d'água, sem ler nem decodificar o resto do arquivo. Se a ordem não for
+    essa, o arquivo é lido inteiro. Retorna (tweets, estatísticas da leitura).
+    """
+    watermark_id = int(watermark['id']) if watermark else -1
+    completed = set(completed)
+    new_tweets = []
+    parsed = 0
+    old_run = 0
+    previous_id = None
+    descending = True
+    stopped_early = False
+    elements = iter_archive(path)
+    for tweet_data in elements:
+        parsed += 1
+        tweet = tweet_data.get('tweet') or {}
+        tweet_id = int(tweet.get('id_str') or 0)
+        if previous_id is not None and tweet_id > previous_id:
+            descending = False
+        previous_id = tweet_id
+
+        if tweet_id > watermark_id and tweet.get('id_str') not in completed:
+            new_tweets.append(tweet_data)
+            old_run = 0
+        else:
+            old_run += 1
+            if descending and old_run >= INCREMENTAL_STOP_AFTER:
+                stopped_early = True
+                break
+    # Desfaz o mapeamento já, mesmo quando a leitura parou no meio
+    elements.close()
+
+    new_tweets.sort(key=tweet_sort_key)
+    stats = {
+        'parsed': parsed,
+        'new': len(new_tweets),
+        'stopped_early': stopped_early,
+        'watermark': watermark
+    }
+    return new_tweets, stats
@@ -0,0 +1,74 @@
+"""Mede o tempo de abertura do script e da interface gráfica
+
+Cada medição roda em um processo Python novo (sem cache de módulos):
+
+- `import script`: o que o modo terminal paga antes de qualquer pergunta;
+- `import atproto`: o custo que agora só aparece no primeiro login;
+- janela: do início do processo até a janela da interface ser desenhada
+  (precisa de um display; é pulada se não houver).
+
+Uso: python bench_startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+WINDOW_SNIPPET = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+import bluesky_import_gui
+root = tk.Tk()
+app = bluesky_import_gui.ModernUI(root)
+def shown():
+    print(time.perf_counter() - start)
+    root.destroy()
+root.after_idle(shown)
+root.mainloop()
+"""
+
+def run_snippet(code):
+    result = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "falhou")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def measure(name, code, runs):
+    try:
+        timings = [run_snippet(code) for _ in range(runs)]
+    except RuntimeError as e:
+        print(f"{name:<18} pulado ({e})")
+        return None
+    median = statistics.median(timings)
+    print(f"{name:<18} mediana {median * 1000:7.1f} ms  (mín {min(timings) * 1000:.1f} ms, {runs} execuções)")
+    return {'median': median, 'min': min(timings), 'runs': runs}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    results = {
+        'import_script': measure("import script", IMPORT_SNIPPET.format(module="script"), args.runs),
+        'import_atproto': measure("import atproto", IMPORT_SNIPPET.format(module="atproto"), args.runs),
+        'window': measure("janela visível", WINDOW_SNIPPET, args.runs)
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,643 +1,912 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-from threading import Thread
-import time
-import json
-import os
-from datetime import datetime
-import sys
-sys.path.append(os.path.dirname(__file__))
-import script  # Importar o script principal
-
-# Variável de controle para encerrar a importação
-stop_flag = False
-cache = set()  # Sistema de cache para evitar duplicados
-
-class LoadingAnimation:
-    def __init__(self, status_label):
-        self.status_label = status_label
-        self.running = False
-        self.dots = 0
-        
-    def start(self):
-        self.running = True
-        self.animate()
-        
-    def stop(self):
-        self.running = False
-        
-    def animate(self):
-        if not self.running:
-            return
-            
-        self.dots = (self.dots + 1) % 4
-        current_text = self.status_label.cget("text").split('.')[0]
-        self.status_label.config(text=f"{current_text}{'.' * self.dots}")
-        self.status_label.after(500, self.animate)
-
-# Função para carregar tweets
-def load_tweets(file_path):
-    try:
-        with open(file_path, encoding="utf-8") as f:
-            content = f.read().replace("window.YTD.tweets.part0 = ", "")
-            tweets = json.loads(content)
-        return tweets
-    except Exception as e:
-        return []
-
-# Função para salvar progresso
-def save_progress(file_path, completed_tweets):
-    try:
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(completed_tweets, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"Erro ao salvar progresso: {e}")
-
-# Função para simular o processo de importação
-def import_tweets(handle, password, file_path, status_label, progress_bar, completed_file):
-    global stop_flag, cache
-    stop_flag = False
-
-    # Criar e iniciar animação de loading
-    loading = LoadingAnimation(status_label)
-    loading.start()
-
-    if not handle or not password or not file_path:
-        messagebox.showerror("Erro", "Preencha todos os campos corretamente!")
-        return
-
-    if not os.path.exists(file_path):
-        messagebox.showerror("Erro", "O arquivo especificado não foi encontrado!")
-        return
-
-    tweets = load_tweets(file_path)
-    if not tweets:
-        messagebox.showerror("Erro", "Nenhum tweet encontrado no arquivo!")
-        return
-
-    # Carregar progresso salvo, se existir
-    if os.path.exists(completed_file):
-        with open(completed_file, encoding="utf-8") as f:
-            completed_tweets = json.load(f)
-    else:
-        completed_tweets = []
-
-    # Atualizar cache com tweets já completados
-    cache.update([json.dumps(tweet) for tweet in completed_tweets])
-
-    # Filtrar tweets já importados
-    tweets_to_import = [tweet for tweet in tweets if json.dumps(tweet) not in cache]
-
-    if not tweets_to_import:
-        messagebox.showinfo("Info", "Todos os tweets já foram importados anteriormente!")
-        return
-
-    try:
-        progress_bar["maximum"] = len(tweets_to_import)
-        for i, tweet in enumerate(tweets_to_import):
-            if stop_flag:  # Interrompe a importação se o botão "Encerrar" for pressionado
-                loading.stop()
-                save_progress(completed_file, completed_tweets)
-                status_label.config(text="Importação encerrada pelo usuário.")
-                return
-
-            # Simula o tempo de postagem (substitua por chamada à função real de postagem)
-            time.sleep(0.1)
-
-            # Atualizar interface com animação
-            progress = (i + 1) / len(tweets_to_import) * 100
-            progress_bar["value"] = i + 1
-            status_label.config(text=f"Importando... {progress:.1f}%")
-            
-            # Efeito visual na barra de progresso
-            style.configure("Custom.Horizontal.TProgressbar",
-                          background=f'#{int(40 + progress/100 * 60):02x}90e2')
-
-            # Marca o tweet como importado
-            completed_tweets.append(tweet)
-            cache.add(json.dumps(tweet))  # Adicionar ao cache
-            save_progress(completed_file, completed_tweets)
-
-            root.update_idletasks()
-
-    finally:
-        loading.stop()
-        save_progress(completed_file, completed_tweets)
-        status_label.config(text="Importação concluída!")
-        messagebox.showinfo("Sucesso", "Todos os tweets foram importados com sucesso!")
-
-# Função para abrir o seletor de arquivos
-def select_file(entry):
-    file_path = filedialog.askopenfilename(
-        title="Selecione o arquivo tweets.js",
-        filetypes=(("Arquivos JSON", "*.js"), ("Todos os arquivos", "*.*"))
-    )
-    if file_path:
-        entry.delete(0, tk.END)
-        entry.insert(0, file_path)
-
-# Função para iniciar a importação em uma thread separada
-def start_import(handle_entry, password_entry, file_entry, status_label, progress_bar, stop_button):
-    handle = handle_entry.get().strip()
-    password = password_entry.get().strip()
-    file_path = file_entry.get().strip()
-    completed_file = "completed_tweets.json"
-
-    # Habilita o botão de encerrar
-    stop_button["state"] = "normal"
-
-    Thread(
-        target=import_tweets,
-        args=(handle, password, file_path, status_label, progress_bar, completed_file),
-        daemon=True
-    ).start()
-
-# Função para encerrar a importação
-def stop_import(status_label):
-    global stop_flag
-    stop_flag = True
-    status_label.config(text="Encerrando a importação...")
-
-class ModernUI:
-    def __init__(self, root):
-        self.root = root
-        self.handle_entry = None
-        self.password_entry = None
-        self.file_entry = None
-        self.log_text = None
-        self.setup_window()
-        self.create_styles()
-        self.create_widgets()
-        self.import_progress = script.ImportProgress()
-        self.is_importing = False
-        self.current_session = None
-        self.total_tweets = 0
-        self.current_position = 0
-        self.stop_requested = False
-        self.progress_callback = None
-        self.session = None
-        
-    def setup_window(self):
-        self.root.title("Twitter to Bluesky")
-        self.root.geometry("600x700")
-        self.root.configure(bg='#ffffff')
-        
-        # Adicionar ícone da janela se disponível
-        try:
-            self.root.iconbitmap('icon.ico')
-        except:
-            pass
-            
-        # Centralizar janela
-        self.center_window()
-        
-    def center_window(self):
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        self.root.geometry(f'{width}x{height}+{x}+{y}')
-        
-    def create_styles(self):
-        self.colors = {
-            'primary': '#0EA5E9',     # Azul mais vibrante
-            'secondary': '#F1F5F9',   # Cinza mais claro
-            'text': '#0F172A',        # Texto mais escuro
-            'success': '#22C55E',     # Verde success
-            'error': '#EF4444',       # Vermelho error
-            'warning': '#F59E0B',     # Laranja warning
-            'hover': '#0284C7'        # Hover state
-        }
-        
-        style = ttk.Style(self.root)
-        style.theme_use("clam")
-        
-        # Configurações de estilo modernas
-        style.configure("Modern.TFrame", background='#ffffff')
-        style.configure("Modern.TLabel",
-                       background='#ffffff',
-                       foreground=self.colors['text'],
-                       font=('Segoe UI', 10))
-        style.configure("Header.TLabel",
-                       background='#ffffff',
-                       foreground=self.colors['text'],
-                       font=('Segoe UI', 24, 'bold'))
-        
-        # Configurar estilos do botão normal e hover
-        style.configure("Modern.TButton",
-                       background=self.colors['primary'],
-                       foreground='white',
-                       padding=(30, 15),
-                       font=('Segoe UI', 10, 'bold'))
-        
-        style.configure("Modern.TButton.Hover",
-                       background=self.colors['hover'],
-                       foreground='white',
-                       padding=(30, 15),
-                       font=('Segoe UI', 10, 'bold'))
-        
-        style.map("Modern.TButton",
-                 background=[('active', self.colors['hover'])])
-        
-        # Configurar barra de progresso moderna
-        style.configure("Modern.Horizontal.TProgressbar",
-                       background=self.colors['primary'],
-                       troughcolor=self.colors['secondary'],
-                       thickness=8)
-                       
-        # Adicionar estilo para área de log
-        style.configure("Log.TFrame",
-                       background='#ffffff',
-                       relief='solid',
-                       borderwidth=1)
-                       
-        style.configure("Log.TText",
-                       background='#f8fafc',
-                       foreground=self.colors['text'],
-                       font=('Consolas', 9),
-                       relief='flat',
-                       borderwidth=0,
-                       padx=10,
-                       pady=10)
-
-        # Configurar estilo base
-        style.configure("Modern.TButton",
-                       background=self.colors['primary'],
-                       foreground='white',
-                       padding=(30, 15),
-                       font=('Segoe UI', 10, 'bold'))
-        
-        # Configurar mapeamento para hover
-        style.map("Modern.TButton",
-                 background=[('active', self.colors['hover']),
-                           ('pressed', self.colors['hover']),
-                           ('disabled', self.colors['secondary'])],
-                 foreground=[('disabled', '#999999')])
-
-    def create_ripple_effect(self, event):
-        widget = event.widget
-        x, y = event.x, event.y
-        
-        # Criar efeito de onda
-        ripple = tk.Canvas(widget, width=20, height=20,
-                          bg=self.colors['hover'],
-                          highlightthickness=0)
-        ripple.place(x=x-10, y=y-10)
-        
-        # Animação de expansão e fade
-        for i in range(5):
-            ripple.configure(width=i*10, height=i*10)
-            self.root.after(50)
-            ripple.update()
-        
-        ripple.destroy()
-
-    def create_widgets(self):
-        # Container principal
-        self.main_frame = ttk.Frame(self.root, style="Modern.TFrame", padding=30)
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Header com animação
-        self.header = ttk.Label(self.main_frame,
-                              text="Twitter → Bluesky",
-                              style="Header.TLabel")
-        self.header.pack(pady=(0, 30))
-        
-        # Campos de entrada com validação
-        self.input_fields = []
-        fields = [
-            ("Bluesky Handle", None),
-            ("Password", "•"),
-            ("Twitter Archive", None, "browse")
-        ]
-        
-        for field_info in fields:
-            frame = self.create_input_field(*field_info)
-            frame.pack(fill=tk.X, pady=(0, 15))
-            
-        # Status e Progresso
-        self.create_status_section()
-        
-        # Botões com efeitos
-        self.create_action_buttons()
-        
-        # Adicionar área de log após a barra de progresso
-        self.create_log_area()
-        
-        # Iniciar animações
-        self.start_animations()
-        
-    def create_input_field(self, label, show=None, button=None):
-        frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
-        
-        ttk.Label(frame, text=label, style="Modern.TLabel").pack(anchor="w")
-        
-        entry = ttk.Entry(frame, font=('Segoe UI', 10), show=show)
-        entry.pack(fill=tk.X, pady=(5, 0))
-        
-        # Atribuir campos de entrada às variáveis da classe
-        if label == "Bluesky Handle":
-            self.handle_entry = entry
-        elif label == "Password":
-            self.password_entry = entry
-        elif label == "Twitter Archive":
-            self.file_entry = entry
-        
-        if button == "browse":
-            browse_btn = ttk.Button(frame, text="Browse",
-                                  style="Modern.TButton",
-                                  command=lambda: self.browse_file(entry))
-            browse_btn.pack(pady=(5, 0))
-            
-        self.input_fields.append(entry)
-        return frame
-        
-    def create_status_section(self):
-        self.status_frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
-        self.status_frame.pack(fill=tk.X, pady=20)
-        
-        # Frame para status e contador
-        self.info_frame = ttk.Frame(self.status_frame, style="Modern.TFrame")
-        self.info_frame.pack(fill=tk.X, pady=(0, 5))
-        
-        self.status_label = ttk.Label(self.info_frame,
-                                    text="Ready to import",
-                                    style="Modern.TLabel")
-        self.status_label.pack(side=tk.LEFT)
-        
-        self.counter_label = ttk.Label(self.info_frame,
-                                     text="0/0",
-                                     font=('Segoe UI', 10, 'bold'))
-        self.counter_label.pack(side=tk.RIGHT)
-        
-        self.progress = ttk.Progressbar(self.status_frame,
-                                      style="Modern.Horizontal.TProgressbar",
-                                      mode="determinate")
-        self.progress.pack(fill=tk.X, pady=(5, 0))
-
-    def update_counter(self, current, total):
-        """Atualizar contador de tweets"""
-        if not current or not total:
-            return
-            
-        self.current_position = current
-        self.total_tweets = total
-        self.counter_label.config(text=f"{current}/{total}")
-        # Atualizar também a barra de progresso
-        self.progress["maximum"] = total
-        self.progress["value"] = current
-        self.root.update_idletasks()
-
-    def create_action_buttons(self):
-        self.button_frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
-        self.button_frame.pack(pady=20)
-        
-        self.start_button = ttk.Button(
-            self.button_frame,
-            text="Start Import",
-            style="Modern.TButton",
-            command=self.start_import
-        )
-        self.start_button.pack(side=tk.LEFT, padx=5)
-        
-        self.stop_button = ttk.Button(
-            self.button_frame,
-            text="Stop Import",
-            style="Modern.TButton",
-            state="disabled",
-            command=self.stop_import
-        )
-        self.stop_button.pack(side=tk.LEFT, padx=5)
-
-    def create_log_area(self):
-        """Criar área de log estilizada"""
-        log_frame = ttk.Frame(self.main_frame, style="Log.TFrame")
-        log_frame.pack(fill=tk.BOTH, expand=True, pady=(20, 0))
-        
-        # Área de texto com scrollbar e fonte mono
-        self.log_text = tk.Text(log_frame,
-                               height=20,  # Aumentar altura
-                               wrap=tk.WORD,
-                               font=('Consolas', 10),
-                               bg='#ffffff',  # Fundo branco
-                               fg='#1a1a1a',  # Texto quase preto
-                               relief='flat',
-                               padx=15,
-                               pady=15)
-        
-        # Configurar tags para formatação
-        self.log_text.tag_configure('timestamp', foreground='#666666')
-        self.log_text.tag_configure('header', foreground='#1d4ed8', font=('Consolas', 10))
-        self.log_text.tag_configure('success', foreground='#15803d')
-        self.log_text.tag_configure('error', foreground='#dc2626')
-        self.log_text.tag_configure('tweet', foreground='#1a1a1a')
-        self.log_text.tag_configure('footer', foreground='#6b21a8')
-        self.log_text.tag_configure('warning', foreground='#d97706')
-        
-        scrollbar = ttk.Scrollbar(log_frame, orient="vertical", 
-                                command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=scrollbar.set)
-        
-        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.log_text.configure(state='disabled')
-
-    def log_message(self, message, level='info'):
-        """Adicionar mensagem ao log com formatação"""
-        if not self.log_text:
-            return
-            
-        self.log_text.configure(state='normal')
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Ícones para diferentes tipos de mensagem
-        icons = {
-            'info': 'ℹ️',
-            'success': '✅',
-            'error': '❌',
-            'warning': '⚠️'
-        }
-        
-        # Formatar mensagem com timestamp
-        formatted_msg = f"{icons.get(level, 'ℹ️')} [{timestamp}] {message}\n"
-        
-        # Inserir mensagem com a tag apropriada
-        self.log_text.insert(tk.END, formatted_msg, level)
-        
-        # Auto-scroll para última mensagem
-        self.log_text.see(tk.END)
-        self.log_text.configure(state='disabled')
-        self.root.update_idletasks()
-
-    def log_tweet(self, text, status=""):
-        if not self.log_text:
-            return
-            
-        self.log_text.configure(state='normal')
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Linha separadora
-        self.log_text.insert(tk.END, "\n" + "─" * 80 + "\n\n", 'separator')
-        
-        # Sempre mostrar o texto do tweet sendo analisado
-        if text:
-            self.log_text.insert(tk.END, "Analisando tweet: ", 'header')
-            self.log_text.insert(tk.END, f"{text}\n\n", 'tweet')
-        
-        if isinstance(status, dict):
-            # Se estiver apenas analisando, não mostrar mais nada
-            if status.get('analyzing'):
-                self.log_text.configure(state='disabled')
-                return
-                
-            tweet_text = status.get('text', '')
-            status_text = status.get('status', '')
-            footer = status.get('footer', '')
-            delay = status.get('delay', '')
-            
-            if "sucesso" in str(status_text).lower():
-                self.log_text.insert(tk.END, "✅ Postado com sucesso:\n", 'success')
-                self.log_text.insert(tk.END, f"{tweet_text}\n\n", 'tweet')
-                if footer:
-                    self.log_text.insert(tk.END, f"{footer}\n", 'footer')
-                if delay:
-                    self.log_text.insert(tk.END, f"⏱️ Delay: {delay:.1f}s\n", 'info')
-        else:
-            if "retweet" in str(status).lower():
-                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
-            elif "resposta" in str(status).lower():
-                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
-            elif "ignorado" in str(status).lower():
-                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
-            else:
-                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'error')
-        
-        self.log_text.see(tk.END)
-        self.log_text.configure(state='disabled')
-        self.root.update_idletasks()
-
-    def start_animations(self):
-        def animate():
-            self.progress['value'] = 0
-            for i in range(101):
-                if i <= 100:
-                    self.progress['value'] = i
-                    self.root.after(20)
-            self.progress['value'] = 0
-            
-        self.root.after(1000, animate)
-        
-    def start_import(self):
-        if self.is_importing:
-            return
-            
-        handle = self.handle_entry.get().strip()
-        password = self.password_entry.get().strip()
-        file_path = self.file_entry.get().strip()
-        
-        if not all([handle, password, file_path]):
-            self.log_message("Preencha todos os campos!", 'error')
-            messagebox.showerror("Erro", "Preencha todos os campos!")
-            return
-            
-        self.stop_requested = False
-        
-        def progress_callback(progress, success, data):
-            if isinstance(data, dict):
-                current = data.get('current', 0)
-                total = data.get('total', 0)
-                
-                # Sempre atualizar contador quando disponível
-                if current and total:
-                    self.update_counter(current, total)
-                
-                text = data.get('text', '')
-                status = data.get('status', '')
-                error = data.get('error')
-                
-                if error:
-                    self.log_message(error, 'error')
-                elif "Analisando" in str(status):
-                    self.status_label.config(
-                        text=f"Analisando tweet {current} de {total}",
-                        foreground=self.colors['primary']
-                    )
-                    self.log_tweet(text, data)
-                elif success:
-                    self.status_label.config(
-                        text=f"Importando... {progress:.1f}%",
-                        foreground=self.colors['success']
-                    )
-                    self.log_tweet(text, data)
-                else:
-                    self.log_tweet(text, data)
-                    
-            self.update_progress(progress)
-            
-        progress_callback.stop_requested = False
-        self.progress_callback = progress_callback
-        
-        def import_thread():
-            try:
-                self.is_importing = True
-                self.log_message("Iniciando importação...", 'info')
-                
-                success, message = script.resume_import(
-                    handle=handle,
-                    password=password,
-                    tweets_path=file_path,
-                    callback=progress_callback
-                )
-                
-                if success:
-                    if "pausada" in message.lower():
-                        self.log_message("Importação pausada com sucesso!", 'warning')
-                        self.log_message(f"Progresso salvo no tweet {self.current_position} de {self.total_tweets}", 'info')
-                    else:
-                        self.log_message("Importação concluída com sucesso!", 'success')
-                else:
-                    self.log_message(f"Erro na importação: {message}", 'error')
-                    
-            except Exception as e:
-                self.log_message(f"Erro inesperado: {str(e)}", 'error')
-            finally:
-                self.is_importing = False
-                self.stop_button.config(state="disabled")
-                self.start_button.config(state="normal")
-        
-        self.start_button.config(state="disabled")
-        self.stop_button.config(state="normal")
-        Thread(target=import_thread, daemon=True).start()
-
-    def stop_import(self):
-        """Parar importação de forma segura"""
-        if not self.is_importing or not self.progress_callback:
-            return
-            
-        self.progress_callback.stop_requested = True
-        self.log_message("Solicitação de parada recebida, aguarde...", 'warning')
-        self.status_label.config(
-            text="Salvando progresso...",
-            foreground=self.colors['warning']
-        )
-
-    def update_progress(self, value):
-        self.progress['value'] = value
-        self.root.update_idletasks()
-
-    def browse_file(self, entry):
-        """Método para selecionar arquivo"""
-        file_path = filedialog.askopenfilename(
-            title="Selecione o arquivo tweets.js",
-            filetypes=(("Arquivos JSON", "*.js"), ("Todos os arquivos", "*.*"))
-        )
-        if file_path:
-            entry.delete(0, tk.END)
-            entry.insert(0, file_path)
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = ModernUI(root)
-    root.mainloop()
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from threading import Thread
+import queue
+import time
+import json
+import os
+from datetime import datetime
+import sys
+import argparse
+sys.path.append(os.path.dirname(__file__))
+import script  # Importar o script principal
+from profiling import PROFILE_MODES, profile_call
+from search import SEARCH_RESULT_LIMIT, ArchiveIndex, load_selection, save_selection
+
+# A interface já mostra cada tweet no log; o terminal fica só com o resumo
+script.set_verbosity(script.VERBOSITY_NORMAL)
+
+# Variável de controle para encerrar a importação
+stop_flag = False
+cache = set()  # Sistema de cache para evitar duplicados
+
+class LoadingAnimation:
+    def __init__(self, status_label):
+        self.status_label = status_label
+        self.running = False
+        self.dots = 0
+        
+    def start(self):
+        self.running = True
+        self.animate()
+        
+    def stop(self):
+        self.running = False
+        
+    def animate(self):
+        if not self.running:
+            return
+            
+        self.dots = (self.dots + 1) % 4
+        current_text = self.status_label.cget("text").split('.')[0]
+        self.status_label.config(text=f"{current_text}{'.' * self.dots}")
+        self.status_label.after(500, self.animate)
+
+# Função para carregar tweets
+def load_tweets(file_path):
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read().replace("window.YTD.tweets.part0 = ", "")
+            tweets = json.loads(content)
+        return tweets
+    except Exception as e:
+        return []
+
+# Função para salvar progresso
+def save_progress(file_path, completed_tweets):
+    try:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(completed_tweets, f, ensure_ascii=False, indent=4)
+    except Exception as e:
+        print(f"Erro ao salvar progresso: {e}")
+
+# Função para simular o processo de importação
+def import_tweets(handle, password, file_path, status_label, progress_bar, completed_file):
+    global stop_flag, cache
+    stop_flag = False
+
+    # Criar e iniciar animação de loading
+    loading = LoadingAnimation(status_label)
+    loading.start()
+
+    if not handle or not password or not file_path:
+        messagebox.showerror("Erro", "Preencha todos os campos corretamente!")
+        return
+
+    if not os.path.exists(file_path):
+        messagebox.showerror("Erro", "O arquivo especificado não foi encontrado!")
+        return
+
+    tweets = load_tweets(file_path)
+    if not tweets:
+        messagebox.showerror("Erro", "Nenhum tweet encontrado no arquivo!")
+        return
+
+    # Carregar progresso salvo, se existir
+    if os.path.exists(completed_file):
+        with open(completed_file, encoding="utf-8") as f:
+            completed_tweets = json.load(f)
+    else:
+        completed_tweets = []
+
+    # Atualizar cache com tweets já completados
+    cache.update([json.dumps(tweet) for tweet in completed_tweets])
+
+    # Filtrar tweets já importados
+    tweets_to_import = [tweet for tweet in tweets if json.dumps(tweet) not in cache]
+
+    if not tweets_to_import:
+        messagebox.showinfo("Info", "Todos os tweets já foram importados anteriormente!")
+        return
+
+    try:
+        progress_bar["maximum"] = len(tweets_to_import)
+        for i, tweet in enumerate(tweets_to_import):
+            if stop_flag:  # Interrompe a importação se o botão "Encerrar" for pressionado
+                loading.stop()
+                save_progress(completed_file, completed_tweets)
+                status_label.config(text="Importação encerrada pelo usuário.")
+                return
+
+            # Simula o tempo de postagem (substitua por chamada à função real de postagem)
+            time.sleep(0.1)
+
+            # Atualizar interface com animação
+            progress = (i + 1) / len(tweets_to_import) * 100
+            progress_bar["value"] = i + 1
+            status_label.config(text=f"Importando... {progress:.1f}%")
+            
+            # Efeito visual na barra de progresso
+            style.configure("Custom.Horizontal.TProgressbar",
+                          background=f'#{int(40 + progress/100 * 60):02x}90e2')
+
+            # Marca o tweet como importado
+            completed_tweets.append(tweet)
+            cache.add(json.dumps(tweet))  # Adicionar ao cache
+            save_progress(completed_file, completed_tweets)
+
+            root.update_idletasks()
+
+    finally:
+        loading.stop()
+        save_progress(completed_file, completed_tweets)
+        status_label.config(text="Importação concluída!")
+        messagebox.showinfo("Sucesso", "Todos os tweets foram importados com sucesso!")
+
+# Função para abrir o seletor de arquivos
+def select_file(entry):
+    file_path = filedialog.askopenfilename(
+        title="Selecione o arquivo tweets.js",
+        filetypes=(("Arquivos JSON", "*.js"), ("Todos os arquivos", "*.*"))
+    )
+    if file_path:
+        entry.delete(0, tk.END)
+        entry.insert(0, file_path)
+
+# Função para iniciar a importação em uma thread separada
+def start_import(handle_entry, password_entry, file_entry, status_label, progress_bar, stop_button):
+    handle = handle_entry.get().strip()
+    password = password_entry.get().strip()
+    file_path = file_entry.get().strip()
+    completed_file = "completed_tweets.json"
+
+    # Habilita o botão de encerrar
+    stop_button["state"] = "normal"
+
+    Thread(
+        target=import_tweets,
+        args=(handle, password, file_path, status_label, progress_bar, completed_file),
+        daemon=True
+    ).start()
+
+# Função para encerrar a importação
+def stop_import(status_label):
+    global stop_flag
+    stop_flag = True
+    status_label.config(text="Encerrando a importação...")
+
+# Espera (ms) depois da última tecla antes de buscar
+SEARCH_DEBOUNCE_MS = 200
+# Intervalo (ms) entre as leituras da fila de eventos da importação e
+# quantos eventos cada leitura aplica, para a janela continuar respondendo
+UI_POLL_MS = 50
+UI_EVENTS_PER_POLL = 200
+# Tamanho inicial da janela principal
+WINDOW_WIDTH = 600
+WINDOW_HEIGHT = 700
+
+class TweetSelector:
+    """Janela de busca no arquivo para marcar os tweets a migrar
+
+    O índice FTS (`search.ArchiveIndex`) é montado em segundo plano na
+    primeira abertura de cada arquivo; a busca já funciona durante a
+    montagem. A seleção salva (`search.SELECTION_FILE`) é usada pela
+    importação seguinte.
+    """
+    def __init__(self, ui, tweets_path):
+        self.ui = ui
+        self.tweets_path = tweets_path
+        self.index = ArchiveIndex(tweets_path)
+        self.selected = None
+        self.total = 0
+        self.found = 0
+        self.ready = False
+        self._pending_search = None
+
+        self.window = tk.Toplevel(ui.root)
+        self.window.title("Select Tweets")
+        self.window.geometry("760x620")
+        self.window.configure(bg='#ffffff')
+        self.create_widgets()
+        Thread(target=self.build_index, daemon=True).start()
+
+    def create_widgets(self):
+        frame = ttk.Frame(self.window, style="Modern.TFrame", padding=15)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        filters = ttk.Frame(frame, style="Modern.TFrame")
+        filters.pack(fill=tk.X)
+        ttk.Label(filters, text="Search", style="Modern.TLabel").pack(side=tk.LEFT)
+        self.query_entry = ttk.Entry(filters, font=('Segoe UI', 10))
+        self.query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 10))
+        self.date_entries = []
+        for label in ("From", "To"):
+            ttk.Label(filters, text=label, style="Modern.TLabel").pack(side=tk.LEFT)
+            entry = ttk.Entry(filters, width=11, font=('Segoe UI', 10))
+            entry.pack(side=tk.LEFT, padx=(5, 10))
+            self.date_entries.append(entry)
+        for entry in [self.query_entry] + self.date_entries:
+            entry.bind('<KeyRelease>', self.schedule_search)
+
+        results = ttk.Frame(frame, style="Modern.TFrame")
+        results.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.tree = ttk.Treeview(results, columns=('selected', 'date', 'text'), show='headings',
+                                 selectmode='browse')
+        self.tree.heading('selected', text="✓")
+        self.tree.heading('date', text="Date")
+        self.tree.heading('text', text="Tweet")
+        self.tree.column('selected', width=30, stretch=False, anchor='center')
+        self.tree.column('date', width=110, stretch=False)
+        self.tree.column('text', width=560)
+        scrollbar = ttk.Scrollbar(results, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewSelect>>', self.show_preview)
+        self.tree.bind('<Double-1>', self.toggle_current)
+        self.tree.bind('<space>', self.toggle_current)
+
+        self.preview = tk.Text(frame, height=6, wrap=tk.WORD, font=('Consolas', 10),
+                               bg='#f8fafc', relief='flat', padx=10, pady=10)
+        self.preview.pack(fill=tk.X)
+        self.preview.configure(state='disabled')
+
+        footer = ttk.Frame(frame, style="Modern.TFrame")
+        footer.pack(fill=tk.X, pady=(10, 0))
+        self.status_label = ttk.Label(footer, text="Indexando...", style="Modern.TLabel")
+        self.status_label.pack(side=tk.LEFT)
+        for text, command in (("Save", self.save),
+                              ("Uncheck all found", lambda: self.mark_results(False)),
+                              ("Check all found", lambda: self.mark_results(True))):
+            ttk.Button(footer, text=text, command=command).pack(side=tk.RIGHT, padx=(5, 0))
+
+    def build_index(self):
+        """Monta o índice (thread própria); a janela é atualizada pelo loop do Tk"""
+        def progress(done, total):
+            self.ui.root.after(0, self.status_label.config,
+                               {'text': f"Indexando... {done}/{total}"})
+        try:
+            self.total = self.index.build(progress)
+        except Exception as e:
+            self.ui.root.after(0, self.ui.log_message, f"Erro ao indexar o arquivo: {e}", 'error')
+            return
+        self.ui.root.after(0, self.index_ready)
+
+    def index_ready(self):
+        saved = load_selection(self.tweets_path)
+        self.selected = saved if saved is not None else self.index.ids()
+        self.ready = True
+        self.search()
+
+    def filters(self):
+        since, until = (entry.get().strip() for entry in self.date_entries)
+        # Datas incompletas enquanto o usuário digita são ignoradas
+        since, until = (day if len(day) == 10 else None for day in (since, until))
+        return self.query_entry.get(), since, until
+
+    def schedule_search(self, event=None):
+        if self._pending_search:
+            self.window.after_cancel(self._pending_search)
+        self._pending_search = self.window.after(SEARCH_DEBOUNCE_MS, self.search)
+
+    def search(self):
+        self._pending_search = None
+        try:
+            found = self.index.count(*self.filters())
+            rows = self.index.search(*self.filters())
+        except Exception as e:
+            self.status_label.config(text=f"Busca inválida: {e}")
+            return
+        self.tree.delete(*self.tree.get_children())
+        for tweet_id, created_at, text in rows:
+            self.tree.insert('', tk.END, iid=tweet_id,
+                             values=(self.mark(tweet_id), self.format_date(created_at),
+                                     text.replace("\n", " ")[:200]))
+        self.found = found
+        self.update_status()
+
+    def mark(self, tweet_id):
+        if self.selected is None:
+            return ""
+        return "☑" if tweet_id in self.selected else "☐"
+
+    @staticmethod
+    def format_date(created_at):
+        try:
+            return datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y").strftime("%d/%m/%Y %H:%M")
+        except (TypeError, ValueError):
+            return ""
+
+    def update_status(self):
+        shown = min(self.found, SEARCH_RESULT_LIMIT)
+        text = f"{self.found} encontrados"
+        if shown < self.found:
+            text += f" (mostrando {shown})"
+        if self.ready:
+            text += f" • {len(self.selected)} de {self.total} marcados"
+        else:
+            text += " • indexando..."
+        self.status_label.config(text=text)
+
+    def show_preview(self, event=None):
+        focus = self.tree.focus()
+        if not focus:
+            return
+        self.preview.configure(state='normal')
+        self.preview.delete('1.0', tk.END)
+        self.preview.insert(tk.END, self.index.text(focus) or "")
+        self.preview.configure(state='disabled')
+
+    def toggle_current(self, event=None):
+        focus = self.tree.focus()
+        if not focus or not self.ready:
+            return
+        if focus in self.selected:
+            self.selected.discard(focus)
+        else:
+            self.selected.add(focus)
+        self.tree.set(focus, 'selected', self.mark(focus))
+        self.update_status()
+
+    def mark_results(self, checked):
+        """Marca ou desmarca todos os tweets da busca atual, não só os exibidos"""
+        if not self.ready:
+            return
+        ids = self.index.ids(*self.filters())
+        if checked:
+            self.selected |= ids
+        else:
+            self.selected -= ids
+        for tweet_id in self.tree.get_children():
+            self.tree.set(tweet_id, 'selected', self.mark(tweet_id))
+        self.update_status()
+
+    def save(self):
+        if not self.ready:
+            return
+        save_selection(self.tweets_path, self.selected)
+        self.ui.log_message(f"Seleção salva: {len(self.selected)} de {self.total} tweets", 'success')
+        self.window.destroy()
+
+class ModernUI:
+    def __init__(self, root, profile_mode=None, profile_span=None):
+        self.root = root
+        self.profile_mode = profile_mode
+        self.profile_span = profile_span
+        self.handle_entry = None
+        self.password_entry = None
+        self.file_entry = None
+        self.log_text = None
+        self.setup_window()
+        self.create_styles()
+        self.create_widgets()
+        self.import_progress = script.ImportProgress()
+        self.is_importing = False
+        self.current_session = None
+        self.total_tweets = 0
+        self.current_position = 0
+        self.stop_requested = False
+        self.progress_callback = None
+        self.session = None
+        # O callback da importação é chamado por várias threads das etapas;
+        # só a thread do Tk mexe nos widgets, lendo esta fila
+        self._ui_events = queue.Queue()
+        self.root.after(UI_POLL_MS, self._drain_ui_events)
+
+    def in_ui(self, func, *args):
+        """Agenda `func(*args)` na thread do Tk (pode ser chamado de qualquer thread)"""
+        self._ui_events.put((func, args))
+
+    def _drain_ui_events(self):
+        try:
+            for _ in range(UI_EVENTS_PER_POLL):
+                func, args = self._ui_events.get_nowait()
+                func(*args)
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(UI_POLL_MS, self._drain_ui_events)
+        
+    def setup_window(self):
+        self.root.title("Twitter to Bluesky")
+        self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
+        self.root.configure(bg='#ffffff')
+        
+        # Adicionar ícone da janela se disponível
+        try:
+            self.root.iconbitmap('icon.ico')
+        except:
+            pass
+            
+        # Centralizar janela
+        self.center_window()
+        
+    def center_window(self):
+        # O tamanho já é conhecido: nada de update_idletasks, que forçaria um
+        # cálculo de layout antes de existir qualquer widget
+        x = (self.root.winfo_screenwidth() // 2) - (WINDOW_WIDTH // 2)
+        y = (self.root.winfo_screenheight() // 2) - (WINDOW_HEIGHT // 2)
+        self.root.geometry(f'{WINDOW_WIDTH}x{WINDOW_HEIGHT}+{x}+{y}')
+        
+    def create_styles(self):
+        self.colors = {
+            'primary': '#0EA5E9',     # Azul mais vibrante
+            'secondary': '#F1F5F9',   # Cinza mais claro
+            'text': '#0F172A',        # Texto mais escuro
+            'success': '#22C55E',     # Verde success
+            'error': '#EF4444',       # Vermelho error
+            'warning': '#F59E0B',     # Laranja warning
+            'hover': '#0284C7'        # Hover state
+        }
+        
+        style = ttk.Style(self.root)
+        style.theme_use("clam")
+        
+        # Configurações de estilo modernas
+        style.configure("Modern.TFrame", background='#ffffff')
+        style.configure("Modern.TLabel",
+                       background='#ffffff',
+                       foreground=self.colors['text'],
+                       font=('Segoe UI', 10))
+        style.configure("Header.TLabel",
+                       background='#ffffff',
+                       foreground=self.colors['text'],
+                       font=('Segoe UI', 24, 'bold'))
+        
+        # Configurar barra de progresso moderna
+        style.configure("Modern.Horizontal.TProgressbar",
+                       background=self.colors['primary'],
+                       troughcolor=self.colors['secondary'],
+                       thickness=8)
+                       
+        # Adicionar estilo para área de log
+        style.configure("Log.TFrame",
+                       background='#ffffff',
+                       relief='solid',
+                       borderwidth=1)
+
+        # Configurar estilo base (o hover vem do mapeamento abaixo)
+        style.configure("Modern.TButton",
+                       background=self.colors['primary'],
+                       foreground='white',
+                       padding=(30, 15),
+                       font=('Segoe UI', 10, 'bold'))
+        
+        # Configurar mapeamento para hover
+        style.map("Modern.TButton",
+                 background=[('active', self.colors['hover']),
+                           ('pressed', self.colors['hover']),
+                           ('disabled', self.colors['secondary'])],
+                 foreground=[('disabled', '#999999')])
+
+    def create_ripple_effect(self, event):
+        widget = event.widget
+        x, y = event.x, event.y
+        
+        # Criar efeito de onda
+        ripple = tk.Canvas(widget, width=20, height=20,
+                          bg=self.colors['hover'],
+                          highlightthickness=0)
+        ripple.place(x=x-10, y=y-10)
+        
+        # Animação de expansão agendada no loop do Tk, sem bloquear a janela
+        def expand(i=0):
+            if i < 5:
+                ripple.configure(width=i*10, height=i*10)
+                self.root.after(50, expand, i + 1)
+            else:
+                ripple.destroy()
+        
+        expand()
+
+    def create_widgets(self):
+        # Container principal
+        self.main_frame = ttk.Frame(self.root, style="Modern.TFrame", padding=30)
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Header com animação
+        self.header = ttk.Label(self.main_frame,
+                              text="Twitter → Bluesky",
+                              style="Header.TLabel")
+        self.header.pack(pady=(0, 30))
+        
+        # Campos de entrada com validação
+        self.input_fields = []
+        fields = [
+            ("Bluesky Handle", None),
+            ("Password", "•"),
+            ("Twitter Archive", None, "browse")
+        ]
+        
+        for field_info in fields:
+            frame = self.create_input_field(*field_info)
+            frame.pack(fill=tk.X, pady=(0, 15))
+            
+        # Status e Progresso
+        self.create_status_section()
+        
+        # Botões com efeitos
+        self.create_action_buttons()
+        
+        # Adicionar área de log após a barra de progresso
+        self.create_log_area()
+        
+        # Iniciar animações
+        self.start_animations()
+        
+    def create_input_field(self, label, show=None, button=None):
+        frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
+        
+        ttk.Label(frame, text=label, style="Modern.TLabel").pack(anchor="w")
+        
+        entry = ttk.Entry(frame, font=('Segoe UI', 10), show=show)
+        entry.pack(fill=tk.X, pady=(5, 0))
+        
+        # Atribuir campos de entrada às variáveis da classe
+        if label == "Bluesky Handle":
+            self.handle_entry = entry
+        elif label == "Password":
+            self.password_entry = entry
+        elif label == "Twitter Archive":
+            self.file_entry = entry
+        
+        if button == "browse":
+            browse_btn = ttk.Button(frame, text="Browse",
+                                  style="Modern.TButton",
+                                  command=lambda: self.browse_file(entry))
+            browse_btn.pack(pady=(5, 0))
+            
+        self.input_fields.append(entry)
+        return frame
+        
+    def create_status_section(self):
+        self.status_frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
+        self.status_frame.pack(fill=tk.X, pady=20)
+        
+        # Frame para status e contador
+        self.info_frame = ttk.Frame(self.status_frame, style="Modern.TFrame")
+        self.info_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        self.status_label = ttk.Label(self.info_frame,
+                                    text="Ready to import",
+                                    style="Modern.TLabel")
+        self.status_label.pack(side=tk.LEFT)
+        
+        self.counter_label = ttk.Label(self.info_frame,
+                                     text="0/0",
+                                     font=('Segoe UI', 10, 'bold'))
+        self.counter_label.pack(side=tk.RIGHT)
+        
+        self.progress = ttk.Progressbar(self.status_frame,
+                                      style="Modern.Horizontal.TProgressbar",
+                                      mode="determinate")
+        self.progress.pack(fill=tk.X, pady=(5, 0))
+
+    def update_counter(self, current, total):
+        """Atualizar contador de tweets"""
+        if not current or not total:
+            return
+            
+        self.current_position = current
+        self.total_tweets = total
+        self.counter_label.config(text=f"{current}/{total}")
+        # Atualizar também a barra de progresso
+        self.progress["maximum"] = total
+        self.progress["value"] = current
+
+    def create_action_buttons(self):
+        self.button_frame = ttk.Frame(self.main_frame, style="Modern.TFrame")
+        self.button_frame.pack(pady=20)
+        
+        self.start_button = ttk.Button(
+            self.button_frame,
+            text="Start Import",
+            style="Modern.TButton",
+            command=self.start_import
+        )
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        
+        self.stop_button = ttk.Button(
+            self.button_frame,
+            text="Stop Import",
+            style="Modern.TButton",
+            state="disabled",
+            command=self.stop_import
+        )
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+
+        self.select_button = ttk.Button(
+            self.button_frame,
+            text="Select Tweets",
+            style="Modern.TButton",
+            command=self.open_selector
+        )
+        self.select_button.pack(side=tk.LEFT, padx=5)
+
+    def create_log_area(self):
+        """Criar área de log estilizada"""
+        log_frame = ttk.Frame(self.main_frame, style="Log.TFrame")
+        log_frame.pack(fill=tk.BOTH, expand=True, pady=(20, 0))
+        
+        # Área de texto com scrollbar e fonte mono
+        self.log_text = tk.Text(log_frame,
+                               height=20,  # Aumentar altura
+                               wrap=tk.WORD,
+                               font=('Consolas', 10),
+                               bg='#ffffff',  # Fundo branco
+                               fg='#1a1a1a',  # Texto quase preto
+                               relief='flat',
+                               padx=15,
+                               pady=15)
+        
+        # Configurar tags para formatação
+        self.log_text.tag_configure('timestamp', foreground='#666666')
+        self.log_text.tag_configure('header', foreground='#1d4ed8', font=('Consolas', 10))
+        self.log_text.tag_configure('success', foreground='#15803d')
+        self.log_text.tag_configure('error', foreground='#dc2626')
+        self.log_text.tag_configure('tweet', foreground='#1a1a1a')
+        self.log_text.tag_configure('footer', foreground='#6b21a8')
+        self.log_text.tag_configure('warning', foreground='#d97706')
+        
+        scrollbar = ttk.Scrollbar(log_frame, orient="vertical", 
+                                command=self.log_text.yview)
+        self.log_text.configure(yscrollcommand=scrollbar.set)
+        
+        self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.log_text.configure(state='disabled')
+
+    def log_message(self, message, level='info'):
+        """Adicionar mensagem ao log com formatação"""
+        if not self.log_text:
+            return
+            
+        self.log_text.configure(state='normal')
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        
+        # Ícones para diferentes tipos de mensagem
+        icons = {
+            'info': 'ℹ️',
+            'success': '✅',
+            'error': '❌',
+            'warning': '⚠️'
+        }
+        
+        # Formatar mensagem com timestamp
+        formatted_msg = f"{icons.get(level, 'ℹ️')} [{timestamp}] {message}\n"
+        
+        # Inserir mensagem com a tag apropriada
+        self.log_text.insert(tk.END, formatted_msg, level)
+        
+        # Auto-scroll para última mensagem
+        self.log_text.see(tk.END)
+        self.log_text.configure(state='disabled')
+        self.root.update_idletasks()
+
+    def log_tweet(self, text, status=""):
+        if not self.log_text:
+            return
+            
+        self.log_text.configure(state='normal')
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        
+        # Linha separadora
+        self.log_text.insert(tk.END, "\n" + "─" * 80 + "\n\n", 'separator')
+        
+        # Sempre mostrar o texto do tweet sendo analisado
+        if text:
+            self.log_text.insert(tk.END, "Analisando tweet: ", 'header')
+            self.log_text.insert(tk.END, f"{text}\n\n", 'tweet')
+        
+        if isinstance(status, dict):
+            # Se estiver apenas analisando, não mostrar mais nada
+            if status.get('analyzing'):
+                self.log_text.configure(state='disabled')
+                return
+                
+            tweet_text = status.get('text', '')
+            status_text = status.get('status', '')
+            footer = status.get('footer', '')
+            delay = status.get('delay', '')
+            
+            if "sucesso" in str(status_text).lower():
+                self.log_text.insert(tk.END, "✅ Postado com sucesso:\n", 'success')
+                self.log_text.insert(tk.END, f"{tweet_text}\n\n", 'tweet')
+                if footer:
+                    self.log_text.insert(tk.END, f"{footer}\n", 'footer')
+                if delay:
+                    self.log_text.insert(tk.END, f"⏱️ Delay: {delay:.1f}s\n", 'info')
+                concurrency = status.get('concurrency')
+                if concurrency:
+                    self.log_text.insert(
+                        tk.END,
+                        f"⚡ {concurrency['limit']} posts simultâneos • "
+                        f"p95 {concurrency['p95']:.2f}s\n",
+                        'info'
+                    )
+                metrics = status.get('metrics')
+                if metrics:
+                    self.log_text.insert(
+                        tk.END,
+                        f"📊 {metrics['throughput'] * 60:.1f} posts/min • "
+                        f"{metrics['throttle_seconds']:.0f}s em espera\n",
+                        'info'
+                    )
+                videos = status.get('videos')
+                active = [video for video in (videos or {}).values()
+                          if video['stage'] not in ('pronto', 'falhou')]
+                if active:
+                    uploading = sum(1 for video in active if video['stage'] == 'enviando')
+                    self.log_text.insert(
+                        tk.END, f"🎬 {len(active)} vídeo(s) em preparo • {uploading} enviando\n", 'info'
+                    )
+        else:
+            if "retweet" in str(status).lower():
+                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
+            elif "resposta" in str(status).lower():
+                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
+            elif "ignorado" in str(status).lower():
+                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'warning')
+            else:
+                self.log_text.insert(tk.END, f"❌ [{timestamp}] {status}\n", 'error')
+        
+        self.log_text.see(tk.END)
+        self.log_text.configure(state='disabled')
+
+    def start_animations(self):
+        # Cada passo agenda o próximo com after(), então a janela continua
+        # respondendo durante a animação
+        def animate(i=0):
+            if self.is_importing:
+                return
+            if i <= 100:
+                self.progress['value'] = i
+                self.root.after(20, animate, i + 1)
+            else:
+                self.progress['value'] = 0
+            
+        self.root.after(1000, animate)
+        
+    def start_import(self):
+        if self.is_importing:
+            return
+            
+        handle = self.handle_entry.get().strip()
+        password = self.password_entry.get().strip()
+        file_path = self.file_entry.get().strip()
+        
+        if not all([handle, password, file_path]):
+            self.log_message("Preencha todos os campos!", 'error')
+            messagebox.showerror("Erro", "Preencha todos os campos!")
+            return
+            
+        self.stop_requested = False
+        selection = load_selection(file_path)
+        if selection is not None:
+            self.log_message(f"Importando só os {len(selection)} tweets selecionados", 'info')
+        
+        def show_progress(progress, success, data):
+            if isinstance(data, dict):
+                current = data.get('current', 0)
+                total = data.get('total', 0)
+                
+                # Sempre atualizar contador quando disponível
+                if current and total:
+                    self.update_counter(current, total)
+                
+                text = data.get('text', '')
+                status = data.get('status', '')
+                error = data.get('error')
+                
+                if error:
+                    self.log_message(error, 'error')
+                elif "Analisando" in str(status):
+                    self.status_label.config(
+                        text=f"Analisando tweet {current} de {total}",
+                        foreground=self.colors['primary']
+                    )
+                    self.log_tweet(text, data)
+                elif success:
+                    self.status_label.config(
+                        text=f"Importando... {progress:.1f}%",
+                        foreground=self.colors['success']
+                    )
+                    self.log_tweet(text, data)
+                else:
+                    self.log_tweet(text, data)
+                    
+            self.update_progress(progress)
+            
+        def progress_callback(progress, success, data):
+            # Chamado das threads da importação: a tela é atualizada pela thread do Tk
+            self.in_ui(show_progress, progress, success, data)
+
+        progress_callback.stop_requested = False
+        self.progress_callback = progress_callback
+        
+        def import_thread():
+            try:
+                self.is_importing = True
+                self.in_ui(self.log_message, "Iniciando importação...", 'info')
+                
+                if self.profile_mode:
+                    self.in_ui(self.log_message, f"Perfil de execução ativo ({self.profile_mode})", 'info')
+                    success, message = profile_call(
+                        script.resume_import,
+                        handle=handle,
+                        password=password,
+                        tweets_path=file_path,
+                        callback=progress_callback,
+                        selection=selection,
+                        mode=self.profile_mode,
+                        span=self.profile_span,
+                        output_dir=script.profile_dir(),
+                        archive_path=file_path,
+                        tags={'entrypoint': 'gui'}
+                    )
+                else:
+                    success, message = script.resume_import(
+                        handle=handle,
+                        password=password,
+                        tweets_path=file_path,
+                        callback=progress_callback,
+                        selection=selection
+                    )
+                
+                if success:
+                    if "pausada" in message.lower():
+                        self.in_ui(self.log_message, "Importação pausada com sucesso!", 'warning')
+                        # A posição é lida na thread do Tk, depois dos eventos já na fila
+                        self.in_ui(lambda: self.log_message(
+                            f"Progresso salvo no tweet {self.current_position} de {self.total_tweets}", 'info'))
+                    else:
+                        self.in_ui(self.log_message, "Importação concluída com sucesso!", 'success')
+                else:
+                    self.in_ui(self.log_message, f"Erro na importação: {message}", 'error')
+                    
+            except Exception as e:
+                self.in_ui(self.log_message, f"Erro inesperado: {str(e)}", 'error')
+            finally:
+                self.is_importing = False
+                self.in_ui(self.stop_button.config, {'state': "disabled"})
+                self.in_ui(self.start_button.config, {'state': "normal"})
+        
+        self.start_button.config(state="disabled")
+        self.stop_button.config(state="normal")
+        Thread(target=import_thread, daemon=True).start()
+
+    def open_selector(self):
+        """Abre a busca no arquivo para escolher os tweets a migrar"""
+        file_path = self.file_entry.get().strip()
+        if not file_path or not os.path.exists(file_path):
+            messagebox.showerror("Erro", "Escolha o arquivo tweets.js primeiro!")
+            return
+        TweetSelector(self, file_path)
+
+    def stop_import(self):
+        """Parar importação de forma segura"""
+        if not self.is_importing or not self.progress_callback:
+            return
+            
+        self.progress_callback.stop_requested = True
+        self.log_message("Solicitação de parada recebida, aguarde...", 'warning')
+        self.status_label.config(
+            text="Salvando progresso...",
+            foreground=self.colors['warning']
+        )
+
+    def update_progress(self, value):
+        self.progress['value'] = value
+
+    def browse_file(self, entry):
+        """Método para selecionar arquivo"""
+        file_path = filedialog.askopenfilename(
+            title="Selecione o arquivo tweets.js",
+            filetypes=(("Arquivos JSON", "*.js"), ("Todos os arquivos", "*.*"))
+        )
+        if file_path:
+            entry.delete(0, tk.END)
+            entry.insert(0, file_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interface gráfica da importação Twitter → Bluesky")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Grava um perfil da importação ao lado do import_log.txt")
+    parser.add_argument("--profile-span", type=float, default=None,
+                        help="Duração (s) da janela amostrada no modo 'sample'")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    app = ModernUI(root, profile_mode=args.profile, profile_span=args.profile_span)
+    root.mainloop()
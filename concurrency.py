@@ -0,0 +1,147 @@
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from retry import ERROR_RATE_LIMIT, ERROR_TRANSIENT
+
+logger = logging.getLogger(__name__)
+
+# Limites de escritas simultâneas no PDS; começa serial como a importação antiga
+AIMD_MIN_LIMIT = 1
+AIMD_MAX_LIMIT = 8
+AIMD_INITIAL_LIMIT = 1
+
+# p95 da latência de criação de um post abaixo do qual a concorrência sobe
+AIMD_TARGET_P95 = 1.5
+# Latências recentes usadas no cálculo do p95
+AIMD_WINDOW = 20
+# Sucessos mínimos entre dois ajustes (ou o limite atual, se maior)
+AIMD_MIN_SAMPLES = 10
+# Fator da redução em 429, erro 5xx ou timeout
+AIMD_DECREASE_FACTOR = 0.5
+
+# Classes de erro (ver `retry.classify_error`) que indicam PDS sobrecarregado
+_OVERLOAD_ERRORS = (ERROR_RATE_LIMIT, ERROR_TRANSIENT)
+
+class AdaptiveConcurrency:
+    """Limite de escritas em andamento ajustado por AIMD
+
+    Cada escrita ocupa uma vaga (`slot`). O limite sobe de 1 em 1 enquanto
+    o p95 das latências recentes fica abaixo de `target_p95` e cai pela
+    metade em rate limit (429), erro 5xx ou timeout. Erros de escritas
+    iniciadas antes da última redução são ignorados, para uma rajada de
+    falhas do mesmo momento não derrubar o limite várias vezes.
+    """
+    def __init__(self, initial=AIMD_INITIAL_LIMIT, min_limit=AIMD_MIN_LIMIT,
+                 max_limit=AIMD_MAX_LIMIT, target_p95=AIMD_TARGET_P95, window=AIMD_WINDOW):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = min(self.max_limit, max(min_limit, initial))
+        self.target_p95 = target_p95
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.latencies = deque(maxlen=window)
+        self._samples = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Espera uma vaga; devolve a época (nº de reduções), usada nos sinais da escrita"""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+            return self._epoch
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        epoch = self.acquire()
+        try:
+            yield epoch
+        finally:
+            self.release()
+
+    def p95(self):
+        with self._condition:
+            return self._p95()
+
+    def _p95(self):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def on_success(self, epoch, latency):
+        """Latência de uma escrita bem-sucedida; a cada rodada decide o aumento"""
+        with self._condition:
+            self.latencies.append(latency)
+            self._samples += 1
+            if self._samples < max(AIMD_MIN_SAMPLES, self.limit):
+                return
+            self._samples = 0
+            p95 = self._p95()
+            if p95 <= self.target_p95:
+                if self.limit < self.max_limit:
+                    self._set_limit(self.limit + 1, 'latência ok', p95)
+                    self.increases += 1
+                    self._condition.notify_all()
+            elif self.limit > self.min_limit:
+                # Latência subindo sem erros: o PDS já está enfileirando
+                self._set_limit(self.limit - 1, 'latência alta', p95)
+                self.decreases += 1
+
+    def on_error(self, epoch, kind):
+        """Erro de uma escrita; sobrecarga reduz o limite uma vez por época"""
+        if kind not in _OVERLOAD_ERRORS:
+            return
+        with self._condition:
+            if epoch != self._epoch:
+                return
+            self._samples = 0
+            self.latencies.clear()
+            if self.limit > self.min_limit:
+                self._set_limit(max(self.min_limit, int(self.limit * AIMD_DECREASE_FACTOR)), kind)
+                self.decreases += 1
+
+    def _set_limit(self, limit, reason, p95=None):
+        logger.info(f"Concorrência da postagem: {self.limit} → {limit} ({reason})",
+                    extra={'limit': limit, 'p95': p95})
+        if limit < self.limit:
+            self._epoch += 1
+        self.limit = limit
+
+    def snapshot(self):
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'max_limit': self.max_limit,
+                'p95': round(self._p95(), 3),
+                'target_p95': self.target_p95,
+                'increases': self.increases,
+                'decreases': self.decreases
+            }
+
+class NullConcurrency:
+    """Substituto sem limite, para postagens fora da importação em etapas"""
+    @contextmanager
+    def slot(self):
+        yield 0
+
+    def on_success(self, epoch, latency):
+        pass
+
+    def on_error(self, epoch, kind):
+        pass
+
+    def snapshot(self):
+        return {}
+
+NULL_CONCURRENCY = NullConcurrency()
@@ -0,0 +1,172 @@
+import hashlib
+import html
+import itertools
+import re
+import threading
+import unicodedata
+
+from records import POST_COLLECTION, is_migrated_post, rkey_from_uri
+
+# Similaridade mínima (1 - distância de Hamming / 64) para considerar duplicado
+DEFAULT_SIMILARITY = 0.85
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+# Abaixo disso o SimHash não é confiável: só o texto normalizado idêntico conta
+MIN_SIMHASH_CHARS = 24
+# Distância de Hamming até a qual o índice sempre encontra o post parecido;
+# mais larga, as tabelas teriam chaves estreitas e milhares de candidatos
+GUARANTEED_DISTANCE = 7
+
+FOOTER_MARKER = "\n\n📱"
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_NON_WORD = re.compile(r"[^\w]+")
+
+def normalize_text(text):
+    """Texto comparável: sem footer, links, pontuação, acentos e diferenças de caixa"""
+    text = html.unescape(text or "").split(FOOTER_MARKER)[0]
+    text = unicodedata.normalize('NFKD', text).lower()
+    # Sem acentos: cópias manuais costumam perder ou trocar acentuação
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _URL_PATTERN.sub(" ", text)
+    return _NON_WORD.sub(" ", text).strip()
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+# Cada bit do hash ocupa uma faixa de 16 bits de um inteiro grande, para somar
+# todos os bits de um shingle de uma vez (tabela por byte)
+_LANE_BITS = 16
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_BYTE_LANES = [sum(((byte >> i) & 1) << (i * _LANE_BITS) for i in range(8)) for byte in range(256)]
+
+def simhash(normalized):
+    """SimHash de 64 bits sobre shingles de caracteres"""
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))}
+    counts = 0
+    for shingle in shingles:
+        value = _shingle_hash(shingle)
+        for byte in range(8):
+            counts += _BYTE_LANES[(value >> (8 * byte)) & 255] << (8 * byte * _LANE_BITS)
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        # Bit ligado quando a maioria dos shingles tem esse bit ligado
+        if 2 * ((counts >> (bit * _LANE_BITS)) & _LANE_MASK) > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def _band_masks(max_distance):
+    """Máscaras das tabelas do índice (pares de blocos de bits)
+
+    Os 64 bits são divididos em min(max_distance, GUARANTEED_DISTANCE) + 2
+    blocos: duas impressões a até GUARANTEED_DISTANCE bits de distância têm
+    dois blocos intactos e coincidem por inteiro em pelo menos uma tabela.
+    Acima disso (até max_distance) a maioria ainda coincide em alguma. As
+    chaves de ~14 bits deixam poucas centenas de candidatos por consulta.
+    """
+    blocks = min(max_distance, GUARANTEED_DISTANCE) + 2
+    width, extra = divmod(SIMHASH_BITS, blocks)
+    block_masks = []
+    start = 0
+    for block in range(blocks):
+        size = width + (1 if block < extra else 0)
+        block_masks.append(((1 << size) - 1) << start)
+        start += size
+    return [first | second for first, second in itertools.combinations(block_masks, 2)]
+
+class DuplicateIndex:
+    """Índice LSH (SimHash em tabelas por pares de blocos) dos posts da conta
+
+    Construído uma vez; cada consulta olha só os candidatos que coincidem em
+    alguma tabela e confirma pela distância de Hamming. Textos curtos só casam
+    quando o texto normalizado é idêntico. As correspondências encontradas
+    ficam em `matches` para o relatório da simulação. Inclusões e consultas
+    passam pela mesma trava (os workers de postagem consultam em paralelo).
+    """
+    def __init__(self, threshold=DEFAULT_SIMILARITY):
+        self.threshold = threshold
+        self.max_distance = int((1 - threshold) * SIMHASH_BITS)
+        self.masks = _band_masks(self.max_distance)
+        self.bands = [{} for _ in self.masks]
+        self.exact = {}
+        self.posts = []
+        self.matches = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.posts)
+
+    def add(self, uri, text):
+        normalized = normalize_text(text)
+        if not normalized:
+            return
+        fingerprint = simhash(normalized) if len(normalized) >= MIN_SIMHASH_CHARS else None
+        with self._lock:
+            position = len(self.posts)
+            self.posts.append((uri, text, fingerprint))
+            self.exact.setdefault(normalized, position)
+            if fingerprint is not None:
+                for band, mask in zip(self.bands, self.masks):
+                    band.setdefault(fingerprint & mask, []).append(position)
+
+    def query(self, text):
+        """Melhor post parecido: (uri, texto, similaridade) ou None"""
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        fingerprint = simhash(normalized) if len(normalized) >= MIN_SIMHASH_CHARS else None
+        with self._lock:
+            return self._query(normalized, fingerprint)
+
+    def _query(self, normalized, fingerprint):
+        position = self.exact.get(normalized)
+        if position is not None:
+            uri, existing, _ = self.posts[position]
+            return uri, existing, 1.0
+        if fingerprint is None:
+            return None
+
+        best = None
+        best_distance = self.max_distance + 1
+        for band, mask in zip(self.bands, self.masks):
+            for candidate in band.get(fingerprint & mask, ()):
+                distance = bin(fingerprint ^ self.posts[candidate][2]).count('1')
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        if best is None:
+            return None
+        uri, existing, _ = self.posts[best]
+        return uri, existing, 1 - best_distance / SIMHASH_BITS
+
+    def check(self, tweet_id, text):
+        """Como `query`, registrando a correspondência em `matches`"""
+        match = self.query(text)
+        if match:
+            uri, existing, similarity = match
+            with self._lock:
+                self.matches.append({'tweet_id': tweet_id, 'uri': uri, 'text': existing,
+                                     'similarity': round(similarity, 3)})
+        return match
+
+    @classmethod
+    def from_account(cls, client, threshold=DEFAULT_SIMILARITY, page_size=100):
+        """Monta o índice com os posts da conta (listRecords paginado)
+
+        Posts do próprio migrador ficam de fora: os tweets já migrados são
+        reconhecidos pela sessão e pelo log de intenções, não por semelhança.
+        """
+        index = cls(threshold)
+        cursor = None
+        while True:
+            params = {'repo': client.me.did, 'collection': POST_COLLECTION, 'limit': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = client.com.atproto.repo.list_records(params=params)
+            for record in response.records:
+                text = getattr(record.value, 'text', '')
+                if not is_migrated_post(rkey_from_uri(record.uri), text):
+                    index.add(record.uri, text)
+            cursor = response.cursor
+            if not cursor or not response.records:
+                return index
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from transport import client_options, shared_http_client
+
+logger = logging.getLogger(__name__)
+
+# Cache de links compartilhado entre execuções e contas
+URL_CACHE_FILE = "link_cache.db"
+
+USER_AGENT = "Twitter-to-Bluesky-Migration-Tool"
+
+class PersistentCache:
+    """Cache chave → valor JSON em SQLite, seguro entre threads e processos"""
+    def __init__(self, path, table):
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key, default=None):
+        row = self._connection().execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        connection = self._connection()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, value in connection.execute(
+                f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = json.loads(value)
+        return found
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, items):
+        with self._connection() as connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in items.items()]
+            )
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+_no_redirect_opener = urllib.request.build_opener(_NoRedirect)
+
+def fetch_redirect(url, timeout=10):
+    """Retorna o destino de um link curto lendo o header Location, sem seguir o redirect
+
+    Usa o cliente HTTP compartilhado (conexões reaproveitadas entre os
+    vários links do mesmo encurtador); sem httpx, cai para o urllib.
+    """
+    try:
+        http = shared_http_client()
+    except ImportError:
+        http = None
+    if http is not None:
+        response = http.head(url, headers={'User-Agent': USER_AGENT}, timeout=timeout,
+                             follow_redirects=False)
+        if response.status_code >= 400:
+            response.raise_for_status()
+        return response.headers.get('Location')
+
+    request = urllib.request.Request(url, method="HEAD", headers={'User-Agent': USER_AGENT})
+    try:
+        with _no_redirect_opener.open(request, timeout=timeout) as response:
+            return response.headers.get('Location')
+    except urllib.error.HTTPError as e:
+        if 300 <= e.code < 400:
+            return e.headers.get('Location')
+        raise
+
+class TcoResolver:
+    """Expande links t.co que não estão nas entities do arquivo
+
+    Cada URL é resolvida uma única vez: os resultados ficam em um cache em disco
+    compartilhado por todas as execuções e contas. `fetch` pode ser trocado
+    (ex.: por um servidor local de teste).
+    """
+    def __init__(self, cache_path=URL_CACHE_FILE, fetch=fetch_redirect, workers=8, timeout=10):
+        self.cache = PersistentCache(cache_path, 'tco_links')
+        self.fetch = fetch
+        self.workers = workers
+        self.timeout = timeout
+
+    def _resolve_one(self, url):
+        try:
+            return url, self.fetch(url, timeout=self.timeout)
+        except Exception:
+            return url, None
+
+    def resolve_all(self, urls):
+        """Retorna {url curta: url expandida} para as URLs que puderam ser resolvidas"""
+        urls = set(urls)
+        resolved = self.cache.get_many(urls)
+        missing = urls - set(resolved)
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                fetched = {url: target for url, target in pool.map(self._resolve_one, missing) if target}
+            self.cache.set_many(fetched)
+            resolved.update(fetched)
+        return resolved
+
+# --- Cards de link (app.bsky.embed.external) ---
+
+# Quantos posts à frente do cursor de postagem os cards são buscados
+LINK_CARD_LOOKAHEAD = 25
+LINK_CARD_MAX_PAGE_BYTES = 512 * 1024
+LINK_CARD_MAX_THUMB_BYTES = 1_000_000
+
+class _OpenGraphParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.meta = {}
+        self.title = ""
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            key = attrs.get('property') or attrs.get('name')
+            if key and attrs.get('content') and key.lower() not in self.meta:
+                self.meta[key.lower()] = attrs['content'].strip()
+        elif tag == 'title':
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+def parse_open_graph(page, url):
+    """Extrai título, descrição e imagem (Open Graph, com fallback para twitter:*)"""
+    parser = _OpenGraphParser()
+    try:
+        parser.feed(page)
+    except Exception:
+        pass
+    meta = parser.meta
+    thumb = meta.get('og:image') or meta.get('twitter:image')
+    return {
+        'uri': url,
+        'title': (meta.get('og:title') or meta.get('twitter:title') or parser.title).strip()[:300],
+        'description': (meta.get('og:description') or meta.get('twitter:description')
+                        or meta.get('description') or "").strip()[:1000],
+        'thumb': urljoin(url, thumb) if thumb else None
+    }
+
+def _blob_json(blob):
+    """Converte o BlobRef devolvido pelo upload para o formato JSON do registro"""
+    if hasattr(blob, 'model_dump'):
+        return blob.model_dump(by_alias=True, exclude_none=True)
+    return blob
+
+class LinkCardPrefetcher:
+    """Busca cards de link em segundo plano, à frente do cursor de postagem
+
+    Um loop asyncio em thread própria usa um httpx.AsyncClient com pool de
+    conexões e `concurrency` workers. Os metadados ficam no cache em disco
+    (por URL); a miniatura é enviada uma única vez por execução via
+    upload_blob, e `get` devolve o embed pronto sem esperar pela rede.
+    """
+    def __init__(self, client=None, cache_path=URL_CACHE_FILE, concurrency=8, timeout=10):
+        self.client = client
+        self.cache = PersistentCache(cache_path, 'link_cards')
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._embeds = {}
+        self._blobs = {}
+        self._requested = set()
+        self._loop = None
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def prefetch(self, urls):
+        """Agenda a busca das URLs (ignora as já pedidas)"""
+        if self._loop is None:
+            return
+        for url in urls:
+            if url and url not in self._requested:
+                self._requested.add(url)
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, url)
+
+    def get(self, url):
+        """Embed `app.bsky.embed.external` da URL, se já estiver pronto"""
+        return self._embeds.get(url)
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+            self._thread.join(timeout=self.timeout)
+
+    def _run(self):
+        try:
+            import httpx
+        except ImportError:
+            logger.warning("httpx não instalado; cards de link desativados")
+            self._ready.set()
+            return
+        asyncio.run(self._main(httpx))
+
+    async def _main(self, httpx):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        # Mesma configuração de pool e as mesmas estatísticas do transporte compartilhado
+        options = client_options(asynchronous=True, max_connections=self.concurrency,
+                                 max_keepalive=self.concurrency)
+        options['timeout'] = self.timeout
+        async with httpx.AsyncClient(**options, follow_redirects=True,
+                                     headers={'User-Agent': USER_AGENT}) as http:
+            workers = [asyncio.create_task(self._worker(http)) for _ in range(self.concurrency)]
+            await self._queue.join()
+            await asyncio.gather(*workers)
+
+    async def _worker(self, http):
+        while True:
+            url = await self._queue.get()
+            try:
+                if url is None:
+                    # Propaga o sinal de parada para os outros workers
+                    self._queue.put_nowait(None)
+                    return
+                await self._build_embed(http, url)
+            except Exception as e:
+                logger.info(f"Card de link indisponível para {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _read_limited(self, http, url, limit):
+        async with http.stream('GET', url) as response:
+            response.raise_for_status()
+            data = b""
+            async for chunk in response.aiter_bytes():
+                data += chunk
+                if len(data) > limit:
+                    return None, response.headers.get('content-type', '')
+            return data, response.headers.get('content-type', '')
+
+    async def _build_embed(self, http, url):
+        card = self.cache.get(url)
+        if card is None:
+            page, content_type = await self._read_limited(http, url, LINK_CARD_MAX_PAGE_BYTES)
+            if page is None or 'html' not in content_type:
+                return
+            card = parse_open_graph(page.decode('utf-8', errors='replace'), url)
+            self.cache.set(url, card)
+        if not card.get('title'):
+            return
+
+        external = {'uri': card['uri'], 'title': card['title'], 'description': card['description']}
+        thumb_url = card.get('thumb')
+        if thumb_url and self.client is not None:
+            # Uma única tarefa de upload por miniatura, mesmo com vários workers
+            if thumb_url not in self._blobs:
+                self._blobs[thumb_url] = asyncio.ensure_future(self._upload_thumb(http, thumb_url))
+            blob = await self._blobs[thumb_url]
+            if blob:
+                external['thumb'] = blob
+        self._embeds[url] = {'$type': 'app.bsky.embed.external', 'external': external}
+
+    async def _upload_thumb(self, http, thumb_url):
+        try:
+            data, content_type = await self._read_limited(http, thumb_url, LINK_CARD_MAX_THUMB_BYTES)
+            if not data or not content_type.startswith('image/'):
+                return None
+            response = await self._loop.run_in_executor(None, self.client.upload_blob, data)
+            return _blob_json(response.blob)
+        except Exception as e:
+            logger.info(f"Miniatura indisponível ({thumb_url}): {e}")
+            return None
@@ -0,0 +1,233 @@
+import glob
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from links import _blob_json
+from rendering import VIDEO_MEDIA_TYPES
+from retry import call_with_retry
+
+logger = logging.getLogger(__name__)
+
+# Limites de vídeo do Bluesky
+VIDEO_MAX_BYTES = 100 * 1024 * 1024
+VIDEO_MAX_SECONDS = 180
+
+# Quantos posts à frente do cursor os vídeos são preparados
+VIDEO_LOOKAHEAD = 20
+VIDEO_WORKERS = 2
+VIDEO_WORK_DIR = "video_cache"
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+# Etapas reportadas no progresso
+VIDEO_QUEUED = 'na fila'
+VIDEO_TRANSCODING = 'convertendo'
+VIDEO_UPLOADING = 'enviando'
+VIDEO_READY = 'pronto'
+VIDEO_FAILED = 'falhou'
+
+def archive_media_dir(tweets_path):
+    """Pasta de mídia do arquivo do Twitter (`data/tweets_media`, ao lado do tweets.js)"""
+    return os.path.join(os.path.dirname(os.path.abspath(tweets_path)), "tweets_media")
+
+def video_media(tweet):
+    """Primeira mídia de vídeo ou GIF do tweet, se houver"""
+    for media in tweet.get('extended_entities', {}).get('media', []):
+        if media.get('type') in VIDEO_MEDIA_TYPES:
+            return media
+    return None
+
+def find_local_video(tweet, media, media_dir):
+    """Caminho da melhor variante mp4 presente no arquivo local
+
+    O arquivo guarda a mídia como `<id do tweet>-<nome do arquivo>`; as
+    variantes são testadas da maior para a menor taxa de bits.
+    """
+    tweet_id = tweet.get('id_str')
+    variants = [variant for variant in media.get('video_info', {}).get('variants', [])
+                if variant.get('content_type') == 'video/mp4']
+    variants.sort(key=lambda variant: int(variant.get('bitrate') or 0), reverse=True)
+    for variant in variants:
+        name = os.path.basename(urlparse(variant.get('url', '')).path)
+        path = os.path.join(media_dir, f"{tweet_id}-{name}")
+        if name and os.path.exists(path):
+            return path
+    candidates = glob.glob(os.path.join(glob.escape(media_dir), f"{tweet_id}-*.mp4"))
+    return max(candidates, key=os.path.getsize) if candidates else None
+
+def video_duration(media):
+    """Duração em segundos informada pelo arquivo (0 se desconhecida)"""
+    return int(media.get('video_info', {}).get('duration_millis') or 0) / 1000
+
+def aspect_ratio(media):
+    width, height = media.get('video_info', {}).get('aspect_ratio') or (0, 0)
+    if not (width and height):
+        size = media.get('original_info', {})
+        width, height = size.get('width'), size.get('height')
+    if width and height:
+        return {'width': int(width), 'height': int(height)}
+    return None
+
+def needs_transcode(path, duration):
+    return os.path.getsize(path) > VIDEO_MAX_BYTES or duration > VIDEO_MAX_SECONDS
+
+def transcode_video(source, target, duration, ffmpeg="ffmpeg"):
+    """Converte para H.264/AAC cortando em VIDEO_MAX_SECONDS e mirando em VIDEO_MAX_BYTES"""
+    seconds = min(duration or VIDEO_MAX_SECONDS, VIDEO_MAX_SECONDS)
+    # Taxa total com 10% de folga para o container; 128 kbps ficam para o áudio
+    video_kbps = max(200, int(VIDEO_MAX_BYTES * 8 * 0.9 / seconds / 1000) - 128)
+    command = [
+        ffmpeg, "-y", "-loglevel", "error", "-i", source,
+        "-t", str(VIDEO_MAX_SECONDS),
+        "-c:v", "libx264", "-preset", "veryfast",
+        "-b:v", f"{video_kbps}k", "-maxrate", f"{video_kbps}k", "-bufsize", f"{video_kbps * 2}k",
+        "-pix_fmt", "yuv420p", "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart", target
+    ]
+    subprocess.run(command, check=True, capture_output=True)
+    return target
+
+def media_plan(tweet, media_dir=None):
+    """Como a mídia do tweet será migrada, sem usar a rede (para o plano de migração)"""
+    items = tweet.get('extended_entities', {}).get('media', [])
+    if not items:
+        return None
+    media = video_media(tweet)
+    if media is None:
+        # Imagens continuam indicadas no texto
+        return {'type': items[0].get('type', 'photo'), 'count': len(items), 'action': 'placeholder'}
+    path = find_local_video(tweet, media, media_dir) if media_dir else None
+    if path is None:
+        return {'type': media['type'], 'action': 'missing'}
+    duration = video_duration(media)
+    return {
+        'type': media['type'],
+        'action': 'transcode' if needs_transcode(path, duration) else 'upload',
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'duration': duration
+    }
+
+class VideoProcessor:
+    """Prepara e envia vídeos em segundo plano, à frente do cursor de postagem
+
+    Um pool limitado de threads escolhe a variante local, converte com ffmpeg
+    (quando o vídeo passa dos limites e o ffmpeg está disponível) e envia o
+    blob em partes, registrando o progresso. `embed` devolve o embed
+    `app.bsky.embed.video` quando o vídeo está pronto.
+    """
+    def __init__(self, client, media_dir, workers=VIDEO_WORKERS, work_dir=VIDEO_WORK_DIR):
+        self.client = client
+        self.media_dir = media_dir
+        self.work_dir = work_dir
+        self.ffmpeg = shutil.which("ffmpeg")
+        self._jobs = {}
+        self._progress = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video")
+        if not self.ffmpeg:
+            logger.info("ffmpeg não encontrado; vídeos acima dos limites serão ignorados")
+
+    def submit(self, tweet):
+        """Agenda o vídeo do tweet (ignora tweets sem vídeo ou já agendados)"""
+        tweet_id = tweet.get('id_str')
+        media = video_media(tweet)
+        if media is None or tweet_id in self._jobs:
+            return
+        self._set_progress(tweet_id, VIDEO_QUEUED)
+        self._jobs[tweet_id] = self._pool.submit(self._process, tweet, media)
+
+    def pending(self, tweet_id):
+        """True enquanto o vídeo do tweet ainda está sendo preparado"""
+        job = self._jobs.get(tweet_id)
+        return job is not None and not job.done()
+
+    def embed(self, tweet_id, timeout=None):
+        """Embed do vídeo (espera até `timeout`); None se não houver vídeo utilizável"""
+        job = self._jobs.pop(tweet_id, None)
+        if job is None:
+            return None
+        try:
+            return job.result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._progress.pop(tweet_id, None)
+
+    def status(self):
+        """Progresso dos vídeos em andamento: {id do tweet: {'stage', 'sent', 'total'}}"""
+        with self._lock:
+            return {tweet_id: dict(progress) for tweet_id, progress in self._progress.items()}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _set_progress(self, tweet_id, stage, sent=0, total=0):
+        with self._lock:
+            self._progress[tweet_id] = {'stage': stage, 'sent': sent, 'total': total}
+
+    def _process(self, tweet, media):
+        tweet_id = tweet.get('id_str')
+        converted = None
+        try:
+            path = find_local_video(tweet, media, self.media_dir)
+            if path is None:
+                logger.info("Vídeo não encontrado no arquivo local", extra={'tweet_id': tweet_id})
+                self._set_progress(tweet_id, VIDEO_FAILED)
+                return None
+
+            duration = video_duration(media)
+            if needs_transcode(path, duration):
+                if not self.ffmpeg:
+                    logger.info("Vídeo acima dos limites e sem ffmpeg", extra={'tweet_id': tweet_id})
+                    self._set_progress(tweet_id, VIDEO_FAILED)
+                    return None
+                self._set_progress(tweet_id, VIDEO_TRANSCODING)
+                os.makedirs(self.work_dir, exist_ok=True)
+                converted = transcode_video(path, os.path.join(self.work_dir, f"{tweet_id}.mp4"),
+                                            duration, self.ffmpeg)
+                path = converted
+                if os.path.getsize(path) > VIDEO_MAX_BYTES:
+                    logger.info("Vídeo continua acima do limite após a conversão",
+                                extra={'tweet_id': tweet_id})
+                    self._set_progress(tweet_id, VIDEO_FAILED)
+                    return None
+
+            blob = call_with_retry(lambda: self._upload(tweet_id, path))
+            embed = {'$type': 'app.bsky.embed.video', 'video': blob}
+            ratio = aspect_ratio(media)
+            if ratio:
+                embed['aspectRatio'] = ratio
+            if media.get('ext_alt_text'):
+                embed['alt'] = media['ext_alt_text'][:1000]
+            self._set_progress(tweet_id, VIDEO_READY)
+            return embed
+        except Exception as e:
+            logger.warning(f"Falha ao preparar vídeo: {e}", extra={'tweet_id': tweet_id})
+            self._set_progress(tweet_id, VIDEO_FAILED)
+            return None
+        finally:
+            if converted and os.path.exists(converted):
+                os.remove(converted)
+
+    def _upload(self, tweet_id, path):
+        """Envia o arquivo em partes, atualizando o progresso a cada parte lida"""
+        total = os.path.getsize(path)
+        self._set_progress(tweet_id, VIDEO_UPLOADING, 0, total)
+
+        def chunks():
+            sent = 0
+            with open(path, 'rb') as f:
+                while chunk := f.read(UPLOAD_CHUNK_BYTES):
+                    sent += len(chunk)
+                    self._set_progress(tweet_id, VIDEO_UPLOADING, sent, total)
+                    yield chunk
+
+        # `Client.upload_blob` não aceita cabeçalhos; o método do namespace repassa
+        response = self.client.com.atproto.repo.upload_blob(
+            chunks(), headers={'Content-Type': 'video/mp4', 'Content-Length': str(total)}
+        )
+        return _blob_json(response.blob)
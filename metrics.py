@@ -0,0 +1,197 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Arquivo com o resumo periódico das métricas
+METRICS_FILE = "import_metrics.json"
+
+# Limites dos buckets dos histogramas (em segundos)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """Histograma de tempos com buckets fixos"""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Estima o quantil pelo limite superior do bucket correspondente"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95)
+        }
+
+class Metrics:
+    """Coleta tempos por etapa e contadores de uma importação"""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        # Gravações dos resumos (chamadas pelos workers de postagem em paralelo)
+        self._flush_lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Retorna um resumo serializável das métricas atuais"""
+        with self._lock:
+            elapsed = time.time() - self.started_at
+            posted = self.counters.get('posted', 0)
+            sleep = self.histograms.get('throttle_sleep')
+            return {
+                'elapsed': round(elapsed, 3),
+                'throughput': round(posted / elapsed, 4) if elapsed > 0 else 0.0,
+                'throttle_seconds': round(sleep.sum, 3) if sleep else 0.0,
+                'counters': dict(self.counters),
+                'timings': {name: h.snapshot() for name, h in self.histograms.items()}
+            }
+
+    def to_prometheus(self, prefix="bsky_import"):
+        """Formata as métricas no formato texto do Prometheus"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path=METRICS_FILE):
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2))
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+    def maybe_flush(self, interval, json_path=METRICS_FILE, prometheus_path=None):
+        """Grava os resumos se já passou `interval` segundos desde a última gravação"""
+        # Só um worker grava por intervalo; os demais seguem sem esperar
+        if not self._flush_lock.acquire(blocking=False):
+            return False
+        try:
+            if time.monotonic() - self._last_flush < interval:
+                return False
+            self._flush(json_path, prometheus_path)
+            return True
+        finally:
+            self._flush_lock.release()
+
+    def flush(self, json_path=METRICS_FILE, prometheus_path=None):
+        with self._flush_lock:
+            self._flush(json_path, prometheus_path)
+
+    def _flush(self, json_path, prometheus_path):
+        self._last_flush = time.monotonic()
+        if json_path:
+            self.write_json(json_path)
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Expõe /metrics (Prometheus) e /metrics.json via HTTP em uma thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(metrics.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = metrics.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+class NullMetrics:
+    """Substituto sem custo quando nenhuma coleta foi solicitada"""
+    def inc(self, name, value=1):
+        pass
+
+    def observe(self, name, seconds):
+        pass
+
+    def timer(self, name):
+        return nullcontext()
+
+    def snapshot(self):
+        return {}
+
+NULL_METRICS = NullMetrics()
+
+def _write_atomic(path, content):
+    # Temporário próprio de cada escritor: outro processo pode gravar o mesmo arquivo
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
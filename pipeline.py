@@ -0,0 +1,253 @@
+import logging
+import queue
+import threading
+import time
+
+from metrics import NULL_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Itens que cabem na fila de entrada de cada etapa (limita a memória e dá backpressure)
+DEFAULT_QUEUE_SIZE = 32
+
+# Intervalo em que uma etapa ociosa chama `idle` (ex.: liberar vídeos prontos)
+IDLE_POLL_SECONDS = 0.2
+
+_END = object()
+
+class Stage:
+    """Etapa da pipeline: `workers` threads lendo de uma fila limitada
+
+    `func(item)` devolve o item transformado (ou None para descartá-lo).
+    Com `ordered`, a saída segue a ordem de entrada mesmo com vários workers.
+    Subclasses podem emitir vários itens, ou retê-los, sobrescrevendo
+    `process`, `idle` (chamado com a entrada vazia) e `finish` (fim da entrada).
+    Com `drop_on_stop`, itens ainda não processados são descartados quando a
+    pipeline é parada; etapas finais (checkpoint) usam False para esvaziar a fila.
+    Um item (dict) cuja etapa falhou segue marcado com `'error'` e só é
+    processado pelas etapas com `accepts_errors` (ex.: checkpoint); as
+    demais o repassam adiante sem chamar `process`.
+    """
+    def __init__(self, name, func=None, workers=1, queue_size=DEFAULT_QUEUE_SIZE,
+                 ordered=True, drop_on_stop=True, accepts_errors=False):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.ordered = ordered
+        self.drop_on_stop = drop_on_stop
+        self.accepts_errors = accepts_errors
+        self.processed = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.max_depth = 0
+        self.input = None
+        # Contadores somados pelos vários workers da etapa
+        self._stats_lock = threading.Lock()
+
+    def record(self, busy=0.0, starved=0.0, blocked=0.0, processed=0):
+        with self._stats_lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self.processed += processed
+
+    def process(self, item, emit):
+        result = self.func(item)
+        if result is not None:
+            emit(result)
+
+    def idle(self, emit):
+        pass
+
+    def finish(self, emit):
+        pass
+
+    def snapshot(self):
+        return {
+            'workers': self.workers,
+            'queue': self.input.qsize() if self.input else 0,
+            'queue_max': self.max_depth,
+            'queue_size': self.queue_size,
+            'processed': self.processed,
+            'busy_seconds': round(self.busy, 3),
+            'starved_seconds': round(self.starved, 3),
+            'blocked_seconds': round(self.blocked, 3)
+        }
+
+class Pipeline:
+    """Etapas encadeadas por filas limitadas, cada uma com suas threads
+
+    A fonte (um iterável) alimenta a primeira etapa; quando uma fila enche,
+    a etapa anterior espera (backpressure), então a memória não cresce com
+    o tamanho do arquivo. Por etapa são medidos o tempo ocupado, o tempo sem
+    entrada ("starved") e o tempo esperando espaço na fila seguinte
+    ("blocked"), também enviados para `metrics`.
+    """
+    def __init__(self, source, stages, metrics=NULL_METRICS):
+        self.source = source
+        self.stages = stages
+        self.metrics = metrics
+        self.stopping = threading.Event()
+        self.errors = []
+        self.should_stop = None
+        self._threads = []
+        for stage in stages:
+            stage.input = queue.Queue(maxsize=stage.queue_size)
+
+    def stop(self):
+        """Para de ler a fonte; as etapas descartam o que ainda não processaram"""
+        self.stopping.set()
+
+    def start(self):
+        self._threads.append(threading.Thread(target=self._feed, name="pipeline-source", daemon=True))
+        for position, stage in enumerate(self.stages):
+            downstream = self.stages[position + 1] if position + 1 < len(self.stages) else None
+            state = {'running': stage.workers, 'next_in': 0, 'next_out': 0, 'pending': {},
+                     'lock': threading.Lock(), 'input_lock': threading.Lock()}
+            for number in range(stage.workers):
+                self._threads.append(threading.Thread(
+                    target=self._work, args=(stage, downstream, state),
+                    name=f"pipeline-{stage.name}-{number}", daemon=True
+                ))
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout=None):
+        """Espera o fim da pipeline; retorna False se ainda estiver rodando"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                return False
+        return True
+
+    def run(self, should_stop=None, poll=IDLE_POLL_SECONDS):
+        """Roda até esgotar a fonte (ou até `should_stop()` ficar verdadeiro)
+
+        `should_stop` é consultado pelas etapas antes de cada item e
+        periodicamente pela thread que chamou `run`.
+        """
+        self.should_stop = should_stop
+        self.start()
+        while not self.join(poll):
+            if should_stop and not self.stopping.is_set() and should_stop():
+                self.stop()
+        return not self.stopping.is_set()
+
+    def snapshot(self):
+        """Estado por etapa e a etapa gargalo (maior tempo ocupado por worker)"""
+        stages = {stage.name: stage.snapshot() for stage in self.stages}
+        bottleneck = max(self.stages, key=lambda stage: stage.busy / stage.workers, default=None)
+        return {'stages': stages, 'bottleneck': bottleneck.name if bottleneck else None}
+
+    def _put(self, stage, target, item):
+        if target is None:
+            return 0.0
+        start = time.perf_counter()
+        target.input.put(item)
+        waited = time.perf_counter() - start
+        stage.record(blocked=waited)
+        self.metrics.observe(f"stage_{stage.name}_blocked", waited)
+        depth = target.input.qsize()
+        if depth > target.max_depth:
+            target.max_depth = depth
+        return waited
+
+    def _feed(self):
+        first = self.stages[0]
+        try:
+            for item in self.source:
+                if self.stopping.is_set():
+                    break
+                start = time.perf_counter()
+                first.input.put(item)
+                self.metrics.observe("stage_source_blocked", time.perf_counter() - start)
+                first.max_depth = max(first.max_depth, first.input.qsize())
+        except Exception as e:
+            logger.error(f"Erro na leitura da pipeline: {e}")
+            self.errors.append(('source', e))
+        finally:
+            first.input.put(_END)
+
+    def _work(self, stage, downstream, state):
+        # Tempo desta thread esperando a fila seguinte, descontado do tempo ocupado
+        blocked = [0.0]
+
+        def emit(item):
+            blocked[0] += self._put(stage, downstream, item)
+
+        while True:
+            start = time.perf_counter()
+            # Leitura e número de sequência juntos: a ordem de entrada é a da fila
+            with state['input_lock']:
+                try:
+                    item = stage.input.get(timeout=IDLE_POLL_SECONDS)
+                except queue.Empty:
+                    item = None
+                else:
+                    sequence = state['next_in']
+                    state['next_in'] += 1
+            if item is None:
+                stage.record(starved=time.perf_counter() - start)
+                stage.idle(emit)
+                continue
+            waited = time.perf_counter() - start
+            stage.record(starved=waited)
+            self.metrics.observe(f"stage_{stage.name}_starved", waited)
+
+            if item is _END:
+                with state['lock']:
+                    state['running'] -= 1
+                    last = state['running'] == 0
+                if not last:
+                    # Os outros workers da etapa também precisam ver o fim
+                    stage.input.put(_END)
+                else:
+                    stage.finish(emit)
+                    self._put(stage, downstream, _END)
+                return
+
+            if self.should_stop and not self.stopping.is_set() and self.should_stop():
+                self.stop()
+            if self.stopping.is_set() and stage.drop_on_stop:
+                self._release(stage, state, sequence, [], emit)
+                continue
+
+            outputs = []
+            output = outputs.append if stage.ordered else emit
+            if isinstance(item, dict) and 'error' in item and not stage.accepts_errors:
+                # Falhou numa etapa anterior: segue direto para quem registra a posição
+                output(item)
+                self._release(stage, state, sequence, outputs, emit)
+                continue
+            start = time.perf_counter()
+            blocked_before = blocked[0]
+            try:
+                stage.process(item, output)
+            except Exception as e:
+                logger.error(f"Erro na etapa {stage.name}: {e}")
+                self.metrics.inc('errors')
+                self.errors.append((stage.name, e))
+                if isinstance(item, dict):
+                    item['error'] = (stage.name, e)
+                    output(item)
+            elapsed = time.perf_counter() - start - (blocked[0] - blocked_before)
+            self.metrics.observe(f"stage_{stage.name}", elapsed)
+            stage.record(busy=elapsed, processed=1)
+            self._release(stage, state, sequence, outputs, emit)
+
+    def _release(self, stage, state, sequence, outputs, emit):
+        """Entrega as saídas na ordem de entrada (etapas `ordered` com vários workers)"""
+        if not stage.ordered:
+            return
+        with state['lock']:
+            state['pending'][sequence] = outputs
+            ready = []
+            while state['next_out'] in state['pending']:
+                ready.extend(state['pending'].pop(state['next_out']))
+                state['next_out'] += 1
+            # Só um worker entrega por vez, para manter a ordem
+            for item in ready:
+                emit(item)
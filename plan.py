@@ -0,0 +1,85 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from media import media_plan
+from rendering import PRERENDER_POOL_THRESHOLD, _init_render_worker, _render_entry, prerender_tweets
+
+# Plano de migração gerado pela simulação offline (uma linha JSON por tweet)
+PLAN_FILE = "migration_plan.jsonl"
+
+# Pasta de mídia repassada uma vez para cada processo do pool
+_worker_media_dir = None
+
+def _init_plan_worker(resolved_links, media_dir):
+    global _worker_media_dir
+    _init_render_worker(resolved_links)
+    _worker_media_dir = media_dir
+
+def _plan_entry(tweet_data):
+    tweet = tweet_data.get('tweet') or {}
+    entry = _render_entry(tweet_data)
+    entry['created_at'] = tweet.get('created_at')
+    entry['media'] = media_plan(tweet, _worker_media_dir) if entry['action'] == 'post' else None
+    return entry
+
+def build_plan(tweets, resolved_links=None, media_dir=None, workers=None, chunksize=256):
+    """Gera as entradas do plano na ordem dos tweets, em paralelo quando vale a pena
+
+    Cada entrada é o resultado de `render_tweet` (ação, motivo, texto final,
+    tamanhos, facets, rkey) mais a data original e o plano da mídia. Nada
+    aqui usa a rede.
+    """
+    if len(tweets) < PRERENDER_POOL_THRESHOLD or workers == 1:
+        _init_plan_worker(resolved_links, media_dir)
+        yield from map(_plan_entry, tweets)
+        return
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_plan_worker, initargs=(resolved_links, media_dir)) as pool:
+        yield from pool.map(_plan_entry, tweets, chunksize=chunksize)
+
+def write_plan(tweets, path=PLAN_FILE, resolved_links=None, media_dir=None, workers=None):
+    """Grava o plano em JSONL à medida que as entradas ficam prontas e devolve um resumo"""
+    return write_plan_entries(build_plan(tweets, resolved_links, media_dir, workers), path)
+
+def write_plan_entries(entries, path=PLAN_FILE):
+    """Grava entradas já geradas (por `build_plan` ou pelos shards) e devolve um resumo"""
+    summary = Counter()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            summary[entry['action']] += 1
+            if entry['truncated']:
+                summary['truncated'] += 1
+            if entry.get('quote'):
+                summary['quote'] += 1
+            if entry['media']:
+                summary[f"media_{entry['media']['action']}"] += 1
+    os.replace(tmp_path, path)
+    return dict(summary)
+
+def load_plan(path=PLAN_FILE):
+    """Lê um plano gravado: {id do tweet: entrada}"""
+    plan = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                plan[entry['id']] = entry
+    return plan
+
+def apply_plan(tweets, plan=None, resolved_links=None):
+    """Posts renderizados para a importação, tirados do plano quando possível
+
+    Tweets que não estão no plano (arquivo mais novo, por exemplo) são
+    renderizados na hora.
+    """
+    if not plan:
+        return prerender_tweets(tweets, resolved_links=resolved_links)
+    missing = [tweet_data for tweet_data in tweets
+               if (tweet_data.get('tweet') or {}).get('id_str') not in plan]
+    rendered_missing = iter(prerender_tweets(missing, resolved_links=resolved_links))
+    return [plan.get((tweet_data.get('tweet') or {}).get('id_str')) or next(rendered_missing)
+            for tweet_data in tweets]
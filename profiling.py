@@ -0,0 +1,154 @@
+import cProfile
+import datetime
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+# Modos de perfilamento suportados
+PROFILE_MODES = ('sample', 'cprofile')
+
+class StackSampler:
+    """Amostra periodicamente as pilhas das threads (baixo overhead)
+
+    Sem `thread_id`, amostra todas as threads (menos a própria), com o nome
+    da thread no início de cada pilha: a importação em etapas trabalha nas
+    threads do pipeline, não na que chamou.
+    """
+    def __init__(self, thread_id=None, interval=0.005, span=None, delay=0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.span = span
+        self.delay = delay
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        if self.delay and self._stop.wait(self.delay):
+            return
+        deadline = time.monotonic() + self.span if self.span else None
+        while not self._stop.wait(self.interval):
+            if deadline and time.monotonic() >= deadline:
+                break
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames[self.thread_id]} if self.thread_id in frames else {}
+            frames.pop(self._thread.ident, None)
+            if not frames:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}")
+                    frame = frame.f_back
+                name = names.get(ident, f"thread-{ident}").replace(";", "_").replace(" ", "_")
+                stack.append(name)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        """Grava as pilhas no formato "folded" (flamegraph.pl, speedscope, inferno)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def profile_output_base(output_dir, mode, archive_path=None):
+    """Monta o prefixo dos arquivos de perfil, marcado com modo e tamanho do arquivo"""
+    archive_bytes = os.path.getsize(archive_path) if archive_path and os.path.exists(archive_path) else 0
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    size_tag = f"{archive_bytes / (1024 * 1024):.1f}MB"
+    return os.path.join(output_dir, f"profile_{stamp}_{mode}_{size_tag}"), archive_bytes
+
+def profile_call(func, *args, mode='sample', span=None, delay=0, interval=0.005,
+                 output_dir='.', archive_path=None, tags=None, **kwargs):
+    """Executa `func` perfilando todas as threads e grava o resultado em `output_dir`
+
+    - mode='sample': amostragem de pilha, grava `.folded` (compatível com flamegraph),
+      com o nome da thread como primeiro quadro. `delay` e `span` (segundos)
+      limitam a janela amostrada.
+    - mode='cprofile': cProfile determinístico, grava `.prof` (pstats/snakeviz)
+      durante toda a chamada, somando a thread atual e as iniciadas por ela.
+
+    Um `.json` ao lado registra modo, tamanho do arquivo de tweets e demais tags.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Modo de perfil inválido: {mode}")
+
+    base, archive_bytes = profile_output_base(output_dir, mode, archive_path)
+    metadata = {
+        'mode': mode,
+        'archive_path': archive_path,
+        'archive_bytes': archive_bytes,
+        'started_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **(tags or {})
+    }
+
+    start = time.perf_counter()
+    if mode == 'cprofile':
+        profilers = [cProfile.Profile()]
+        output_path = f"{base}.prof"
+        if sys.version_info < (3, 12):
+            # Até o 3.11 o cProfile só vê a thread que o ativou: cada thread
+            # nova ativa o seu, no primeiro evento (gancho de threading.setprofile)
+            def start_thread(*_):
+                profiler = cProfile.Profile()
+                profilers.append(profiler)
+                profiler.enable()
+            threading.setprofile(start_thread)
+        try:
+            return profilers[0].runcall(func, *args, **kwargs)
+        finally:
+            threading.setprofile(None)
+            _dump_profilers(profilers, output_path)
+            metadata['threads'] = len(profilers)
+            _write_metadata(base, metadata, output_path, start)
+
+    sampler = StackSampler(interval=interval, span=span, delay=delay)
+    output_path = f"{base}.folded"
+    sampler.start()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sampler.stop()
+        sampler.write_folded(output_path)
+        metadata.update({'interval': interval, 'span': span, 'delay': delay, 'samples': sampler.samples})
+        _write_metadata(base, metadata, output_path, start)
+
+def _dump_profilers(profilers, output_path):
+    """Soma os perfis das threads em um único `.prof`"""
+    stats = None
+    for profiler in profilers:
+        profiler.create_stats()
+        if not profiler.stats:
+            continue
+        if stats is None:
+            stats = pstats.Stats(profiler)
+        else:
+            stats.add(profiler)
+    if stats is None:
+        profilers[0].dump_stats(output_path)
+    else:
+        stats.dump_stats(output_path)
+
+def _write_metadata(base, metadata, output_path, start):
+    metadata['duration'] = round(time.perf_counter() - start, 3)
+    metadata['output'] = os.path.basename(output_path)
+    with open(f"{base}.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
@@ -0,0 +1,287 @@
+import datetime
+import json
+import os
+import threading
+
+from retry import is_record_not_found
+
+POST_COLLECTION = 'app.bsky.feed.post'
+
+# Alfabeto base32 "sortable" dos TIDs do atproto
+TID_ALPHABET = "234567abcdefghijklmnopqrstuvwxyz"
+TID_LENGTH = 13
+
+# Clock id fixo nos TIDs gerados pelo migrador, para reconhecer os posts depois
+MIGRATOR_CLOCK_ID = 0x3A5
+
+# Época dos IDs "snowflake" do Twitter (ms) e menor ID nesse formato
+TWITTER_EPOCH_MS = 1288834974657
+SNOWFLAKE_MIN_ID = 1 << 40
+
+TWEET_DATE_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# Máximo de operações por chamada de applyWrites
+APPLY_WRITES_BATCH = 200
+
+# Texto presente em todos os footers do migrador
+MIGRATED_MARKER = "📱"
+
+# Espera máxima pelo tweet citado quando ele ainda está sendo postado
+QUOTE_WAIT_SECONDS = 120.0
+
+class CreatedAtClock:
+    """`createdAt` estritamente crescente, distribuído na ordem do arquivo
+
+    Com posts simultâneos, a ordem de criação no PDS não é a do arquivo; os
+    feeds ordenam pelo `createdAt` (quando anterior à indexação), então cada
+    tweet recebe o seu ao passar pela etapa de renderização, já em ordem.
+    """
+    def __init__(self):
+        self._last = None
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            if self._last is not None and now <= self._last:
+                now = self._last + datetime.timedelta(microseconds=1)
+            self._last = now
+        return now.isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
+def encode_tid(micros, clock_id=MIGRATOR_CLOCK_ID):
+    """Monta um TID a partir do timestamp em microssegundos e do clock id"""
+    value = ((micros & ((1 << 53) - 1)) << 10) | (clock_id & 0x3FF)
+    chars = []
+    for _ in range(TID_LENGTH):
+        chars.append(TID_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def decode_tid(tid):
+    """Retorna (timestamp em microssegundos, clock id) de um TID"""
+    value = 0
+    for char in tid:
+        value = (value << 5) | TID_ALPHABET.index(char)
+    return value >> 10, value & 0x3FF
+
+def tweet_rkey(tweet):
+    """rkey determinística do post de um tweet (TID com a data original)
+
+    O timestamp vem do ID snowflake (milissegundos) ou, em tweets antigos,
+    de `created_at`; o restante do ID preenche os microssegundos e desempata
+    tweets do mesmo instante. Sem ID ou data utilizável, retorna None (o PDS escolhe).
+    """
+    try:
+        tweet_id = int(tweet.get('id_str') or 0)
+        if tweet_id >= SNOWFLAKE_MIN_ID:
+            micros = ((tweet_id >> 22) + TWITTER_EPOCH_MS) * 1000 + (tweet_id & 0x3FFFFF) % 1000
+        else:
+            created = datetime.datetime.strptime(tweet.get('created_at'), TWEET_DATE_FORMAT)
+            micros = int(created.timestamp()) * 1_000_000 + tweet_id % 1_000_000
+    except (TypeError, ValueError):
+        return None
+    return encode_tid(micros) if tweet_id else None
+
+def is_migrated_post(rkey, text):
+    """Reconhece um post do migrador pelo clock id da rkey e pelo footer"""
+    try:
+        _, clock_id = decode_tid(rkey)
+    except ValueError:
+        return False
+    return len(rkey) == TID_LENGTH and clock_id == MIGRATOR_CLOCK_ID and MIGRATED_MARKER in (text or "")
+
+def rkey_from_uri(uri):
+    return uri.rsplit('/', 1)[-1]
+
+def list_migrated_posts(client, page_size=100):
+    """Lista as rkeys dos posts da conta que seguem o padrão do migrador"""
+    rkeys = []
+    cursor = None
+    while True:
+        params = {'repo': client.me.did, 'collection': POST_COLLECTION, 'limit': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.com.atproto.repo.list_records(params=params)
+        for record in response.records:
+            rkey = rkey_from_uri(record.uri)
+            if is_migrated_post(rkey, getattr(record.value, 'text', None)):
+                rkeys.append(rkey)
+        cursor = response.cursor
+        if not cursor or not response.records:
+            return rkeys
+
+def delete_posts(client, rkeys):
+    """Apaga um lote de posts com uma única chamada de applyWrites"""
+    return client.com.atproto.repo.apply_writes(data={
+        'repo': client.me.did,
+        'writes': [
+            {'$type': 'com.atproto.repo.applyWrites#delete', 'collection': POST_COLLECTION, 'rkey': rkey}
+            for rkey in rkeys
+        ]
+    })
+
+def delete_post(client, rkey):
+    """Apaga um único post (idempotente: não falha se ele já não existir)"""
+    return client.com.atproto.repo.delete_record(data={
+        'repo': client.me.did, 'collection': POST_COLLECTION, 'rkey': rkey
+    })
+
+def get_post(client, rkey):
+    """Registro do post com essa rkey, ou None se ele não existir"""
+    try:
+        return client.com.atproto.repo.get_record(params={
+            'repo': client.me.did, 'collection': POST_COLLECTION, 'rkey': rkey
+        })
+    except Exception as e:
+        if is_record_not_found(e):
+            return None
+        raise
+
+def quote_embed(record, media=None):
+    """Embed de citação do post `record` ({'uri', 'cid'}), com a mídia do post se houver"""
+    quoted = {'$type': 'app.bsky.embed.record',
+              'record': {'uri': record['uri'], 'cid': record['cid']}}
+    if media is None:
+        return quoted
+    return {'$type': 'app.bsky.embed.recordWithMedia', 'record': quoted, 'media': media}
+
+class RecordIndex:
+    """Índice id do tweet → {'uri', 'cid'} dos posts criados, para as citações
+
+    Usa o próprio dicionário de registros da sessão, que é gravado com ela e
+    completado pelo log de intenções ao retomar: a consulta é O(1) e vale
+    entre execuções. Tweets marcados com `expect` ainda estão a caminho da
+    postagem nesta execução; `lookup` espera o `finish` deles, para o tweet
+    citado ser postado antes de quem o cita mesmo com escritas simultâneas.
+    Os workers gravam registros com `index[id] = registro` e quem salva a
+    sessão usa `snapshot`, ambos sob a mesma trava.
+    """
+    def __init__(self, records):
+        self.records = records
+        self._pending = set()
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __setitem__(self, tweet_id, record):
+        with self._condition:
+            self.records[tweet_id] = record
+
+    def snapshot(self):
+        """Cópia dos registros, para gravar enquanto os workers postam"""
+        with self._condition:
+            return dict(self.records)
+
+    def expect(self, tweet_id):
+        with self._condition:
+            self._pending.add(tweet_id)
+
+    def finish(self, tweet_id):
+        with self._condition:
+            self._pending.discard(tweet_id)
+            self._condition.notify_all()
+
+    def lookup(self, tweet_id, timeout=QUOTE_WAIT_SECONDS):
+        """Registro do post do tweet, ou None se ele não foi (ou não será) migrado"""
+        with self._condition:
+            self._condition.wait_for(lambda: tweet_id not in self._pending, timeout)
+            return self.records.get(tweet_id)
+
+class IntentLog:
+    """Log de intenções de postagem (JSONL só de acréscimos, com fsync)
+
+    Antes de criar um post grava-se a intenção com a rkey planejada; depois,
+    a URI devolvida. Se o processo morrer entre a criação do post e o
+    salvamento da sessão, só as intenções ainda não refletidas na sessão são
+    conferidas no servidor ao retomar (uma consulta por rkey), no lugar de
+    uma busca de duplicados antes de cada tweet.
+    """
+    def __init__(self, handle):
+        self.path = f"intents_{handle.replace('.', '_')}.jsonl"
+
+    def _append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def begin(self, tweet_id, rkey):
+        self._append({'tweet_id': tweet_id, 'rkey': rkey, 'state': 'intent'})
+
+    def commit(self, tweet_id, uri, cid):
+        self._append({'tweet_id': tweet_id, 'state': 'done', 'uri': uri, 'cid': cid})
+
+    def entries(self):
+        """Último estado de cada tweet no log ({id do tweet: entrada})"""
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Linha cortada por uma queda no meio da escrita
+                    continue
+                previous = latest.get(entry['tweet_id'], {})
+                latest[entry['tweet_id']] = {**previous, **entry}
+        return latest
+
+    def recover(self, client, completed=()):
+        """Posts confirmados das intenções que a sessão ainda não registrou
+
+        Retorna {id do tweet: {'uri', 'cid'}}. Intenções sem URI são
+        conferidas pela rkey; as que não chegaram a criar o post são
+        descartadas e o tweet é postado de novo normalmente.
+        """
+        completed = set(completed)
+        recovered = {}
+        for tweet_id, entry in self.entries().items():
+            if tweet_id in completed:
+                continue
+            if entry['state'] == 'done':
+                recovered[tweet_id] = {'uri': entry['uri'], 'cid': entry['cid']}
+            elif entry.get('rkey'):
+                record = get_post(client, entry['rkey'])
+                if record is not None:
+                    recovered[tweet_id] = {'uri': record.uri, 'cid': record.cid}
+        return recovered
+
+    def reset(self):
+        """Esvazia o log depois que a sessão já contém tudo o que ele registrava"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class RollbackState:
+    """Rkeys ainda a apagar de um rollback, persistidas para retomada"""
+    def __init__(self, handle):
+        self.path = f"rollback_{handle.replace('.', '_')}.json"
+        self.pending = []
+        self.deleted = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.pending = state['pending']
+            self.deleted = state['deleted']
+
+    def start(self, rkeys):
+        self.pending = list(dict.fromkeys(rkeys))
+        self.deleted = 0
+        self.save()
+
+    def mark_deleted(self, rkeys):
+        done = set(rkeys)
+        self.pending = [rkey for rkey in self.pending if rkey not in done]
+        self.deleted += len(done)
+        self.save()
+
+    def finish(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pending': self.pending, 'deleted': self.deleted}, f)
+        os.replace(tmp_path, self.path)
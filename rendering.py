@@ -0,0 +1,447 @@
+import datetime
+import html
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from records import TWEET_DATE_FORMAT, tweet_rkey
+
+# Limites de um post no Bluesky (o app conta grafemas, o lexicon limita bytes)
+BSKY_CHAR_LIMIT = 300
+BSKY_BYTE_LIMIT = 3000
+
+# Abaixo disso não compensa subir um pool de processos
+PRERENDER_POOL_THRESHOLD = 2000
+
+MEDIA_PLACEHOLDER = "\n\n🖼️ [Imagem do tweet original]"
+# Vídeos e GIFs vão como embed de vídeo, sem indicação no texto
+VIDEO_MEDIA_TYPES = ('video', 'animated_gif')
+ELLIPSIS = "..."
+
+# Textos que fazem o tweet ser ignorado
+IGNORED_TEXTS = [
+    "usuários que não te seguem de volta encontrado!",
+    "Pergunte-me qualquer coisa"
+]
+
+# --- Contagem de grafemas (aproximação de UAX #29 sem dependências) ---
+
+_ZWJ = 0x200D
+# Caracteres que podem formar grafemas com mais de um code point
+_COMPLEX_CHARS = re.compile('[^\x00-\u02ff]|[\xa9\xae]')
+
+def _is_regional_indicator(cp):
+    return 0x1F1E6 <= cp <= 0x1F1FF
+
+def _is_pictographic(cp):
+    return (0x1F000 <= cp <= 0x1FAFF or 0x2600 <= cp <= 0x27BF or 0x2300 <= cp <= 0x23FF
+            or 0x2B00 <= cp <= 0x2BFF or cp in (0xA9, 0xAE, 0x203C, 0x2049, 0x2122, 0x2139,
+                                                  0x3030, 0x303D, 0x3297, 0x3299))
+
+def _is_extend(char, cp):
+    return (unicodedata.category(char) in ('Mn', 'Me', 'Mc')
+            or 0x1F3FB <= cp <= 0x1F3FF      # modificadores de tom de pele
+            or 0xE0020 <= cp <= 0xE007F      # tags (bandeiras de subdivisões)
+            or cp == _ZWJ)
+
+def _hangul_type(cp):
+    if 0x1100 <= cp <= 0x115F or 0xA960 <= cp <= 0xA97C:
+        return 'L'
+    if 0x1160 <= cp <= 0x11A7 or 0xD7B0 <= cp <= 0xD7C6:
+        return 'V'
+    if 0x11A8 <= cp <= 0x11FF or 0xD7CB <= cp <= 0xD7FB:
+        return 'T'
+    if 0xAC00 <= cp <= 0xD7A3:
+        return 'LV' if (cp - 0xAC00) % 28 == 0 else 'LVT'
+    return None
+
+_HANGUL_JOINS = {
+    'L': ('L', 'V', 'LV', 'LVT'),
+    'LV': ('V', 'T'), 'V': ('V', 'T'),
+    'LVT': ('T',), 'T': ('T',)
+}
+
+def _cluster_starts(text):
+    """Índices onde começa cada grafema estendido (emoji com ZWJ, bandeiras, acentos...)"""
+    prev_cp = None
+    prev_hangul = None
+    last_pictographic = False   # o caractere base do grafema atual é pictográfico
+    regional_count = 0
+    for index, char in enumerate(text):
+        cp = ord(char)
+        if cp < 0x300 and cp not in (0x0A, 0x0D, 0xA9, 0xAE):
+            # Caminho rápido: latim (inclusive acentuado) nunca se junta ao anterior
+            yield index
+            prev_cp, prev_hangul, last_pictographic, regional_count = cp, None, False, 0
+            continue
+
+        hangul = _hangul_type(cp)
+        joins = False
+        if prev_cp is not None:
+            if prev_cp == 0x0D and cp == 0x0A:
+                joins = True
+            elif prev_cp in (0x0A, 0x0D) or cp in (0x0A, 0x0D):
+                joins = False
+            elif _is_extend(char, cp):
+                joins = True
+            elif prev_cp == _ZWJ and last_pictographic and _is_pictographic(cp):
+                joins = True
+            elif _is_regional_indicator(cp) and _is_regional_indicator(prev_cp) and regional_count % 2 == 1:
+                joins = True
+            elif prev_hangul and hangul in _HANGUL_JOINS.get(prev_hangul, ()):
+                joins = True
+
+        if not joins:
+            yield index
+            last_pictographic = _is_pictographic(cp)
+
+        regional_count = regional_count + 1 if _is_regional_indicator(cp) else 0
+        prev_hangul = hangul
+        prev_cp = cp
+
+def iter_graphemes(text):
+    """Percorre o texto grafema a grafema"""
+    starts = list(_cluster_starts(text))
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        yield text[start:end]
+
+def grapheme_len(text):
+    """Conta grafemas como o Bluesky (texto sem emoji/combinações usa o caminho rápido)"""
+    if not _COMPLEX_CHARS.search(text):
+        return len(text) - text.count("\r\n")
+    return sum(1 for _ in _cluster_starts(text))
+
+def truncate_graphemes(text, max_graphemes, max_bytes=None):
+    """Corta o texto em no máximo `max_graphemes` grafemas (e `max_bytes` bytes UTF-8)"""
+    if not _COMPLEX_CHARS.search(text) and "\r" not in text:
+        # Caminho rápido: cada caractere é um grafema
+        text = text[:max_graphemes]
+        if max_bytes is not None:
+            text = text.encode('utf-8')[:max_bytes].decode('utf-8', errors='ignore')
+        return text
+    parts = []
+    size = 0
+    for count, cluster in enumerate(iter_graphemes(text)):
+        cluster_size = len(cluster.encode('utf-8'))
+        if count >= max_graphemes or (max_bytes is not None and size + cluster_size > max_bytes):
+            break
+        parts.append(cluster)
+        size += cluster_size
+    return "".join(parts)
+
+# --- Footers ---
+
+@lru_cache(maxsize=4096)
+def build_footers(created_at):
+    """Footers (completo, médio, mínimo) para a data do tweet, com tamanhos pré-calculados"""
+    try:
+        tweet_date = datetime.datetime.strptime(created_at, TWEET_DATE_FORMAT)
+        date_str = tweet_date.strftime("%d/%m/%Y às %H:%M")
+        footers = (
+            ('completo', f"\n\n📱 Post importado do Twitter\n📅 Publicado originalmente em {date_str}\n🔄 Migrado via script"),
+            ('medio', f"\n\n📱 Twitter • {date_str}"),
+            ('minimo', f"\n\n📱 {date_str}")
+        )
+    except (TypeError, ValueError):
+        footers = (
+            ('completo', "\n\n📱 Post importado do Twitter"),
+            ('medio', "\n\n📱 Twitter"),
+            ('minimo', "\n\n📱")
+        )
+    return tuple((name, footer, grapheme_len(footer), len(footer.encode('utf-8')))
+                 for name, footer in footers)
+
+# --- Expansão de links t.co ---
+
+TCO_PATTERN = re.compile(r"https?://t\.co/[A-Za-z0-9]+")
+DISPLAY_URL_LIMIT = 30
+
+def shorten_url(url, limit=DISPLAY_URL_LIMIT):
+    """Forma curta de exibição de uma URL (o facet continua apontando para a URL completa)"""
+    display = re.sub(r"^https?://(www\.)?", "", url)
+    if len(display) > limit:
+        display = display[:limit - len(ELLIPSIS)] + ELLIPSIS
+    return display
+
+def find_unresolved_links(tweet):
+    """Links t.co do texto que não aparecem nas entities do tweet"""
+    known = {url.get('url') for url in tweet.get('entities', {}).get('urls', [])}
+    known.update(media.get('url') for media in tweet.get('extended_entities', {}).get('media', []))
+    return {url for url in TCO_PATTERN.findall(tweet.get('full_text', '')) if url not in known}
+
+def _replace_link(text, short, replacement):
+    if TCO_PATTERN.fullmatch(short):
+        # Padrão já compilado: cada t.co é único, então um padrão por link
+        # estouraria o cache de regex e recompilaria a cada tweet
+        return TCO_PATTERN.sub(lambda match: replacement if match.group(0) == short else match.group(0), text)
+    return re.sub(re.escape(short) + r"(?![A-Za-z0-9])", lambda _: replacement, text)
+
+def expand_links(text, tweet, resolved_links=None):
+    """Troca os links t.co pelas URLs de destino
+
+    Usa `entities.urls[].expanded_url` do próprio arquivo e, para links fora
+    das entities, o mapa `resolved_links` (ver `links.TcoResolver`). O texto
+    mostra a forma curta da URL; as entities devolvidas apontam para a URL
+    completa, para o facet. Links das mídias são removidos do texto.
+    """
+    entities = dict(tweet.get('entities') or {})
+    urls = []
+    for url in entities.get('urls', []):
+        short, target = url.get('url'), url.get('expanded_url')
+        if short and target and short in text:
+            display = url.get('display_url') or shorten_url(target)
+            text = _replace_link(text, short, display)
+            urls.append({**url, 'url': display})
+        else:
+            urls.append(url)
+    for media in tweet.get('extended_entities', {}).get('media', []):
+        if media.get('url'):
+            text = _replace_link(text, media['url'], "").rstrip()
+    if resolved_links:
+        for short in TCO_PATTERN.findall(text):
+            target = resolved_links.get(short)
+            if target:
+                display = shorten_url(target)
+                text = _replace_link(text, short, display)
+                urls.append({'url': display, 'expanded_url': target, 'indices': [text.find(display)]})
+    entities['urls'] = urls
+    return text, entities
+
+# --- Facets (links, hashtags e menções clicáveis) ---
+
+TWITTER_PROFILE_URL = "https://twitter.com/{}"
+
+def _entity_needles(entities):
+    """Lista (posição no tweet, trecho a procurar, feature) a partir das entities"""
+    needles = []
+    for url in entities.get('urls', []):
+        if url.get('url'):
+            target = url.get('expanded_url') or url['url']
+            needles.append((url.get('indices', [0])[0], url['url'],
+                            {'$type': 'app.bsky.richtext.facet#link', 'uri': target}))
+    for hashtag in entities.get('hashtags', []):
+        tag = hashtag.get('text')
+        if tag and len(tag) <= 64:
+            needles.append((hashtag.get('indices', [0])[0], f"#{tag}",
+                            {'$type': 'app.bsky.richtext.facet#tag', 'tag': tag}))
+    for mention in entities.get('user_mentions', []):
+        screen_name = mention.get('screen_name')
+        if screen_name:
+            # Perfis do Twitter não têm DID; a menção vira link para o perfil original
+            needles.append((mention.get('indices', [0])[0], f"@{screen_name}",
+                            {'$type': 'app.bsky.richtext.facet#link',
+                             'uri': TWITTER_PROFILE_URL.format(screen_name)}))
+    needles.sort(key=lambda needle: int(needle[0]))
+    return needles
+
+def build_facets(text, entities):
+    """Gera os facets do post com offsets em bytes UTF-8, em uma única passada
+
+    As entities são localizadas em ordem no texto final (que pode ter sido
+    truncado ou ter entidades HTML decodificadas) e os offsets em caracteres
+    são convertidos para bytes avançando um cursor, sem recodificar o texto
+    para cada entidade.
+    """
+    if not entities:
+        return []
+
+    spans = []
+    cursor = 0
+    for _, needle, feature in _entity_needles(entities):
+        start = text.find(needle, cursor)
+        if start < 0:
+            start = text.find(needle)
+            if start < 0 or any(s < start + len(needle) and start < e for s, e, _ in spans):
+                continue
+        else:
+            cursor = start + len(needle)
+        spans.append((start, start + len(needle), feature))
+    spans.sort(key=lambda span: span[0])
+
+    facets = []
+    char_pos = 0
+    byte_pos = 0
+    for start, end, feature in spans:
+        byte_pos += len(text[char_pos:start].encode('utf-8'))
+        byte_start = byte_pos
+        byte_pos += len(text[start:end].encode('utf-8'))
+        char_pos = end
+        facets.append({
+            '$type': 'app.bsky.richtext.facet',
+            'index': {'byteStart': byte_start, 'byteEnd': byte_pos},
+            'features': [feature]
+        })
+    return facets
+
+# --- Citações (tweets que citam ou linkam outro tweet) ---
+
+STATUS_URL_PATTERN = re.compile(
+    r"^https?://(?:www\.|mobile\.)?(?:twitter|x)\.com/(?:[A-Za-z0-9_]+|i/web)/status(?:es)?/(\d+)"
+)
+
+def quoted_tweet_id(tweet, entities):
+    """ID do tweet citado (ou do último tweet linkado), ou None
+
+    O próprio arquivo só tem tweets do usuário, então só citações de tweets
+    dele têm um post correspondente na migração; as demais ficam como link.
+    """
+    quoted = tweet.get('quoted_status_id_str')
+    if quoted:
+        return quoted
+    for url in reversed(entities.get('urls', [])):
+        match = STATUS_URL_PATTERN.match(url.get('expanded_url') or '')
+        if match and match.group(1) != tweet.get('id_str'):
+            return match.group(1)
+    return None
+
+def quote_link(entities, quoted_id):
+    """Entity do link para o tweet citado (a última, como em `quoted_tweet_id`), ou None"""
+    for url in reversed(entities.get('urls', [])):
+        match = STATUS_URL_PATTERN.match(url.get('expanded_url') or '')
+        if match and match.group(1) == quoted_id:
+            return url
+    return None
+
+def remove_link(text, display):
+    """Tira do texto a última ocorrência de um link (forma exibida) e o espaço em volta"""
+    start = text.rfind(display)
+    if start < 0:
+        return text
+    before, after = text[:start].rstrip(), text[start + len(display):].lstrip()
+    return f"{before} {after}" if before and after else before or after
+
+# --- Etapa de renderização ---
+
+def primary_link(tweet, entities):
+    """URL principal do tweet para o card de link (tweets com mídia não têm card)"""
+    if tweet.get("extended_entities", {}).get("media"):
+        return None
+    for url in entities.get('urls', []):
+        if url.get('expanded_url'):
+            return url['expanded_url']
+    return None
+
+def skip_reason(tweet):
+    """Motivo para não migrar o tweet, ou None se ele deve ser postado"""
+    text = tweet.get("full_text", "")
+    if not text:
+        return "Tweet sem texto"
+    lowered = text.lower()
+    for texto in IGNORED_TEXTS:
+        if texto.lower() in lowered:
+            return f"Post ignorado: contém '{texto}'"
+    if tweet.get("retweeted"):
+        return "É um retweet"
+    if text.startswith("RT @"):
+        return "É um retweet (começa com RT @)"
+    if text.startswith("@"):
+        return "É uma resposta (começa com @)"
+    return None
+
+def render_tweet(tweet, limit=BSKY_CHAR_LIMIT, byte_limit=BSKY_BYTE_LIMIT, resolved_links=None):
+    """Transforma um tweet no texto final do post (função pura, sem rede)
+
+    Escolhe o maior footer que cabe no limite de grafemas e, se nada couber,
+    trunca o texto com o footer mínimo. Links t.co são expandidos antes da
+    contagem (`resolved_links` cobre os que não estão nas entities) e os
+    facets já saem prontos com offsets em bytes. Em citações, `quote_text` e
+    `quote_facets` são o texto e os facets sem o link do tweet citado, para
+    quando o post sair com o embed da citação.
+    """
+    rendered = {
+        'id': tweet.get('id_str'),
+        'action': 'skip',
+        'reason': skip_reason(tweet),
+        'text': '',
+        'footer': '',
+        'footer_kind': None,
+        'graphemes': 0,
+        'bytes': 0,
+        'truncated': False,
+        'facets': [],
+        'link': None,
+        'video': False,
+        'quote': None,
+        'quote_text': None,
+        'quote_facets': None,
+        'rkey': None
+    }
+    if rendered['reason']:
+        return rendered
+
+    text = html.unescape(tweet.get("full_text", ""))
+    text, entities = expand_links(text, tweet, resolved_links)
+    media = tweet.get("extended_entities", {}).get("media", [])
+    rendered['video'] = any(item.get('type') in VIDEO_MEDIA_TYPES for item in media)
+    if media and not rendered['video']:
+        text += MEDIA_PLACEHOLDER
+
+    text_len = grapheme_len(text)
+    text_bytes = len(text.encode('utf-8'))
+    footers = build_footers(tweet.get("created_at"))
+    for kind, footer, footer_len, footer_bytes in footers:
+        if text_len + footer_len <= limit and text_bytes + footer_bytes <= byte_limit:
+            break
+    else:
+        # Se ainda assim não couber, truncar o texto
+        kind, footer, footer_len, footer_bytes = footers[-1]
+        text = truncate_graphemes(
+            text, limit - footer_len - len(ELLIPSIS), byte_limit - footer_bytes - len(ELLIPSIS)
+        ) + ELLIPSIS
+        rendered['truncated'] = True
+        text_len = grapheme_len(text)
+
+    full_text = text + footer
+    quote = quoted_tweet_id(tweet, entities)
+    link = quote_link(entities, quote) if quote else None
+    if link and link.get('url'):
+        quote_text = remove_link(text, link['url']) + footer
+        quote_entities = {**entities, 'urls': [url for url in entities['urls'] if url is not link]}
+        rendered['quote_text'] = quote_text
+        rendered['quote_facets'] = build_facets(quote_text, quote_entities)
+    rendered.update({
+        'action': 'post',
+        'reason': None,
+        'text': full_text,
+        'footer': footer,
+        'footer_kind': kind,
+        'graphemes': text_len + footer_len,
+        'bytes': len(full_text.encode('utf-8')),
+        'facets': build_facets(full_text, entities),
+        'link': primary_link(tweet, entities),
+        'quote': quote,
+        'rkey': tweet_rkey(tweet)
+    })
+    return rendered
+
+# Links resolvidos, repassados uma vez para cada processo do pool
+_worker_resolved_links = None
+
+def _init_render_worker(resolved_links):
+    global _worker_resolved_links
+    _worker_resolved_links = resolved_links
+
+def _render_entry(tweet_data):
+    return render_tweet(tweet_data.get('tweet') or {}, resolved_links=_worker_resolved_links)
+
+def find_all_unresolved_links(tweets):
+    """Todos os links t.co do arquivo que precisam de resolução externa"""
+    links = set()
+    for tweet_data in tweets:
+        links |= find_unresolved_links(tweet_data.get('tweet') or {})
+    return links
+
+def prerender_tweets(tweets, workers=None, chunksize=256, resolved_links=None):
+    """Renderiza todo o arquivo antes da postagem, em paralelo quando vale a pena
+
+    Recebe a lista no formato do arquivo ({'tweet': {...}}) e devolve os posts
+    renderizados na mesma ordem.
+    """
+    if len(tweets) < PRERENDER_POOL_THRESHOLD or workers == 1:
+        _init_render_worker(resolved_links)
+        return [_render_entry(tweet_data) for tweet_data in tweets]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_render_worker, initargs=(resolved_links,)) as pool:
+        return list(pool.map(_render_entry, tweets, chunksize=chunksize))
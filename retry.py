@@ -0,0 +1,178 @@
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+# Classes de erro
+ERROR_RATE_LIMIT = 'rate_limit'
+ERROR_AUTH_EXPIRED = 'auth_expired'
+ERROR_TRANSIENT = 'transient'
+ERROR_PERMANENT = 'permanent'
+
+# Política por classe: (atraso base em s, atraso máximo em s, tentativas)
+RETRY_POLICIES = {
+    ERROR_RATE_LIMIT: (30.0, 900.0, 8),
+    ERROR_AUTH_EXPIRED: (1.0, 5.0, 2),
+    ERROR_TRANSIENT: (2.0, 120.0, 5),
+    ERROR_PERMANENT: (0.0, 0.0, 0)
+}
+
+_AUTH_ERRORS = {'ExpiredToken', 'InvalidToken', 'AuthMissing', 'AuthenticationRequired'}
+_TRANSIENT_STATUS = {408, 425, 500, 502, 503, 504}
+_TRANSIENT_TYPES = {'NetworkError', 'InvokeTimeoutError', 'ConnectError', 'ReadTimeout',
+                    'WriteTimeout', 'PoolTimeout', 'RemoteProtocolError'}
+_PERMANENT_TYPES = {'ModelError', 'ValueError', 'TypeError', 'KeyError', 'AttributeError', 'UnicodeError'}
+
+class RetryExhausted(Exception):
+    """Erro final de uma chamada, já classificado"""
+    def __init__(self, kind, cause, attempts):
+        super().__init__(str(cause))
+        self.kind = kind
+        self.cause = cause
+        self.attempts = attempts
+
+def _response(exc):
+    response = getattr(exc, 'response', None)
+    if response is None and exc.args and hasattr(exc.args[0], 'status_code'):
+        response = exc.args[0]
+    return response
+
+def _error_name(response):
+    content = getattr(response, 'content', None)
+    if isinstance(content, dict):
+        return content.get('error')
+    return getattr(content, 'error', None)
+
+def _error_text(response):
+    """Nome e mensagem do erro XRPC, em minúsculas"""
+    content = getattr(response, 'content', None)
+    if isinstance(content, dict):
+        return f"{content.get('error')} {content.get('message')}".lower()
+    return f"{getattr(content, 'error', '')} {getattr(content, 'message', '')}".lower()
+
+def is_record_conflict(exc):
+    """O PDS recusou a criação porque já existe um registro com a mesma rkey"""
+    response = _response(exc)
+    if getattr(response, 'status_code', None) not in (400, 409):
+        return False
+    text = _error_text(response)
+    return 'already exists' in text or 'already a value' in text
+
+def is_record_not_found(exc):
+    response = _response(exc)
+    return getattr(response, 'status_code', None) in (400, 404) and (
+        _error_name(response) == 'RecordNotFound' or 'not found' in _error_text(response))
+
+def classify_error(exc):
+    """Classifica uma exceção da API em rate_limit, auth_expired, transient ou permanent"""
+    response = _response(exc)
+    status = getattr(response, 'status_code', None)
+    error_name = _error_name(response) if response is not None else None
+
+    if status == 429 or error_name == 'RateLimitExceeded':
+        return ERROR_RATE_LIMIT
+    if status == 401 or error_name in _AUTH_ERRORS:
+        return ERROR_AUTH_EXPIRED
+    if status in _TRANSIENT_STATUS:
+        return ERROR_TRANSIENT
+    if status is not None and 400 <= status < 500:
+        return ERROR_PERMANENT
+
+    type_names = {cls.__name__ for cls in type(exc).__mro__}
+    if type_names & _TRANSIENT_TYPES or isinstance(exc, (ConnectionError, TimeoutError)):
+        return ERROR_TRANSIENT
+    if type_names & _PERMANENT_TYPES:
+        return ERROR_PERMANENT
+    return ERROR_TRANSIENT
+
+def _rate_limit_reset(exc):
+    """Segundos até o fim da janela de rate limit, pelo header `ratelimit-reset`"""
+    headers = getattr(_response(exc), 'headers', None) or {}
+    reset = headers.get('ratelimit-reset') or headers.get('RateLimit-Reset')
+    try:
+        return max(0.0, float(reset) - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(kind, attempt, exc=None):
+    """Atraso com "full jitter" para a tentativa `attempt` (0 = primeira repetição)"""
+    base, cap, _ = RETRY_POLICIES[kind]
+    if kind == ERROR_RATE_LIMIT and exc is not None:
+        reset = _rate_limit_reset(exc)
+        if reset is not None:
+            return min(cap, reset) + random.uniform(0, base / 10)
+    return random.uniform(base / 2, min(cap, base * (2 ** attempt)))
+
+def call_with_retry(func, reauth=None, on_retry=None, sleep=time.sleep):
+    """Executa `func` repetindo conforme a classe do erro.
+
+    Em `auth_expired` chama `reauth()` antes de repetir. Erros permanentes ou
+    tentativas esgotadas viram `RetryExhausted` com a classe do erro.
+    """
+    attempts = {}
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            kind = classify_error(e)
+            attempt = attempts.get(kind, 0)
+            if attempt >= RETRY_POLICIES[kind][2] or (kind == ERROR_AUTH_EXPIRED and not reauth):
+                raise RetryExhausted(kind, e, sum(attempts.values()) + 1) from e
+            attempts[kind] = attempt + 1
+
+            delay = backoff_delay(kind, attempt, e)
+            if on_retry:
+                on_retry(kind, attempt + 1, delay, e)
+            sleep(delay)
+            if kind == ERROR_AUTH_EXPIRED:
+                reauth()
+
+class DeadLetterQueue:
+    """Tabela de tweets que falharam de forma definitiva, para nova tentativa isolada
+
+    Segura para os workers de postagem em paralelo: alterações e gravação
+    acontecem sob a mesma trava.
+    """
+    def __init__(self, handle):
+        self.path = f"dead_letter_{handle.replace('.', '_')}.json"
+        self.entries = {}
+        self._lock = threading.RLock()
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, tweet, reason, kind=ERROR_PERMANENT, attempts=1):
+        tweet_id = tweet.get('id_str')
+        with self._lock:
+            previous = self.entries.get(tweet_id, {})
+            self.entries[tweet_id] = {
+                'tweet': tweet,
+                'reason': reason,
+                'kind': kind,
+                'attempts': previous.get('attempts', 0) + attempts,
+                'failed_at': datetime.datetime.now().isoformat()
+            }
+            self.save()
+
+    def remove(self, tweet_id):
+        with self._lock:
+            if self.entries.pop(tweet_id, None) is not None:
+                self.save()
+
+    def tweets(self):
+        with self._lock:
+            return [entry['tweet'] for entry in self.entries.values()]
+
+    def save(self):
+        # Temporário próprio de cada gravação: outro processo (CLI e interface)
+        # pode estar gravando o mesmo arquivo
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
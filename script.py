@@ -1,508 +1,1298 @@
-import json
-import datetime
-import time
-import os
-from atproto import Client
-import logging
-import pickle
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='import_log.txt'
-)
-logger = logging.getLogger(__name__)
-
-# Arquivo para salvar progresso
-PROGRESS_FILE = "import_progress.pkl"
-
-class ImportProgress:
-    def __init__(self):
-        self.completed_tweets = []
-        self.last_index = 0
-        self.total_tweets = 0
-        
-    def save(self):
-        with open(PROGRESS_FILE, 'wb') as f:
-            pickle.dump(self, f)
-    
-    @staticmethod
-    def load():
-        try:
-            with open(PROGRESS_FILE, 'rb') as f:
-                return pickle.load(f)
-        except:
-            return ImportProgress()
-
-# Remover credenciais hardcoded
-BSKY_CHAR_LIMIT = 300
-
-def test_auth(handle, password):
-    """Testa autenticação com credenciais fornecidas"""
-    try:
-        client = Client()
-        clean_handle = handle.strip()
-        clean_password = password.strip()
-        
-        logger.info(f"Tentando conexão com Bluesky usando handle: {clean_handle}")
-        response = client.login(clean_handle, clean_password)
-        
-        if response and hasattr(response, 'success') and not response.success:
-            raise Exception("Login falhou - resposta indica falha")
-            
-        logger.info("Login bem-sucedido!")
-        return client
-    except Exception as e:
-        logger.error(f"Erro na autenticação: {str(e)}")
-        return None
-
-def load_tweets(file_path):
-    """Carrega tweets de um arquivo JSON exportado e ordena por data."""
-    try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-            
-        print(f"Carregando tweets de: {file_path}")
-        with open(file_path, encoding="utf-8") as f:
-            content = f.read().replace("window.YTD.tweets.part0 = ", "")
-            tweets = json.loads(content)
-            
-        # Ordenar tweets por data (mais antigo primeiro)
-        tweets.sort(key=lambda x: datetime.datetime.strptime(
-            x['tweet']['created_at'], 
-            "%a %b %d %H:%M:%S %z %Y"
-        ))
-        
-        print(f"Carregados e ordenados {len(tweets)} tweets (do mais antigo ao mais novo)")
-        return tweets
-    except Exception as e:
-        print(f"Erro ao carregar tweets: {e}")
-        return []
-
-def truncate_text(text, limit):
-    """Trunca texto para caber no limite de caracteres do Bluesky."""
-    if len(text) > limit:
-        return text[:limit - 3] + "..."
-    return text
-
-def check_duplicate_post(client, text, limit=100):
-    """Verifica se o texto já foi postado no Bluesky"""
-    try:
-        # Buscar posts recentes do usuário
-        response = client.get_author_feed(client.me.did, limit=limit)
-        posts = response.feed
-        
-        # Limpar texto para comparação
-        clean_text = text.lower().strip()
-        
-        # Verificar cada post
-        for post in posts:
-            existing_text = post.post.record.text.lower().strip()
-            # Remover footers para comparação
-            existing_text = existing_text.split("\n\n📱")[0].strip()
-            clean_text = clean_text.split("\n\n📱")[0].strip()
-            
-            if clean_text in existing_text or existing_text in clean_text:
-                return True
-                
-        return False
-    except Exception as e:
-        logger.error(f"Erro ao verificar posts duplicados: {e}")
-        return False
-
-def post_tweet_to_bsky(client, tweet, simulate=False):
-    """Posta um tweet com mídia (se disponível) no BlueSky."""
-    text = tweet.get("full_text", "")
-    
-    print(f"\nAnalisando tweet: {text[:100]}...")
-    
-    # Verificar se já foi postado
-    if check_duplicate_post(client, text):
-        return False, "Tweet já foi postado anteriormente no Bluesky"
-    
-    # Verificações iniciais
-    if not text:
-        return False, "Tweet sem texto"
-        
-    # Novas verificações para ignorar posts específicos
-    textos_ignorados = [
-        "usuários que não te seguem de volta encontrado!",
-        "Pergunte-me qualquer coisa"
-    ]
-    
-    for texto in textos_ignorados:
-        if texto.lower() in text.lower():
-            return False, f"Post ignorado: contém '{texto}'"
-            
-    if tweet.get("retweeted"):
-        return False, "É um retweet"
-    if text.startswith("RT @"):
-        return False, "É um retweet (começa com RT @)"
-    if text.startswith("@"):
-        return False, "É uma resposta (começa com @)"
-
-    # Verificar se há mídia
-    media_entities = tweet.get("extended_entities", {}).get("media", [])
-    has_media = bool(media_entities)
-    
-    if has_media:
-        print(f"📷 Tweet contém {len(media_entities)} mídia(s)")
-        try:
-            # Tentar fazer upload da primeira mídia apenas
-            media = media_entities[0]
-            media_url = media.get("media_url_https")
-            if media_url:
-                print(f"🔄 Tentando fazer upload da mídia: {media_url}")
-                # Aqui você implementaria o upload da mídia
-                # Por enquanto, vamos apenas indicar que há mídia
-                text = f"{text}\n\n🖼️ [Imagem do tweet original]"
-        except Exception as e:
-            print(f"⚠️ Erro ao processar mídia: {e}")
-
-    # Criar footers com diferentes tamanhos
-    try:
-        tweet_date = datetime.datetime.strptime(tweet.get("created_at"), "%a %b %d %H:%M:%S %z %Y")
-        date_str = tweet_date.strftime("%d/%m/%Y às %H:%M")
-        
-        # Footer completo
-        footer_completo = f"\n\n📱 Post importado do Twitter\n📅 Publicado originalmente em {date_str}\n🔄 Migrado via script"
-        
-        # Footer médio
-        footer_medio = f"\n\n📱 Twitter • {date_str}"
-        
-        # Footer mínimo
-        footer_minimo = f"\n\n📱 {date_str}"
-        
-    except:
-        footer_completo = "\n\n📱 Post importado do Twitter"
-        footer_medio = "\n\n📱 Twitter"
-        footer_minimo = "\n\n📱"
-
-    # Tentar usar o footer mais apropriado baseado no espaço disponível
-    if len(text) <= BSKY_CHAR_LIMIT - len(footer_completo):
-        footer = footer_completo
-        full_text = text + footer
-    elif len(text) <= BSKY_CHAR_LIMIT - len(footer_medio):
-        footer = footer_medio
-        full_text = text + footer
-    elif len(text) <= BSKY_CHAR_LIMIT - len(footer_minimo):
-        footer = footer_minimo
-        full_text = text + footer
-    else:
-        # Se ainda assim não couber, truncar o texto
-        text = text[:BSKY_CHAR_LIMIT - len(footer_minimo) - 3] + "..."
-        full_text = text + footer_minimo
-
-    try:
-        if simulate:
-            print(f"[SIMULAÇÃO] Postando:\n{full_text}")
-        else:
-            client.post(text=full_text)
-            print(f"✅ Postado com sucesso:\n{full_text}")
-        return True, "Sucesso"
-    except AttributeError:
-        print("⚠️ Erro: Método de postagem não encontrado. Tentando método alternativo...")
-        try:
-            # Método alternativo de postagem
-            client.com.atproto.repo.create_record(
-                collection='app.bsky.feed.post',
-                repo=client.me.did,
-                record={
-                    'text': full_text,
-                    'createdAt': datetime.datetime.now().isoformat(),
-                    '$type': 'app.bsky.feed.post'
-                }
-            )
-            print(f"✅ Postado com sucesso (método alternativo): {full_text}")
-            return True, "Sucesso (método alternativo)"
-        except Exception as e:
-            reason = f"Erro no método alternativo: {str(e)}"
-            print(f"❌ {reason}")
-            return False, reason
-    except Exception as e:
-        reason = f"Erro ao postar: {str(e)}"
-        print(f"❌ {reason}")
-        return False, reason
-
-def upload_old_tweets(client, tweets, callback=None, simulate=False, batch_size=50):
-    """Faz upload de tweets com suporte a retomada"""
-    progress = ImportProgress.load()
-    
-    if progress.total_tweets != len(tweets):
-        progress.total_tweets = len(tweets)
-        progress.last_index = 0
-        progress.completed_tweets = []
-    
-    start_index = progress.last_index
-    total_tweets = len(tweets)
-    
-    try:
-        while start_index < total_tweets:
-            end_index = min(start_index + batch_size, total_tweets)
-            current_batch = tweets[start_index:end_index]
-            
-            for index, tweet_data in enumerate(current_batch):
-                current_position = start_index + index + 1
-                
-                # Pular tweets já processados
-                if tweet_data in progress.completed_tweets:
-                    continue
-                    
-                try:
-                    tweet = tweet_data.get("tweet")
-                    if not tweet:
-                        continue
-                        
-                    progress_pct = (current_position / total_tweets) * 100
-                    
-                    success, reason = post_tweet_to_bsky(client, tweet, simulate=simulate)
-                    
-                    if success:
-                        progress.completed_tweets.append(tweet_data)
-                        progress.last_index = current_position
-                        progress.save()
-                    
-                    if callback:
-                        callback(progress_pct, success, reason)
-                    
-                    time.sleep(3 if success else 5)
-                        
-                except Exception as e:
-                    logger.error(f"Erro ao processar tweet {current_position}: {e}")
-                    time.sleep(10)
-                    continue
-            
-            start_index += batch_size
-            if start_index < total_tweets:
-                time.sleep(60)
-                
-    except KeyboardInterrupt:
-        progress.save()
-        logger.info(f"Processo interrompido. Progresso salvo no tweet {current_position}")
-        return progress
-    
-    return progress
-
-def filter_tweets(tweets, keyword=None, start_date=None, end_date=None):
-    """Filtra tweets por palavra-chave ou intervalo de datas."""
-    filtered = []
-    for tweet_data in tweets:
-        tweet = tweet_data.get("tweet")
-        if not tweet:
-            continue
-        if keyword and keyword not in tweet.get("full_text", ""):
-            continue
-        if start_date or end_date:
-            tweet_date = datetime.datetime.strptime(tweet.get("created_at"), "%a %b %d %H:%M:%S %z %Y")
-            if start_date and tweet_date < start_date:
-                continue
-            if end_date and tweet_date > end_date:
-                continue
-        filtered.append(tweet_data)
-    return filtered
-
-def warning():
-    """Exibe um aviso antes de executar o script."""
-    print("\nAVISO: Este script pode SPAMAR as timelines dos seus seguidores.")
-    print("Recomenda-se usar uma conta nova.")
-    response = input("Digite [EU ENTENDO] para continuar: ")
-    if (response.strip() != "EU ENTENDO"):
-        print("Saindo...")
-        exit()
-
-def create_session_file(tweets_path, handle):
-    """Cria/atualiza arquivo de sessão para retomada"""
-    session_file = f"session_{handle.replace('.', '_')}.json"
-    if os.path.exists(session_file):
-        with open(session_file, 'r') as f:
-            return json.load(f)
-    return {
-        'tweets_path': tweets_path,
-        'last_index': 0,
-        'completed': [],
-        'total': 0
-    }
-
-def save_session(session_data, handle):
-    """Salva estado da sessão"""
-    session_file = f"session_{handle.replace('.', '_')}.json"
-    with open(session_file, 'w') as f:
-        json.dump(session_data, f)
-
-class RateLimiter:
-    def __init__(self):
-        self.base_delay = 1.0  # Reduzido para 1 segundo
-        self.current_delay = 1.0
-        self.max_delay = 5.0   # Reduzido para 5 segundos
-        self.min_delay = 0.5   # Reduzido para 0.5 segundos
-        self.success_count = 0
-        self.error_count = 0
-        
-    def adapt_delay(self, success):
-        if success:
-            self.success_count += 1
-            self.error_count = 0
-            # Reduz o delay após 3 sucessos consecutivos
-            if self.success_count >= 3:
-                self.current_delay = max(self.min_delay, self.current_delay * 0.7)
-                self.success_count = 0
-        else:
-            self.error_count += 1
-            self.success_count = 0
-            # Aumenta o delay em caso de erro
-            self.current_delay = min(self.max_delay, self.current_delay * 1.2)
-            
-    def wait(self):
-        time.sleep(self.current_delay)
-
-def resume_import(handle, password, tweets_path, callback=None):
-    """Função principal de importação com suporte a retomada"""
-    session = create_session_file(tweets_path, handle)
-    rate_limiter = RateLimiter()
-    
-    try:
-        client = test_auth(handle, password)
-        if not client:
-            return False, "Falha na autenticação"
-
-        tweets = load_tweets(tweets_path)
-        if not tweets:
-            return False, "Nenhum tweet encontrado"
-
-        total_tweets = len(tweets)
-        
-        # Notificar total inicial
-        if callback:
-            callback(0, True, {
-                'text': '',
-                'status': 'Iniciando',
-                'current': session['last_index'],
-                'total': total_tweets,
-                'analyzing': True
-            })
-
-        logger.info(f"Retomando importação a partir do índice {session['last_index']} de {total_tweets} tweets")
-        
-        for i in range(session['last_index'], total_tweets):
-            # Verificar flag de parada
-            if getattr(callback, 'stop_requested', False):
-                logger.info(f"Parada solicitada no índice {i}")
-                session['last_index'] = i
-                save_session(session, handle)
-                return True, "Importação pausada pelo usuário"
-
-            try:
-                tweet = tweets[i]['tweet']
-                text = tweet.get('full_text', '')
-                current_position = i + 1
-                
-                # Notificar análise
-                if callback:
-                    callback(
-                        ((current_position) / total_tweets) * 100,
-                        True,
-                        {
-                            'text': text,
-                            'status': 'Analisando',
-                            'current': current_position,
-                            'total': total_tweets,
-                            'analyzing': True
-                        }
-                    )
-                
-                # Verificações de skip
-                if any(check in text.lower() for check in ['rt @', '@', 'pergunte-me']):
-                    reason = "É um retweet" if 'rt @' in text.lower() else \
-                            "É uma resposta" if text.startswith('@') else \
-                            "Post ignorado: contém 'Pergunte-me qualquer coisa'"
-                    if callback:
-                        callback(((i + 1) / len(tweets)) * 100, False, reason)
-                    continue
-
-                # Rate limiting adaptativo
-                rate_limiter.wait()
-                
-                success, reason = post_tweet_to_bsky(client, tweet)
-                rate_limiter.adapt_delay(success)
-                
-                # Callback com informações completas
-                if callback:
-                    callback(((i + 1) / len(tweets)) * 100, success, {
-                        'text': text,
-                        'status': reason,
-                        'delay': rate_limiter.current_delay,
-                        'footer': f"\n\n📱 Post importado do Twitter\n📅 {datetime.datetime.now().strftime('%d/%m/%Y às %H:%M')}\n🔄 Migrado via script"
-                    })
-
-                if success:
-                    session['completed'].append(tweet.get('id_str'))
-                    session['last_index'] = i + 1  # Incrementar após sucesso
-                    save_session(session, handle)
-
-            except Exception as e:
-                logger.error(f"Erro no tweet {i}: {str(e)}")
-                if callback:
-                    callback(
-                        ((i + 1) / total_tweets) * 100,
-                        False,
-                        {
-                            'error': str(e),
-                            'current': i + 1,
-                            'total': total_tweets
-                        }
-                    )
-                continue
-
-        return True, "Importação concluída"
-
-    except Exception as e:
-        logger.error(f"Erro na importação: {str(e)}")
-        return False, str(e)
-
-def main():
-    """Função principal do script."""
-    warning()
-
-    # Verificações iniciais
-    handle = input("Digite seu handle do Bluesky: ")
-    password = input("Digite seu App Password do Bluesky: ")
-
-    if not handle or not password:
-        print("Handle ou App Password não configurados!")
-        return
-
-    # Testar autenticação primeiro
-    print("\nTestando autenticação...")
-    client = test_auth(handle, password)
-    if not client:
-        print("Falha na autenticação. Verifique suas credenciais.")
-        return
-
-    tweets = load_tweets(TWEETS_JS_PATH)
-    if not tweets:
-        print("Nenhum tweet encontrado. Verifique o arquivo e tente novamente.")
-        return
-
-    # Filtrar tweets (opcional)
-    start_date = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
-    filtered_tweets = filter_tweets(tweets)  # Removido filtro de keyword para teste
-    
-    print(f"\nTweets ordenados do mais antigo ({filtered_tweets[0]['tweet']['created_at']})")
-    print(f"para o mais novo ({filtered_tweets[-1]['tweet']['created_at']})")
-
-    # Alterado para False para postar de verdade
-    simulate_mode = False
-    
-    # Confirmação final antes de começar
-    if not simulate_mode:
-        print("\nMODO DE POSTAGEM REAL ATIVADO!")
-        confirm = input("Digite [POSTAR] para começar a postar de verdade: ")
-        if confirm.strip() != "POSTAR":
-            print("Operação cancelada.")
-            return
-    
-    upload_old_tweets(client, filtered_tweets, simulate=simulate_mode, batch_size=100)
-
-if __name__ == "__main__":
+import json
+import datetime
+import hashlib
+import time
+import os
+import logging
+import logging.handlers
+import pickle
+import argparse
+import atexit
+import multiprocessing
+import queue
+import sys
+from metrics import Metrics, NULL_METRICS, METRICS_FILE
+from pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage
+from plan import PLAN_FILE, apply_plan, load_plan, write_plan_entries
+from profiling import PROFILE_MODES, profile_call
+from rendering import BSKY_CHAR_LIMIT, find_all_unresolved_links, render_tweet
+from concurrency import AIMD_MAX_LIMIT, NULL_CONCURRENCY, AdaptiveConcurrency
+from archive import load_new_tweets, update_watermark, watermark_from_tweets
+from dedup import DEFAULT_SIMILARITY, DuplicateIndex
+from links import LINK_CARD_LOOKAHEAD, LinkCardPrefetcher, TcoResolver
+from media import VIDEO_LOOKAHEAD, VIDEO_WORKERS, VideoProcessor, archive_media_dir
+from records import (APPLY_WRITES_BATCH, CreatedAtClock, IntentLog, RecordIndex, RollbackState,
+                     delete_post, delete_posts, get_post, list_migrated_posts, quote_embed, rkey_from_uri)
+from search import load_selection
+from shards import ShardedArchive
+from transport import STATS as HTTP_STATS, shared_request
+from retry import (ERROR_PERMANENT, DeadLetterQueue, RetryExhausted, backoff_delay,
+                   call_with_retry, classify_error, is_record_conflict)
+
+# Arquivo de log (perfis de execução são gravados no mesmo diretório)
+LOG_FILE = 'import_log.txt'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Níveis de verbosidade do terminal
+VERBOSITY_QUIET = 0    # apenas avisos e erros
+VERBOSITY_NORMAL = 1   # resumo da importação, sem eco por tweet
+VERBOSITY_VERBOSE = 2  # eco completo de cada tweet analisado/postado
+
+_CONSOLE_LEVELS = {
+    VERBOSITY_QUIET: logging.WARNING,
+    VERBOSITY_NORMAL: logging.INFO,
+    VERBOSITY_VERBOSE: logging.DEBUG
+}
+
+# Atributos padrão de um LogRecord (o resto vai como campo extra no JSON)
+_RESERVED_LOG_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message'}
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON"""
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_LOG_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _ConsoleFilter(logging.Filter):
+    """Separa as mensagens de terminal das do arquivo"""
+    def __init__(self, console):
+        super().__init__()
+        self.console = console
+
+    def filter(self, record):
+        return record.name.startswith(f"{__name__}.console") == self.console
+
+_log_listener = None
+
+def setup_logging(verbosity=VERBOSITY_VERBOSE, log_file=LOG_FILE):
+    """Configura o logging assíncrono: a thread de postagem apenas enfileira.
+
+    Um QueueListener em segundo plano grava no arquivo (JSON lines com rotação)
+    e escreve no terminal conforme a verbosidade.
+    """
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+    file_handler.addFilter(_ConsoleFilter(console=False))
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(message)s'))
+    console_handler.addFilter(_ConsoleFilter(console=True))
+
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    set_verbosity(verbosity)
+
+    _log_listener.start()
+    return _log_listener
+
+def set_verbosity(verbosity):
+    """Ajusta o quanto é ecoado no terminal (o arquivo de log não muda)"""
+    console.setLevel(_CONSOLE_LEVELS.get(verbosity, logging.DEBUG))
+
+def shutdown_logging():
+    """Esvazia a fila de log e encerra a thread de escrita"""
+    global _log_listener
+    if _log_listener:
+        _log_listener.stop()
+        _log_listener = None
+
+logger = logging.getLogger(__name__)
+# Mensagens para o terminal; o eco por tweet usa DEBUG
+console = logging.getLogger(f"{__name__}.console")
+# Processos auxiliares (pool de renderização) não abrem o arquivo de log
+if multiprocessing.parent_process() is None:
+    setup_logging()
+    atexit.register(shutdown_logging)
+
+# Arquivo para salvar progresso
+PROGRESS_FILE = "import_progress.pkl"
+
+# Intervalo mínimo entre gravações da sessão durante a importação; posts
+# criados nesse intervalo são recuperados pelo log de intenções após uma queda
+SESSION_SAVE_SECONDS = 5.0
+
+class ImportProgress:
+    def __init__(self):
+        self.completed_tweets = []
+        self.last_index = 0
+        self.total_tweets = 0
+        self.records = {}
+        
+    def save(self):
+        with open(PROGRESS_FILE, 'wb') as f:
+            pickle.dump(self, f)
+    
+    @staticmethod
+    def load():
+        try:
+            with open(PROGRESS_FILE, 'rb') as f:
+                progress = pickle.load(f)
+            # Progressos gravados antes do registro de URIs
+            progress.__dict__.setdefault('records', {})
+            return progress
+        except:
+            return ImportProgress()
+
+# Arquivo de tweets usado pelo modo terminal quando nenhum caminho é informado
+TWEETS_JS_PATH = "tweets.js"
+
+def create_client():
+    """Cria o cliente do Bluesky
+
+    O atproto (com todos os modelos gerados) leva quase um segundo para
+    importar, então só é carregado no primeiro login, e não ao abrir a
+    interface ou o script. Cada cliente tem o seu `Request` (sessão própria),
+    todos sobre o pool HTTP compartilhado (`transport.shared_request`), com
+    keep-alive.
+    """
+    from atproto import Client
+    return Client(request=shared_request())
+
+def test_auth(handle, password):
+    """Testa autenticação com credenciais fornecidas"""
+    try:
+        client = create_client()
+        clean_handle = handle.strip()
+        clean_password = password.strip()
+        
+        logger.info(f"Tentando conexão com Bluesky usando handle: {clean_handle}")
+        response = client.login(clean_handle, clean_password)
+        
+        if response and hasattr(response, 'success') and not response.success:
+            raise Exception("Login falhou - resposta indica falha")
+            
+        logger.info("Login bem-sucedido!")
+        return client
+    except Exception as e:
+        logger.error(f"Erro na autenticação: {str(e)}")
+        return None
+
+def load_tweets(file_path):
+    """Carrega tweets de um arquivo JSON exportado e ordena por data."""
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+            
+        print(f"Carregando tweets de: {file_path}")
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read().replace("window.YTD.tweets.part0 = ", "")
+            tweets = json.loads(content)
+            
+        # Ordenar tweets por data (mais antigo primeiro)
+        tweets.sort(key=lambda x: datetime.datetime.strptime(
+            x['tweet']['created_at'], 
+            "%a %b %d %H:%M:%S %z %Y"
+        ))
+        
+        print(f"Carregados e ordenados {len(tweets)} tweets (do mais antigo ao mais novo)")
+        return tweets
+    except Exception as e:
+        print(f"Erro ao carregar tweets: {e}")
+        return []
+
+def load_tweets_sharded(file_path):
+    """Indexa o arquivo sem decodificá-lo inteiro, já na ordem cronológica
+
+    Os tweets são decodificados sob demanda e a renderização é feita por
+    `ShardedArchive.prepare` em paralelo (ver `shards.py`).
+    """
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        print(f"Carregando tweets de: {file_path}")
+        archive = ShardedArchive(file_path)
+        print(f"Carregados e ordenados {len(archive)} tweets (do mais antigo ao mais novo)")
+        return archive
+    except Exception as e:
+        print(f"Erro ao carregar tweets: {e}")
+        return []
+
+def load_tweets_incremental(file_path, watermark, completed=()):
+    """Carrega apenas os tweets mais novos que a marca d'água da migração anterior"""
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+
+        print(f"Carregando tweets novos de: {file_path}")
+        if watermark:
+            print(f"Último tweet migrado: {watermark['id']} ({watermark.get('created_at') or 'data desconhecida'})")
+        tweets, stats = load_new_tweets(file_path, watermark, completed)
+        logger.info(f"Leitura incremental: {stats['parsed']} tweets lidos, {stats['new']} novos"
+                    f"{' (resto do arquivo ignorado)' if stats['stopped_early'] else ''}")
+        print(f"Encontrados {len(tweets)} tweets novos (do mais antigo ao mais novo)")
+        return tweets
+    except Exception as e:
+        print(f"Erro ao carregar tweets: {e}")
+        return []
+
+def truncate_text(text, limit):
+    """Trunca texto para caber no limite de caracteres do Bluesky."""
+    if len(text) > limit:
+        return text[:limit - 3] + "..."
+    return text
+
+def create_post_record(client, text, rkey=None, **fields):
+    """Cria o registro app.bsky.feed.post diretamente no repositório do usuário
+
+    `fields` entra no registro como está (ex.: facets=[...]); valores vazios são omitidos.
+    `rkey` (ver `records.tweet_rkey`) fixa a chave do registro, o que permite
+    reconhecer os posts da migração depois (rollback).
+    """
+    record = {
+        '$type': 'app.bsky.feed.post',
+        'text': text,
+        'createdAt': datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+    }
+    record.update({key: value for key, value in fields.items() if value})
+    data = {
+        'repo': client.me.did,
+        'collection': 'app.bsky.feed.post',
+        'record': record
+    }
+    if rkey:
+        data['rkey'] = rkey
+    return client.com.atproto.repo.create_record(data=data)
+
+def post_tweet_to_bsky(client, tweet, simulate=False, metrics=NULL_METRICS, dead_letters=None,
+                       reauth=None, rendered=None, link_cards=None, videos=None, records=None,
+                       duplicates=None, intents=None, concurrency=NULL_CONCURRENCY, quotes=None,
+                       created_at=None):
+    """Posta um tweet com mídia (se disponível) no BlueSky.
+
+    `rendered` é o resultado de `render_tweet` já calculado na etapa de
+    pré-renderização; sem ele, o tweet é renderizado aqui mesmo.
+    `link_cards` (um `LinkCardPrefetcher`) fornece o card do link principal,
+    se já estiver pronto.
+    `videos` (um `VideoProcessor`) fornece o embed do vídeo ou GIF do tweet,
+    esperando a preparação se ela ainda não terminou.
+    `records` (dict ou `RecordIndex`) recebe {id do tweet: {'uri', 'cid'}} de
+    cada post criado, usado depois pelo rollback.
+    `duplicates` (um `DuplicateIndex` dos posts da conta) reconhece posts
+    já existentes, inclusive cópias manuais com pequenas edições; os posts
+    criados pelo migrador não entram nele.
+    `intents` (um `IntentLog`) registra a intenção antes de criar o post e a
+    URI depois, para a retomada após uma queda não postar o tweet de novo.
+    `concurrency` (um `AdaptiveConcurrency`) limita as escritas simultâneas e
+    recebe a latência de cada criação e os erros de sobrecarga.
+    `quotes` (um `RecordIndex`) transforma a citação de um tweet já migrado
+    em um embed `app.bsky.embed.record` apontando para o post dele.
+    `created_at` fixa o `createdAt` do post (ver `records.CreatedAtClock`),
+    para posts criados fora de ordem aparecerem na ordem do arquivo.
+    Um post que já existe com a mesma rkey conta como sucesso.
+    Erros de rede são repetidos conforme a classe (ver `retry.py`); falhas
+    definitivas vão para `dead_letters`, se informado. `reauth` refaz o login
+    quando a sessão expira.
+    """
+    text = tweet.get("full_text", "")
+    
+    console.debug(f"\nAnalisando tweet: {text[:100]}...")
+    
+    if rendered is None:
+        with metrics.timer('render'):
+            rendered = render_tweet(tweet)
+    if rendered['action'] == 'skip':
+        return False, rendered['reason']
+
+    # Verificar se já foi postado, só para tweets que serão postados (índice
+    # local; repetições da própria migração são evitadas pela rkey fixa e
+    # pelo log de intenções)
+    if duplicates is not None:
+        with metrics.timer('duplicate_check'):
+            match = duplicates.check(tweet.get('id_str'), text)
+        if match:
+            uri, existing, similarity = match
+            console.debug(f"🔁 Parecido ({similarity:.0%}) com post existente: {existing[:100]}")
+            return False, f"Tweet já foi postado anteriormente no Bluesky ({similarity:.0%} similar: {uri})"
+
+    # Verificar se há mídia
+    media_entities = tweet.get("extended_entities", {}).get("media", [])
+    has_media = bool(media_entities)
+    
+    embed = None
+    if has_media:
+        console.debug(f"📷 Tweet contém {len(media_entities)} mídia(s)")
+        with metrics.timer('media'):
+            if rendered.get('video') and videos is not None:
+                embed = videos.embed(tweet.get('id_str'))
+                console.debug("🎬 Vídeo anexado" if embed else "⚠️ Vídeo indisponível, postando só o texto")
+            else:
+                # Imagens continuam indicadas no texto renderizado
+                media_url = media_entities[0].get("media_url_https")
+                if media_url:
+                    console.debug(f"🔄 Mídia indicada no texto: {media_url}")
+
+    quoted = None
+    if quotes is not None and rendered.get('quote'):
+        with metrics.timer('quote_lookup'):
+            quoted = quotes.lookup(rendered['quote'])
+        if quoted:
+            console.debug(f"💬 Citação de {quoted['uri']}")
+
+    full_text = rendered['text']
+    facets = rendered.get('facets')
+    if quoted:
+        # O vídeo continua junto da citação; o card de link dá lugar a ela
+        embed = quote_embed(quoted, embed)
+        if rendered.get('quote_text') is not None:
+            # O link do tweet citado sai do texto: o embed já mostra o post
+            full_text, facets = rendered['quote_text'], rendered['quote_facets']
+    elif embed is None and link_cards and rendered.get('link'):
+        embed = link_cards.get(rendered['link'])
+
+    if simulate:
+        console.debug(f"[SIMULAÇÃO] Postando:\n{full_text}")
+        return True, "Sucesso"
+
+    epoch = 0
+
+    def on_retry(kind, attempt, delay, error):
+        concurrency.on_error(epoch, kind)
+        metrics.inc(f"retry_{kind}")
+        metrics.observe('throttle_sleep', delay)
+        logger.warning(f"Erro '{kind}' ao postar, tentativa {attempt} em {delay:.1f}s: {error}",
+                       extra={'tweet_id': tweet.get('id_str'), 'error_kind': kind})
+
+    tweet_id = tweet.get('id_str')
+    rkey = rendered.get('rkey')
+    try:
+        if intents is not None:
+            intents.begin(tweet_id, rkey)
+        def create():
+            start = time.perf_counter()
+            response = create_post_record(client, full_text, rkey=rkey, facets=facets,
+                                          embed=embed, createdAt=created_at)
+            concurrency.on_success(epoch, time.perf_counter() - start)
+            return response
+
+        with metrics.timer('post'), concurrency.slot() as epoch:
+            try:
+                response = call_with_retry(create, reauth=reauth, on_retry=on_retry)
+            except RetryExhausted as e:
+                # Post criado em uma tentativa anterior (resposta perdida ou queda)
+                if not (rkey and is_record_conflict(e.cause)):
+                    raise
+                response = get_post(client, rkey)
+                if response is None:
+                    raise
+                logger.info("Post já existia com a mesma rkey", extra={'tweet_id': tweet_id})
+        if intents is not None:
+            intents.commit(tweet_id, response.uri, response.cid)
+        if records is not None:
+            records[tweet.get('id_str')] = {'uri': response.uri, 'cid': response.cid}
+        console.debug(f"✅ Postado com sucesso:\n{full_text}")
+        logger.info("Tweet postado", extra={'tweet_id': tweet.get('id_str')})
+        return True, "Sucesso"
+    except RetryExhausted as e:
+        reason = f"Erro ao postar ({e.kind}): {str(e.cause)}"
+        console.error(f"❌ {reason}")
+        logger.error(reason, extra={'tweet_id': tweet.get('id_str'), 'error_kind': e.kind})
+        if dead_letters is not None:
+            dead_letters.add(tweet, reason, e.kind, e.attempts)
+        return False, reason
+
+def resolve_archive_links(tweets, offline=False):
+    """Resolve (com cache em disco) os links t.co que não estão nas entities
+
+    Com `offline`, usa apenas o que já está no cache, sem acessar a rede.
+    """
+    unresolved = find_all_unresolved_links(tweets)
+    if not unresolved:
+        return {}
+    if offline:
+        return TcoResolver().cache.get_many(unresolved)
+    logger.info(f"Resolvendo {len(unresolved)} links t.co fora das entities")
+    return TcoResolver().resolve_all(unresolved)
+
+def prefetch_link_cards(link_cards, rendered_posts, position):
+    """Pede os cards dos próximos posts, à frente do cursor de postagem"""
+    if link_cards:
+        window = rendered_posts[position:position + LINK_CARD_LOOKAHEAD]
+        link_cards.prefetch(rendered['link'] for rendered in window if rendered.get('link'))
+
+def prefetch_videos(videos, tweets, rendered_posts, position):
+    """Agenda a preparação dos vídeos dos próximos posts"""
+    if videos:
+        for i in range(position, min(position + VIDEO_LOOKAHEAD, len(tweets))):
+            if rendered_posts[i].get('video') and rendered_posts[i]['action'] == 'post':
+                videos.submit(tweets[i]['tweet'])
+
+class VideoStage(Stage):
+    """Etapa de mídia da pipeline de importação
+
+    Tweets com vídeo são agendados no `VideoProcessor` e retidos até o vídeo
+    ficar pronto, enquanto os tweets seguintes passam na frente. Com mais de
+    `lookahead` vídeos retidos, o mais antigo segue assim mesmo e a postagem
+    espera por ele (backpressure). Tweets que citam um tweet retido ficam
+    retidos atrás dele, para o citado ser postado primeiro.
+    """
+    def __init__(self, videos, lookahead=VIDEO_LOOKAHEAD, queue_size=DEFAULT_QUEUE_SIZE):
+        super().__init__('media', queue_size=queue_size, ordered=False)
+        self.videos = videos
+        self.lookahead = lookahead
+        self.waiting = []
+
+    def process(self, item, emit):
+        rendered = item.get('rendered')
+        has_video = (self.videos is not None and not item.get('finished')
+                     and rendered.get('video') and rendered['action'] == 'post')
+        behind_quoted = (not item.get('finished') and rendered.get('quote') is not None
+                         and rendered['quote'] in {held['tweet'].get('id_str') for held in self.waiting})
+        if has_video:
+            self.videos.submit(item['tweet'])
+        if not (has_video or behind_quoted):
+            emit(item)
+        else:
+            self.waiting.append(item)
+            if len(self.waiting) > self.lookahead:
+                emit(self.waiting.pop(0))
+        self.idle(emit)
+
+    def idle(self, emit):
+        held = set()
+        for item in list(self.waiting):
+            tweet_id = item['tweet'].get('id_str')
+            if item['rendered'].get('quote') in held or self.videos.pending(tweet_id):
+                held.add(tweet_id)
+            else:
+                self.waiting.remove(item)
+                emit(item)
+
+    def finish(self, emit):
+        # A postagem espera pelos vídeos que ainda estiverem em preparação
+        for item in self.waiting:
+            emit(item)
+        self.waiting = []
+
+def upload_old_tweets(client, tweets, callback=None, simulate=False, batch_size=50,
+                      metrics=NULL_METRICS, dead_letters=None, reauth=None, resolved_links=None,
+                      link_cards=None, videos=None, duplicates=None, plan=None, intents=None):
+    """Faz upload de tweets com suporte a retomada
+
+    `plan` ({id do tweet: entrada}, ver `plan.load_plan`) fornece os posts já
+    renderizados pela simulação offline. Com `intents` (um `IntentLog`), os
+    posts criados por uma execução interrompida antes de salvar o progresso
+    são confirmados no início e não são postados de novo.
+    """
+    progress = ImportProgress.load()
+    quotes = RecordIndex(progress.records)
+    with metrics.timer('render'):
+        rendered_posts = apply_plan(tweets, plan, resolved_links)
+    
+    # Arquivo diferente do anterior: a posição não vale mais, mas os tweets
+    # já postados continuam sendo pulados pelo ID
+    if progress.total_tweets != len(tweets):
+        progress.total_tweets = len(tweets)
+        progress.last_index = 0
+    completed_ids = {tweet_data.get('tweet', {}).get('id_str') for tweet_data in progress.completed_tweets}
+    if intents is not None and not simulate:
+        recovered = intents.recover(client, completed_ids)
+        if recovered:
+            by_id = {tweet_data.get('tweet', {}).get('id_str'): tweet_data for tweet_data in tweets}
+            for tweet_id, record in recovered.items():
+                progress.records[tweet_id] = record
+                progress.completed_tweets.append(by_id.get(tweet_id) or {'tweet': {'id_str': tweet_id}})
+                completed_ids.add(tweet_id)
+            progress.save()
+        intents.reset()
+    
+    start_index = progress.last_index
+    total_tweets = len(tweets)
+    
+    try:
+        while start_index < total_tweets:
+            end_index = min(start_index + batch_size, total_tweets)
+            current_batch = tweets[start_index:end_index]
+            
+            for index, tweet_data in enumerate(current_batch):
+                current_position = start_index + index + 1
+                
+                # Pular tweets já processados
+                if tweet_data.get('tweet', {}).get('id_str') in completed_ids:
+                    continue
+                    
+                try:
+                    tweet = tweet_data.get("tweet")
+                    if not tweet:
+                        continue
+                        
+                    progress_pct = (current_position / total_tweets) * 100
+                    prefetch_link_cards(link_cards, rendered_posts, current_position - 1)
+                    prefetch_videos(videos, tweets, rendered_posts, current_position - 1)
+                    
+                    success, reason = post_tweet_to_bsky(
+                        client, tweet, simulate=simulate, metrics=metrics,
+                        dead_letters=dead_letters, reauth=reauth,
+                        rendered=rendered_posts[current_position - 1], link_cards=link_cards,
+                        videos=videos, records=progress.records, duplicates=duplicates,
+                        intents=intents, quotes=quotes
+                    )
+                    metrics.inc('tweets_processed')
+                    metrics.inc('posted' if success else 'not_posted')
+                    
+                    if success:
+                        progress.completed_tweets.append(tweet_data)
+                        completed_ids.add(tweet.get('id_str'))
+                        progress.last_index = current_position
+                        progress.save()
+                    
+                    if callback:
+                        callback(progress_pct, success, reason)
+                    
+                    with metrics.timer('throttle_sleep'):
+                        time.sleep(3 if success else 5)
+                        
+                except Exception as e:
+                    logger.error(f"Erro ao processar tweet {current_position}: {e}")
+                    metrics.inc('errors')
+                    with metrics.timer('throttle_sleep'):
+                        time.sleep(backoff_delay(classify_error(e), 0, e))
+                    continue
+            
+            start_index += batch_size
+            if start_index < total_tweets:
+                with metrics.timer('throttle_sleep'):
+                    time.sleep(60)
+                
+    except KeyboardInterrupt:
+        progress.save()
+        logger.info(f"Processo interrompido. Progresso salvo no tweet {current_position}")
+        return progress
+    
+    return progress
+
+def filter_tweets(tweets, keyword=None, start_date=None, end_date=None, ids=None):
+    """Filtra tweets por palavra-chave, intervalo de datas ou seleção de IDs."""
+    filtered = []
+    for tweet_data in tweets:
+        tweet = tweet_data.get("tweet")
+        if not tweet:
+            continue
+        if ids is not None and tweet.get("id_str") not in ids:
+            continue
+        if keyword and keyword not in tweet.get("full_text", ""):
+            continue
+        if start_date or end_date:
+            tweet_date = datetime.datetime.strptime(tweet.get("created_at"), "%a %b %d %H:%M:%S %z %Y")
+            if start_date and tweet_date < start_date:
+                continue
+            if end_date and tweet_date > end_date:
+                continue
+        filtered.append(tweet_data)
+    return filtered
+
+def warning():
+    """Exibe um aviso antes de executar o script."""
+    print("\nAVISO: Este script pode SPAMAR as timelines dos seus seguidores.")
+    print("Recomenda-se usar uma conta nova.")
+    response = input("Digite [EU ENTENDO] para continuar: ")
+    if (response.strip() != "EU ENTENDO"):
+        print("Saindo...")
+        exit()
+
+def selection_digest(selection):
+    """Resumo de uma seleção de IDs, guardado na sessão (None = todos os tweets)"""
+    if selection is None:
+        return None
+    return hashlib.sha1("\n".join(sorted(selection)).encode('utf-8')).hexdigest()
+
+def recover_intents(client, intents, session, handle):
+    """Registra na sessão os posts criados antes de uma queda e esvazia o log de intenções"""
+    recovered = intents.recover(client, session['completed'])
+    if recovered:
+        logger.info(f"{len(recovered)} posts de uma execução interrompida confirmados pelo log de intenções")
+        session.setdefault('records', {}).update(recovered)
+        for tweet_id in recovered:
+            session['completed'].append(tweet_id)
+            session['watermark'] = update_watermark(session.get('watermark'), {'id_str': tweet_id})
+        save_session(session, handle)
+    intents.reset()
+    return recovered
+
+def create_session_file(tweets_path, handle):
+    """Cria/atualiza arquivo de sessão para retomada"""
+    session_file = f"session_{handle.replace('.', '_')}.json"
+    if os.path.exists(session_file):
+        with open(session_file, 'r') as f:
+            return json.load(f)
+    return {
+        'tweets_path': tweets_path,
+        'last_index': 0,
+        'completed': [],
+        'total': 0
+    }
+
+def save_session(session_data, handle):
+    """Salva estado da sessão"""
+    session_file = f"session_{handle.replace('.', '_')}.json"
+    with open(session_file, 'w') as f:
+        json.dump(session_data, f)
+
+class RateLimiter:
+    def __init__(self):
+        self.base_delay = 1.0  # Reduzido para 1 segundo
+        self.current_delay = 1.0
+        self.max_delay = 5.0   # Reduzido para 5 segundos
+        self.min_delay = 0.5   # Reduzido para 0.5 segundos
+        self.success_count = 0
+        self.error_count = 0
+        
+    def adapt_delay(self, success):
+        if success:
+            self.success_count += 1
+            self.error_count = 0
+            # Reduz o delay após 3 sucessos consecutivos
+            if self.success_count >= 3:
+                self.current_delay = max(self.min_delay, self.current_delay * 0.7)
+                self.success_count = 0
+        else:
+            self.error_count += 1
+            self.success_count = 0
+            # Aumenta o delay em caso de erro
+            self.current_delay = min(self.max_delay, self.current_delay * 1.2)
+            
+    def wait(self):
+        time.sleep(self.current_delay)
+
+def make_reauth(client, handle, password):
+    """Cria a função que refaz o login quando o token da sessão expira"""
+    def reauth():
+        logger.info("Sessão expirada, refazendo login")
+        client.login(handle.strip(), password.strip())
+    return reauth
+
+def retry_dead_letters(handle, password, callback=None):
+    """Tenta novamente apenas os tweets da fila de falhas, sem reler o arquivo"""
+    dead_letters = DeadLetterQueue(handle)
+    if not dead_letters:
+        return True, "Nenhum tweet na fila de falhas"
+
+    client = test_auth(handle, password)
+    if not client:
+        return False, "Falha na autenticação"
+    reauth = make_reauth(client, handle, password)
+    rate_limiter = RateLimiter()
+    session = create_session_file(None, handle)
+    intents = IntentLog(handle)
+    recover_intents(client, intents, session, handle)
+
+    # Ordem cronológica (IDs crescentes): tweets citados voltam antes de quem os cita
+    tweets = sorted(dead_letters.tweets(), key=lambda tweet: int(tweet.get('id_str') or 0))
+    quotes = RecordIndex(session.setdefault('records', {}))
+    posted = 0
+    for i, tweet in enumerate(tweets):
+        if getattr(callback, 'stop_requested', False):
+            return True, "Nova tentativa pausada pelo usuário"
+
+        rate_limiter.wait()
+        # Se falhar de novo, a entrada é atualizada na própria fila
+        success, reason = post_tweet_to_bsky(client, tweet, dead_letters=dead_letters, reauth=reauth,
+                                             records=quotes.records, intents=intents, quotes=quotes)
+        rate_limiter.adapt_delay(success)
+        if success:
+            posted += 1
+            dead_letters.remove(tweet.get('id_str'))
+            session['completed'].append(tweet.get('id_str'))
+            save_session(session, handle)
+
+        if callback:
+            callback(((i + 1) / len(tweets)) * 100, success, {
+                'text': tweet.get('full_text', ''),
+                'status': reason,
+                'current': i + 1,
+                'total': len(tweets)
+            })
+
+    return True, f"{posted} de {len(tweets)} tweets da fila de falhas postados"
+
+def forget_rolled_back(rkeys, session, progress, handle):
+    """Tira os posts apagados da sessão e do progresso, para poderem ser migrados de novo"""
+    rkeys = set(rkeys)
+
+    def forget(records):
+        removed = {tweet_id for tweet_id, record in records.items() if rkey_from_uri(record['uri']) in rkeys}
+        for tweet_id in removed:
+            del records[tweet_id]
+        return removed
+
+    removed = forget(session.setdefault('records', {}))
+    if removed:
+        session['completed'] = [tweet_id for tweet_id in session['completed'] if tweet_id not in removed]
+        session['last_index'] = 0
+        save_session(session, handle)
+
+    removed = forget(progress.records)
+    if removed:
+        progress.completed_tweets = [tweet_data for tweet_data in progress.completed_tweets
+                                     if tweet_data.get('tweet', {}).get('id_str') not in removed]
+        progress.last_index = 0
+        progress.save()
+
+def rollback_import(handle, password, scan=False, callback=None):
+    """Apaga os posts criados pela migração em lotes de applyWrites
+
+    Por padrão usa os registros (tweet → URI) guardados na sessão e no
+    progresso do modo terminal; com `scan`, lista a conta procurando posts com
+    a rkey do migrador. As rkeys pendentes ficam em `rollback_<handle>.json`,
+    então um rollback interrompido continua de onde parou.
+    """
+    client = test_auth(handle, password)
+    if not client:
+        return False, "Falha na autenticação"
+    reauth = make_reauth(client, handle, password)
+    rate_limiter = RateLimiter()
+    session = create_session_file(None, handle)
+    intents = IntentLog(handle)
+    recover_intents(client, intents, session, handle)
+    progress = ImportProgress.load()
+    state = RollbackState(handle)
+
+    if not state.pending:
+        if scan:
+            rkeys = call_with_retry(lambda: list_migrated_posts(client), reauth=reauth)
+        else:
+            records = {**progress.records, **session.get('records', {})}
+            rkeys = [rkey_from_uri(record['uri']) for record in records.values()]
+        if not rkeys:
+            return True, "Nenhum post da migração encontrado"
+        state.start(rkeys)
+    total = state.deleted + len(state.pending)
+    logger.info(f"Rollback de {len(state.pending)} posts ({state.deleted} já apagados)")
+
+    while state.pending:
+        if getattr(callback, 'stop_requested', False):
+            return True, "Rollback pausado pelo usuário"
+
+        batch = state.pending[:APPLY_WRITES_BATCH]
+        rate_limiter.wait()
+        try:
+            call_with_retry(lambda: delete_posts(client, batch), reauth=reauth)
+        except RetryExhausted as e:
+            if e.kind != ERROR_PERMANENT:
+                return False, f"Rollback interrompido ({e.kind}): {e.cause}"
+            # Lote recusado (ex.: algum post já apagado): apagar um a um
+            logger.warning(f"Lote de exclusão recusado, apagando um a um: {e.cause}")
+            for rkey in batch:
+                try:
+                    call_with_retry(lambda: delete_post(client, rkey), reauth=reauth)
+                except RetryExhausted as e:
+                    if e.kind != ERROR_PERMANENT:
+                        return False, f"Rollback interrompido ({e.kind}): {e.cause}"
+                    logger.error(f"Post {rkey} não pôde ser apagado: {e.cause}")
+        rate_limiter.adapt_delay(True)
+        state.mark_deleted(batch)
+        forget_rolled_back(batch, session, progress, handle)
+
+        if callback:
+            callback((state.deleted / total) * 100, True, {
+                'status': f"{state.deleted} de {total} posts apagados",
+                'current': state.deleted,
+                'total': total
+            })
+
+    state.finish()
+    return True, f"{total} posts da migração apagados"
+
+def resume_import(handle, password, tweets_path, callback=None,
+                  metrics_port=None, metrics_textfile=None, metrics_interval=30,
+                  resolve_links=False, link_cards=False, videos=True, incremental=False,
+                  dedup_threshold=DEFAULT_SIMILARITY, plan_path=None, stage_workers=None,
+                  stage_queue_size=DEFAULT_QUEUE_SIZE, selection=None):
+    """Função principal de importação com suporte a retomada
+
+    Os tweets passam por uma pipeline de etapas ligadas por filas limitadas
+    (`stage_queue_size` itens): leitura → filtro → renderização → mídia →
+    postagem → checkpoint. `stage_workers` ({'parse', 'render', 'media',
+    'post'}: quantidade) define os workers por etapa; em 'render' são os
+    processos que renderizam os shards do arquivo, em 'media' as threads de
+    preparação de vídeos e em 'post' o máximo de escritas simultâneas, que
+    começam em uma e sobem ou descem conforme a latência e os erros do PDS
+    (estado na chave 'concurrency' do callback). O estado de cada etapa
+    (fila, tempo ocupado, sem entrada e bloqueado) vai no callback (chave
+    'pipeline') e no log.
+
+    Com `resolve_links`, links t.co ausentes das entities são resolvidos pela
+    rede (uma vez por URL, com cache em disco) antes da renderização.
+    Com `link_cards`, tweets com link ganham um card (Open Graph) buscado em
+    segundo plano à frente da postagem.
+    Com `videos`, vídeos e GIFs da pasta `tweets_media` do arquivo são
+    preparados e enviados em segundo plano; enquanto isso os tweets seguintes
+    continuam sendo postados e o tweet com vídeo entra assim que fica pronto.
+    Com `incremental`, só os tweets mais novos que a marca d'água da sessão
+    (maior ID já migrado) são lidos e postados, para um arquivo exportado de
+    novo meses depois.
+    Duplicados são procurados em um índice SimHash dos posts da conta,
+    montado uma vez no início; `dedup_threshold` é a similaridade mínima.
+    Com `plan_path`, os posts vêm do plano gerado por `dry_run_plan` em vez
+    de serem renderizados de novo.
+    `selection` (IDs escolhidos na busca da interface, ver `search.py`)
+    restringe a importação a esses tweets; os demais são pulados.
+
+    As métricas por etapa vão no callback (chave 'metrics'), em um resumo JSON
+    gravado a cada `metrics_interval` segundos e, opcionalmente, em um arquivo
+    texto do Prometheus (`metrics_textfile`) e/ou via HTTP (`metrics_port`).
+    """
+    session = create_session_file(tweets_path, handle)
+    stage_workers = stage_workers or {}
+    # Escritas simultâneas ajustadas pela latência e pelos erros do PDS (AIMD)
+    post_workers = stage_workers.get('post', AIMD_MAX_LIMIT)
+    concurrency = AdaptiveConcurrency(max_limit=post_workers)
+    metrics = Metrics()
+    metrics_server = metrics.serve(metrics_port) if metrics_port else None
+    # Requisições, conexões reutilizadas e handshakes TLS entram nas métricas
+    HTTP_STATS.use_metrics(metrics)
+    card_prefetcher = None
+    video_processor = None
+    archive = None
+    
+    try:
+        client = test_auth(handle, password)
+        if not client:
+            return False, "Falha na autenticação"
+        reauth = make_reauth(client, handle, password)
+        dead_letters = DeadLetterQueue(handle)
+        intents = IntentLog(handle)
+        recover_intents(client, intents, session, handle)
+        quotes = RecordIndex(session.setdefault('records', {}))
+        post_clock = CreatedAtClock()
+
+        # Tweets já postados (inclusive fora de ordem, como os vídeos) em execuções anteriores
+        completed = set(session['completed'])
+        watermark = session.get('watermark') or watermark_from_tweets({'id_str': tweet_id} for tweet_id in completed)
+
+        with metrics.timer('load_tweets'):
+            if incremental:
+                tweets = load_tweets_incremental(tweets_path, watermark, completed)
+            else:
+                tweets = archive = load_tweets_sharded(tweets_path)
+        if not tweets:
+            if incremental:
+                return True, "Nenhum tweet novo desde a última migração"
+            return False, "Nenhum tweet encontrado"
+
+        total_tweets = len(tweets)
+        # Arquivo diferente do da sessão: a posição salva não vale mais e
+        # os tweets já postados são pulados pelo ID
+        if incremental or (session.get('total') and session['total'] != total_tweets):
+            session['last_index'] = 0
+        # Seleção diferente da anterior: tweets antes da posição salva podem ter entrado
+        selection_key = selection_digest(selection)
+        if session.get('selection') != selection_key:
+            session['last_index'] = 0
+        session['selection'] = selection_key
+        session['total'] = total_tweets
+        session['tweets_path'] = tweets_path
+
+        resolved_links = None
+        if resolve_links:
+            with metrics.timer('resolve_links'):
+                resolved_links = resolve_archive_links(tweets)
+
+        with metrics.timer('render'):
+            if archive and not plan_path:
+                # Renderização em shards paralelos, a partir da posição salva;
+                # a postagem começa assim que o primeiro shard fica pronto
+                rendered_posts = archive.prepare(resolved_links, archive_media_dir(tweets_path),
+                                                 workers=stage_workers.get('render'),
+                                                 start=session['last_index'])
+            else:
+                rendered_posts = apply_plan(tweets, load_plan(plan_path) if plan_path else None,
+                                            resolved_links)
+
+        with metrics.timer('duplicate_index'):
+            duplicates = DuplicateIndex.from_account(client, dedup_threshold)
+        logger.info(f"Índice de duplicados com {len(duplicates)} posts da conta")
+
+        if link_cards:
+            card_prefetcher = LinkCardPrefetcher(client)
+        if videos:
+            video_processor = VideoProcessor(client, archive_media_dir(tweets_path),
+                                             workers=stage_workers.get('media', VIDEO_WORKERS))
+        
+        # Notificar total inicial
+        if callback:
+            callback(0, True, {
+                'text': '',
+                'status': 'Iniciando',
+                'current': session['last_index'],
+                'total': total_tweets,
+                'analyzing': True
+            })
+
+        def report_error(item, error):
+            i = item['index']
+            logger.error(f"Erro no tweet {i}: {str(error)}")
+            metrics.inc('errors')
+            if callback:
+                callback(((i + 1) / total_tweets) * 100, False, {
+                    'error': str(error),
+                    'current': i + 1,
+                    'total': total_tweets
+                })
+
+        def parse(item):
+            item['tweet'] = tweets[item['index']]['tweet']
+            return item
+
+        def filter_completed(item):
+            tweet = item['tweet']
+            if tweet.get('id_str') in completed:
+                item['finished'] = True
+                return item
+            if selection is not None and tweet.get('id_str') not in selection:
+                item['finished'] = True
+                metrics.inc('not_selected')
+                return item
+            # Notificar análise
+            if callback:
+                current_position = item['index'] + 1
+                callback((current_position / total_tweets) * 100, True, {
+                    'text': tweet.get('full_text', ''),
+                    'status': 'Analisando',
+                    'current': current_position,
+                    'total': total_tweets,
+                    'analyzing': True
+                })
+            return item
+
+        def render(item):
+            i = item['index']
+            rendered = rendered_posts[i]
+            if hasattr(rendered_posts, 'release'):
+                # A etapa lê cada posição uma única vez, em ordem
+                rendered_posts.release(i)
+            if item.get('finished'):
+                return item
+            item['rendered'] = rendered
+            # Verificações de skip (já resolvidas na renderização)
+            if rendered['action'] == 'skip':
+                item['finished'] = True
+                metrics.inc('tweets_processed')
+                metrics.inc('skipped')
+                if callback:
+                    callback(((i + 1) / total_tweets) * 100, False, rendered['reason'])
+            else:
+                # Quem citar este tweet espera a postagem dele terminar
+                quotes.expect(item['tweet'].get('id_str'))
+                # Data do post na ordem do arquivo, mesmo que a criação saia fora de ordem
+                item['created_at'] = post_clock.next()
+                if card_prefetcher and rendered.get('link'):
+                    # O card é buscado enquanto o tweet atravessa as filas até a postagem
+                    card_prefetcher.prefetch([rendered['link']])
+            return item
+
+        def post(item):
+            if item.get('finished'):
+                return item
+            i = item['index']
+            tweet = item['tweet']
+            rendered = item['rendered']
+            try:
+                success, reason = post_tweet_to_bsky(
+                    client, tweet, metrics=metrics, dead_letters=dead_letters, reauth=reauth,
+                    rendered=rendered, link_cards=card_prefetcher, videos=video_processor,
+                    records=quotes, duplicates=duplicates,
+                    intents=intents, concurrency=concurrency, quotes=quotes,
+                    created_at=item.get('created_at')
+                )
+                metrics.inc('tweets_processed')
+                metrics.inc('posted' if success else 'not_posted')
+                metrics.maybe_flush(metrics_interval, METRICS_FILE, metrics_textfile)
+                item['posted'] = success
+                
+                # Callback com informações completas
+                if callback:
+                    callback(((i + 1) / total_tweets) * 100, success, {
+                        'text': tweet.get('full_text', ''),
+                        'status': reason,
+                        'footer': rendered['footer'],
+                        'concurrency': concurrency.snapshot(),
+                        'metrics': metrics.snapshot(),
+                        'dead_letters': len(dead_letters),
+                        'videos': video_processor.status() if video_processor else {},
+                        'pipeline': pipeline.snapshot()
+                    })
+            except Exception as e:
+                report_error(item, e)
+            finally:
+                quotes.finish(tweet.get('id_str'))
+            return item
+
+        # Posição salva: primeiro índice ainda não concluído (vídeos retidos
+        # e tweets descartados numa pausa ficam para a próxima execução)
+        concluded = set()
+        checkpoint_position = [session['last_index']]
+        last_save = [time.monotonic()]
+
+        def checkpoint(item):
+            if 'error' in item and item.get('tweet'):
+                # Falhou antes da postagem: quem cita este tweet não espera mais por ele
+                quotes.finish(item['tweet'].get('id_str'))
+            concluded.add(item['index'])
+            while checkpoint_position[0] in concluded:
+                concluded.remove(checkpoint_position[0])
+                checkpoint_position[0] += 1
+            session['last_index'] = checkpoint_position[0]
+            if item.get('posted'):
+                tweet = item['tweet']
+                session['completed'].append(tweet.get('id_str'))
+                completed.add(tweet.get('id_str'))
+                session['watermark'] = update_watermark(session.get('watermark') or watermark, tweet)
+                if time.monotonic() - last_save[0] >= SESSION_SAVE_SECONDS:
+                    # Os workers de postagem continuam gravando em session['records']
+                    save_session({**session, 'records': quotes.snapshot()}, handle)
+                    last_save[0] = time.monotonic()
+
+        queue_size = stage_queue_size
+        pipeline = Pipeline(
+            ({'index': i} for i in range(session['last_index'], total_tweets)),
+            [
+                Stage('parse', parse, workers=stage_workers.get('parse', 1), queue_size=queue_size),
+                Stage('filter', filter_completed, queue_size=queue_size),
+                # A renderização em si roda nos processos de `ShardedArchive.prepare`
+                Stage('render', render, queue_size=queue_size),
+                VideoStage(video_processor, queue_size=queue_size),
+                # Uma thread por vaga possível; `concurrency` decide quantas escrevem
+                Stage('post', post, workers=post_workers, queue_size=queue_size),
+                # Também recebe os itens que falharam, para a posição salva avançar
+                Stage('checkpoint', checkpoint, queue_size=queue_size, drop_on_stop=False,
+                      accepts_errors=True)
+            ],
+            metrics=metrics
+        )
+
+        logger.info(f"Retomando importação a partir do índice {session['last_index']} de {total_tweets} tweets")
+        finished = pipeline.run(should_stop=lambda: getattr(callback, 'stop_requested', False))
+        logger.info("Etapas da importação", extra={'pipeline': pipeline.snapshot(),
+                                                   'concurrency': concurrency.snapshot()})
+        save_session(session, handle)
+        if not finished:
+            logger.info(f"Parada solicitada; retomada a partir do índice {session['last_index']}")
+            return True, "Importação pausada pelo usuário"
+
+        return True, "Importação concluída"
+
+    except Exception as e:
+        logger.error(f"Erro na importação: {str(e)}")
+        return False, str(e)
+    finally:
+        if archive:
+            archive.close()
+        if card_prefetcher:
+            card_prefetcher.close()
+        if video_processor:
+            video_processor.close()
+        HTTP_STATS.use_metrics(NULL_METRICS)
+        logger.info("Conexões HTTP da importação", extra={'http': HTTP_STATS.snapshot()})
+        metrics.flush(METRICS_FILE, metrics_textfile)
+        if metrics_server:
+            metrics_server.shutdown()
+
+def print_duplicate_report(duplicates):
+    """Lista os tweets que já têm um post parecido na conta (simulação)"""
+    print(f"\n{len(duplicates.matches)} tweets já têm um post parecido na conta "
+          f"(similaridade mínima {duplicates.threshold:.0%}):")
+    for match in duplicates.matches:
+        existing = match['text'].replace("\n", " ")[:80]
+        print(f"  {match['tweet_id']} ≈ {match['uri']} ({match['similarity']:.0%}): {existing}")
+
+def dry_run_plan(tweets_path, plan_path=PLAN_FILE, workers=None):
+    """Simulação offline: grava o plano completo da migração sem acessar a rede
+
+    Todo o arquivo passa pelas regras de skip, renderização, facets e
+    resolução da mídia local (em paralelo nos núcleos disponíveis). Links
+    t.co fora das entities usam só o cache em disco. O plano pode ser usado
+    depois como entrada da importação real (`plan_path`/`--plan`).
+    """
+    tweets = load_tweets_sharded(tweets_path)
+    if not tweets:
+        return False, "Nenhum tweet encontrado"
+    start = time.perf_counter()
+    try:
+        entries = tweets.prepare(resolve_archive_links(tweets, offline=True),
+                                 archive_media_dir(tweets_path), workers)
+        summary = write_plan_entries(entries, plan_path)
+    finally:
+        tweets.close()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Plano de migração gravado em {plan_path} em {elapsed:.1f}s", extra={'summary': summary})
+    details = ", ".join(f"{key}: {value}" for key, value in sorted(summary.items()))
+    return True, f"Plano com {len(tweets)} tweets gravado em {plan_path} ({details})"
+
+def profile_dir():
+    """Diretório onde os perfis de execução são gravados (ao lado do log)"""
+    return os.path.dirname(os.path.abspath(LOG_FILE))
+
+def parse_args(argv=None):
+    """Lê as opções de linha de comando do modo terminal"""
+    parser = argparse.ArgumentParser(description="Importa tweets do Twitter para o Bluesky")
+    parser.add_argument("tweets_path", nargs="?", default=TWEETS_JS_PATH,
+                        help="Caminho do arquivo tweets.js")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="Grava um perfil da execução ao lado do import_log.txt")
+    parser.add_argument("--profile-span", type=float, default=None,
+                        help="Duração (s) da janela amostrada no modo 'sample'")
+    parser.add_argument("--profile-delay", type=float, default=0,
+                        help="Espera (s) antes de começar a amostrar no modo 'sample'")
+    parser.add_argument("--resolve-links", action="store_true",
+                        help="Resolve pela rede os links t.co que não estão nas entities do arquivo")
+    parser.add_argument("--link-cards", action="store_true",
+                        help="Adiciona cards de link (Open Graph) aos tweets que têm link")
+    parser.add_argument("--no-videos", action="store_true",
+                        help="Não envia vídeos e GIFs da pasta tweets_media do arquivo")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Migra só os tweets mais novos que os já migrados (arquivo exportado de novo)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Simula a importação sem postar e lista os tweets que parecem já postados")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_SIMILARITY,
+                        help="Similaridade mínima (0 a 1) para considerar um tweet já postado")
+    parser.add_argument("--plan-out", nargs="?", const=PLAN_FILE, default=None,
+                        help=f"Só gera o plano da migração, sem rede nem login (padrão: {PLAN_FILE})")
+    parser.add_argument("--plan", default=None,
+                        help="Usa um plano gerado com --plan-out como entrada da importação")
+    parser.add_argument("--selection", action="store_true",
+                        help="Migra só os tweets marcados na busca da interface (tweet_selection.json)")
+    parser.add_argument("--retry-dead-letters", action="store_true",
+                        help="Tenta novamente apenas os tweets que falharam de forma definitiva")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Apaga os posts criados pela migração (registrados na sessão)")
+    parser.add_argument("--rollback-scan", action="store_true",
+                        help="Como --rollback, mas procura na conta os posts com a rkey do migrador")
+    parser.add_argument("-q", "--quiet", action="count", default=0,
+                        help="Reduz o eco no terminal (-q: sem eco por tweet, -qq: só erros)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Função principal do script."""
+    args = parse_args(argv)
+    set_verbosity(max(VERBOSITY_QUIET, VERBOSITY_VERBOSE - args.quiet))
+
+    if args.plan_out:
+        ok, message = dry_run_plan(args.tweets_path, args.plan_out)
+        print(message)
+        return
+
+    warning()
+
+    # Verificações iniciais
+    handle = input("Digite seu handle do Bluesky: ")
+    password = input("Digite seu App Password do Bluesky: ")
+
+    if not handle or not password:
+        print("Handle ou App Password não configurados!")
+        return
+
+    if args.retry_dead_letters:
+        ok, message = retry_dead_letters(handle, password)
+        print(message)
+        return
+
+    if args.rollback or args.rollback_scan:
+        confirm = input("Digite [APAGAR] para apagar os posts criados pela migração: ")
+        if confirm.strip() != "APAGAR":
+            print("Operação cancelada.")
+            return
+        ok, message = rollback_import(handle, password, scan=args.rollback_scan)
+        print(message)
+        return
+
+    # Testar autenticação primeiro
+    print("\nTestando autenticação...")
+    client = test_auth(handle, password)
+    if not client:
+        print("Falha na autenticação. Verifique suas credenciais.")
+        return
+
+    if args.incremental:
+        progress = ImportProgress.load()
+        migrated = [tweet_data.get('tweet', {}) for tweet_data in progress.completed_tweets]
+        tweets = load_tweets_incremental(args.tweets_path, watermark_from_tweets(migrated),
+                                         (tweet.get('id_str') for tweet in migrated))
+    else:
+        tweets = load_tweets(args.tweets_path)
+    if not tweets:
+        print("Nenhum tweet encontrado. Verifique o arquivo e tente novamente.")
+        return
+
+    # Filtrar tweets (opcional)
+    start_date = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+    selection = load_selection(args.tweets_path) if args.selection else None
+    if args.selection and selection is None:
+        print("Nenhuma seleção salva para este arquivo; migrando todos os tweets.")
+    filtered_tweets = filter_tweets(tweets, ids=selection)  # Removido filtro de keyword para teste
+    if not filtered_tweets:
+        print("Nenhum tweet selecionado.")
+        return
+    
+    print(f"\nTweets ordenados do mais antigo ({filtered_tweets[0]['tweet']['created_at']})")
+    print(f"para o mais novo ({filtered_tweets[-1]['tweet']['created_at']})")
+
+    # Por padrão posta de verdade; --dry-run apenas simula
+    simulate_mode = args.dry_run
+    
+    # Confirmação final antes de começar
+    if not simulate_mode:
+        print("\nMODO DE POSTAGEM REAL ATIVADO!")
+        confirm = input("Digite [POSTAR] para começar a postar de verdade: ")
+        if confirm.strip() != "POSTAR":
+            print("Operação cancelada.")
+            return
+    
+    upload_options = {
+        'simulate': simulate_mode,
+        'batch_size': 100,
+        'dead_letters': DeadLetterQueue(handle),
+        'reauth': make_reauth(client, handle, password),
+        'resolved_links': resolve_archive_links(filtered_tweets) if args.resolve_links else None,
+        'link_cards': LinkCardPrefetcher(client) if args.link_cards else None,
+        'videos': None if args.no_videos or simulate_mode else VideoProcessor(
+            client, archive_media_dir(args.tweets_path)),
+        'duplicates': DuplicateIndex.from_account(client, args.dedup_threshold),
+        'plan': load_plan(args.plan) if args.plan else None,
+        'intents': None if simulate_mode else IntentLog(handle)
+    }
+    if args.profile:
+        profile_call(
+            upload_old_tweets, client, filtered_tweets, **upload_options,
+            mode=args.profile, span=args.profile_span, delay=args.profile_delay,
+            output_dir=profile_dir(), archive_path=args.tweets_path,
+            tags={'entrypoint': 'cli', 'tweets': len(filtered_tweets), 'simulate': simulate_mode}
+        )
+    else:
+        upload_old_tweets(client, filtered_tweets, **upload_options)
+
+    if upload_options['link_cards']:
+        upload_options['link_cards'].close()
+    if upload_options['videos']:
+        upload_options['videos'].close()
+    if simulate_mode:
+        print_duplicate_report(upload_options['duplicates'])
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
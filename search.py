@@ -0,0 +1,201 @@
+import datetime
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from shards import ShardedArchive, _created_key
+
+logger = logging.getLogger(__name__)
+
+# Índice de busca do arquivo (reconstruído só quando o tweets.js muda)
+ARCHIVE_INDEX_FILE = "archive_index.db"
+# Seleção de tweets a migrar feita na interface
+SELECTION_FILE = "tweet_selection.json"
+
+# Tweets gravados por transação durante a construção (a busca já vê os anteriores)
+INDEX_BATCH_SIZE = 5000
+# Resultados exibidos por busca; marcar/desmarcar vale para todos os encontrados
+SEARCH_RESULT_LIMIT = 500
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS tweets (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    created REAL NOT NULL,
+    created_at TEXT,
+    text TEXT NOT NULL,
+    links TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tweets_created ON tweets (created);
+CREATE INDEX IF NOT EXISTS tweets_id ON tweets (id);
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5(
+    text, links, content='tweets', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+def _signature(path):
+    stat = os.stat(path)
+    return json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+
+def match_expression(query):
+    """Consulta FTS5 a partir do texto digitado: todas as palavras, como prefixo"""
+    words = _WORD.findall(query or "")
+    return " AND ".join(f'"{word}"*' for word in words)
+
+def _day_start(day):
+    """Segundos UTC do início de um dia ('AAAA-MM-DD'), ou None"""
+    if not day:
+        return None
+    date = datetime.datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=datetime.timezone.utc)
+    return date.timestamp()
+
+class ArchiveIndex:
+    """Índice de busca de texto completo (SQLite FTS5) sobre o tweets.js
+
+    Construído uma vez por arquivo (`build`, normalmente em segundo plano)
+    e reaproveitado enquanto o tweets.js não mudar. As buscas usam o índice
+    invertido do FTS5, então continuam interativas com centenas de milhares
+    de tweets; durante a construção já encontram o que foi gravado.
+    """
+    def __init__(self, tweets_path, path=ARCHIVE_INDEX_FILE):
+        self.tweets_path = tweets_path
+        self.path = path
+        self.indexed = 0
+        self.total = 0
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _meta(self, key):
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def is_current(self):
+        """True se o índice já cobre o tweets.js atual por completo"""
+        return (self._meta('signature') == _signature(self.tweets_path)
+                and self._meta('complete') == '1')
+
+    def build(self, progress=None):
+        """Indexa o arquivo (se ainda não estiver indexado); `progress(feitos, total)`"""
+        if self.is_current():
+            self.indexed = self.total = self.count()
+            return self.total
+        archive = ShardedArchive(self.tweets_path)
+        try:
+            self.total = len(archive)
+            self.indexed = 0
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM tweets")
+                connection.execute("INSERT INTO tweets_fts (tweets_fts) VALUES ('delete-all')")
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)",
+                                   (_signature(self.tweets_path),))
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('complete', '0')")
+            for start in range(0, self.total, INDEX_BATCH_SIZE):
+                rows = []
+                for position in range(start, min(start + INDEX_BATCH_SIZE, self.total)):
+                    tweet = archive[position].get('tweet') or {}
+                    links = " ".join(url.get('expanded_url') or ''
+                                     for url in tweet.get('entities', {}).get('urls', []))
+                    created_at = tweet.get('created_at')
+                    rows.append((position + 1, tweet.get('id_str'),
+                                 _created_key(created_at.encode()) if created_at else float('-inf'),
+                                 created_at, html.unescape(tweet.get('full_text', '')), links))
+                with connection:
+                    connection.executemany("INSERT INTO tweets VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    connection.executemany(
+                        "INSERT INTO tweets_fts (rowid, text, links) VALUES (?, ?, ?)",
+                        [(row[0], row[4], row[5]) for row in rows]
+                    )
+                self.indexed += len(rows)
+                if progress:
+                    progress(self.indexed, self.total)
+        finally:
+            archive.close()
+        with connection:
+            connection.execute("UPDATE meta SET value = '1' WHERE key = 'complete'")
+        logger.info(f"Índice de busca com {self.total} tweets", extra={'index': self.path})
+        return self.total
+
+    def _where(self, query, since, until):
+        clauses, params = [], []
+        expression = match_expression(query)
+        if expression:
+            clauses.append("rowid IN (SELECT rowid FROM tweets_fts WHERE tweets_fts MATCH ?)")
+            params.append(expression)
+        if since:
+            clauses.append("created >= ?")
+            params.append(_day_start(since))
+        if until:
+            # Data final inclusiva: até o fim do dia
+            clauses.append("created < ?")
+            params.append(_day_start(until) + 86400)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, query=None, since=None, until=None):
+        where, params = self._where(query, since, until)
+        return self._connection().execute(f"SELECT COUNT(*) FROM tweets{where}", params).fetchone()[0]
+
+    def search(self, query=None, since=None, until=None, limit=SEARCH_RESULT_LIMIT):
+        """Tweets encontrados, do mais antigo ao mais novo: [(id, created_at, texto)]
+
+        `query` exige todas as palavras (como prefixo, sem diferenciar
+        maiúsculas e acentos), no texto ou nos links; `since`/`until` são
+        datas 'AAAA-MM-DD' inclusivas.
+        """
+        where, params = self._where(query, since, until)
+        return self._connection().execute(
+            # rowid segue a ordem cronológica do `ShardedArchive`
+            f"SELECT id, created_at, text FROM tweets{where} ORDER BY rowid LIMIT ?",
+            params + [limit]
+        ).fetchall()
+
+    def text(self, tweet_id):
+        """Texto completo de um tweet, para a pré-visualização"""
+        row = self._connection().execute("SELECT text FROM tweets WHERE id = ?", (tweet_id,)).fetchone()
+        return row[0] if row else None
+
+    def ids(self, query=None, since=None, until=None):
+        """IDs de todos os tweets encontrados (sem limite), para marcar em bloco"""
+        where, params = self._where(query, since, until)
+        return {row[0] for row in self._connection().execute(f"SELECT id FROM tweets{where}", params)}
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+def save_selection(tweets_path, ids, path=SELECTION_FILE):
+    """Grava a seleção ({ids}) de tweets a migrar do arquivo"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'tweets_path': os.path.abspath(tweets_path), 'ids': sorted(ids)}, f)
+    os.replace(tmp_path, path)
+
+def load_selection(tweets_path, path=SELECTION_FILE):
+    """Seleção salva para este tweets.js (set de IDs), ou None para migrar todos"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        selection = json.load(f)
+    if selection.get('tweets_path') != os.path.abspath(tweets_path):
+        return None
+    return set(selection['ids'])
@@ -0,0 +1,190 @@
+import bisect
+import calendar
+import json
+import mmap
+import os
+import re
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from plan import _init_plan_worker, _plan_entry
+from rendering import PRERENDER_POOL_THRESHOLD
+
+# Tweets por shard enviado ao pool (o primeiro shard pronto já libera a postagem)
+SHARD_SIZE = 500
+# Shards em processamento ou prontos à frente do consumo, por worker
+SHARDS_AHEAD_PER_WORKER = 2
+
+# Início de cada elemento do array do tweets.js. Dentro de strings JSON as
+# aspas vêm escapadas, então o padrão só casa na estrutura do arquivo.
+_ELEMENT_START = re.compile(rb'\{\s*"tweet"\s*:')
+# `created_at` só aparece no nível do tweet (entities e mídia não têm data)
+_CREATED_AT = re.compile(rb'"created_at"\s*:\s*"([^"]*)"')
+
+_MONTHS = {month.encode(): number for number, month in enumerate(calendar.month_abbr) if month}
+
+_decoder = json.JSONDecoder()
+
+# Mapeamento do tweets.js aberto uma vez em cada processo do pool
+_worker_buffer = None
+
+def _created_key(raw):
+    """Segundos UTC de um `created_at` ("Wed Oct 10 20:19:24 +0000 2018") sem strptime"""
+    try:
+        _, month, day, clock, offset, year = raw.split()
+        hours, minutes, seconds = clock.split(b':')
+        sign = -1 if offset[:1] == b'-' else 1
+        offset_seconds = sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+        return calendar.timegm((int(year), _MONTHS[month], int(day),
+                                int(hours), int(minutes), int(seconds))) - offset_seconds
+    except (KeyError, ValueError):
+        return float('-inf')
+
+def _decode_element(buffer, start, end):
+    """Decodifica um elemento ({'tweet': {...}}) a partir do seu trecho de bytes"""
+    element, _ = _decoder.raw_decode(bytes(buffer[start:end]).decode('utf-8'))
+    return element
+
+def _map_file(path):
+    """Mapeia o arquivo só para leitura: as páginas vêm do cache do sistema,
+    compartilhadas entre processos, e só as lidas ocupam memória"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _init_shard_worker(path, resolved_links, media_dir):
+    global _worker_buffer
+    _init_plan_worker(resolved_links, media_dir)
+    _worker_buffer = _map_file(path)
+
+def _prepare_shard(spans):
+    """Decodifica, renderiza e resolve a mídia de um shard (lista de trechos)"""
+    return [_plan_entry(_decode_element(_worker_buffer, start, end)) for start, end in spans]
+
+def _bounded_map(pool, func, items, ahead):
+    """Como pool.map, mas com no máximo `ahead` tarefas à frente de quem consome"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+class ShardedArchive(Sequence):
+    """tweets.js indexado por posição, do tweet mais antigo ao mais novo
+
+    A leitura só localiza os elementos e suas datas com expressões regulares
+    sobre os bytes do arquivo; cada tweet é decodificado quando acessado.
+    `prepare` divide a lista ordenada em shards e os processa em um pool
+    de processos que mapeia o mesmo arquivo (mmap): para os workers vão só
+    pares de offsets, e de volta vêm só os posts renderizados. O arquivo não
+    é lido para a memória nem copiado; `close` desfaz o mapeamento.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.data = _map_file(path)
+        starts = [match.start() for match in _ELEMENT_START.finditer(self.data)]
+        ends = starts[1:] + [len(self.data)]
+        keys = [None] * len(starts)
+        for match in _CREATED_AT.finditer(self.data):
+            position = bisect.bisect_right(starts, match.start()) - 1
+            if position >= 0 and keys[position] is None:
+                keys[position] = _created_key(match.group(1))
+        keys = [float('-inf') if key is None else key for key in keys]
+        # Ordenação estável: tweets do mesmo segundo mantêm a ordem do arquivo
+        order = sorted(range(len(starts)), key=keys.__getitem__)
+        self.spans = [(starts[i], ends[i]) for i in order]
+        self._pool = None
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start, end = self.spans[index]
+        return _decode_element(self.data, start, end)
+
+    def prepare(self, resolved_links=None, media_dir=None, workers=None, shard_size=SHARD_SIZE,
+                start=0):
+        """Posts renderizados (entradas de plano) na ordem cronológica, sob demanda
+
+        Só as posições a partir de `start` (a posição salva da sessão) são
+        renderizadas; as anteriores não ficam disponíveis. Arquivos pequenos
+        (ou `workers=1`) são processados no próprio processo, também de forma
+        preguiçosa.
+        """
+        spans = self.spans[start:]
+        shards = [spans[i:i + shard_size] for i in range(0, len(spans), shard_size)]
+        if len(spans) < PRERENDER_POOL_THRESHOLD or workers == 1:
+            _init_plan_worker(resolved_links, media_dir)
+            results = ([_plan_entry(_decode_element(self.data, begin, end)) for begin, end in shard]
+                       for shard in shards)
+            return PreparedPosts(len(self), results, start=start)
+
+        workers = workers or os.cpu_count()
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                         initargs=(self.path, resolved_links, media_dir))
+        # Os shards saem na ordem em que foram enviados, que já é a cronológica;
+        # a postagem lenta segura o processamento (memória limitada)
+        results = _bounded_map(self._pool, _prepare_shard, shards, workers * SHARDS_AHEAD_PER_WORKER)
+        return PreparedPosts(len(self), results, on_done=self._close_pool, start=start)
+
+    def _close_pool(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def close(self):
+        """Encerra o pool e desfaz o mapeamento do arquivo"""
+        self._close_pool()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.data = b""
+
+class PreparedPosts(Sequence):
+    """Lista de posts renderizados preenchida à medida que os shards ficam prontos
+
+    O acesso a uma posição só espera pelo shard que a contém, então a postagem
+    começa assim que o primeiro shard termina. `release` descarta as entradas
+    já consumidas, para quem percorre a lista uma única vez. Os shards
+    começam na posição `start`.
+    """
+    def __init__(self, total, shard_results, on_done=None, start=0):
+        self.total = total
+        self.entries = []
+        self._offset = start
+        self._results = iter(shard_results)
+        self._on_done = on_done
+
+    def __len__(self):
+        return self.total
+
+    def release(self, index):
+        """Esquece as entradas anteriores a `index`"""
+        self._fill(index - 1)
+        if index > self._offset:
+            del self.entries[:index - self._offset]
+            self._offset = index
+
+    def _fill(self, index):
+        while self._offset + len(self.entries) <= index and self._results is not None:
+            try:
+                self.entries.extend(next(self._results))
+            except StopIteration:
+                self._results = None
+                if self._on_done:
+                    self._on_done()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self.total
+        if index < self._offset:
+            raise IndexError(f"entrada {index} já liberada")
+        self._fill(index)
+        return self.entries[index - self._offset]
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from media import VIDEO_READY, VideoProcessor
+
+class FakeRepo:
+    """Só o `com.atproto.repo.upload_blob` do cliente do atproto"""
+    def __init__(self):
+        self.uploads = []
+
+    def upload_blob(self, data, **kwargs):
+        self.uploads.append((b"".join(data), kwargs.get('headers')))
+        blob = {'$type': 'blob', 'ref': {'$link': 'bafkrei-video'},
+                'mimeType': 'video/mp4', 'size': len(self.uploads[-1][0])}
+        return SimpleNamespace(blob=blob)
+
+class FakeClient:
+    def __init__(self):
+        self.com = SimpleNamespace(atproto=SimpleNamespace(repo=FakeRepo()))
+
+class VideoProcessorTest(unittest.TestCase):
+    def test_upload_produces_video_embed(self):
+        with tempfile.TemporaryDirectory() as media_dir:
+            with open(os.path.join(media_dir, "123-clip.mp4"), 'wb') as f:
+                f.write(b"\0" * 1000)
+            tweet = {
+                'id_str': "123",
+                'extended_entities': {'media': [{
+                    'type': 'video',
+                    'ext_alt_text': "um vídeo",
+                    'video_info': {
+                        'aspect_ratio': ["16", "9"],
+                        'duration_millis': 5000,
+                        'variants': [{'content_type': 'video/mp4', 'bitrate': 832000,
+                                      'url': "https://video.twimg.com/clip.mp4"}]
+                    }
+                }]}
+            }
+            client = FakeClient()
+            videos = VideoProcessor(client, media_dir, work_dir=os.path.join(media_dir, "work"))
+            try:
+                videos.submit(tweet)
+                embed = videos.embed("123", timeout=10)
+            finally:
+                videos.close()
+
+        self.assertEqual(embed['$type'], 'app.bsky.embed.video')
+        self.assertEqual(embed['video']['ref'], {'$link': 'bafkrei-video'})
+        self.assertEqual(embed['aspectRatio'], {'width': 16, 'height': 9})
+        self.assertEqual(embed['alt'], "um vídeo")
+        data, headers = client.com.atproto.repo.uploads[0]
+        self.assertEqual(len(data), 1000)
+        self.assertEqual(headers, {'Content-Type': 'video/mp4', 'Content-Length': "1000"})
+
+    def test_progress_ends_ready(self):
+        with tempfile.TemporaryDirectory() as media_dir:
+            with open(os.path.join(media_dir, "7-a.mp4"), 'wb') as f:
+                f.write(b"\0" * 10)
+            tweet = {'id_str': "7", 'extended_entities': {'media': [{'type': 'animated_gif'}]}}
+            videos = VideoProcessor(FakeClient(), media_dir)
+            try:
+                videos.submit(tweet)
+                videos._jobs["7"].result(timeout=10)
+                self.assertEqual(videos.status()["7"]['stage'], VIDEO_READY)
+            finally:
+                videos.close()
+
+if __name__ == '__main__':
+    unittest.main()
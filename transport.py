@@ -0,0 +1,152 @@
+import functools
+import logging
+import threading
+
+from metrics import NULL_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Pool de conexões HTTP compartilhado por todas as chamadas da importação
+POOL_MAX_CONNECTIONS = 20
+POOL_MAX_KEEPALIVE = 10
+# O PDS fecha conexões ociosas depois de alguns minutos; pausas longas de
+# rate limit abrem uma conexão nova em vez de reutilizar uma já fechada
+KEEPALIVE_EXPIRY = 60.0
+
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 60.0
+# Uploads de vídeo grandes podem levar minutos para serem enviados
+WRITE_TIMEOUT = 300.0
+POOL_TIMEOUT = 30.0
+
+def http2_available():
+    """HTTP/2 só é usado se o pacote `h2` (httpx[http2]) estiver instalado"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class ConnectionStats:
+    """Contadores de requisições, conexões novas, reutilizadas e handshakes TLS
+
+    Alimentados pela extensão `trace` do httpcore em cada requisição. Os
+    eventos também vão para as métricas da execução em andamento (ver
+    `use_metrics`).
+    """
+    def __init__(self):
+        self.counters = {}
+        self.metrics = NULL_METRICS
+        self._lock = threading.Lock()
+
+    def use_metrics(self, metrics):
+        self.metrics = metrics
+
+    def inc(self, name):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+        self.metrics.inc(name)
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self.counters)
+        requests = counters.get('http_requests', 0)
+        reused = counters.get('http_connections_reused', 0)
+        return {**counters, 'http_reuse_ratio': round(reused / requests, 3) if requests else 0.0}
+
+    def _tracer(self):
+        """Callback de trace de uma requisição: conta os eventos de conexão dela"""
+        state = {'connected': False}
+
+        def trace(name, info):
+            if name == 'connection.connect_tcp.complete':
+                state['connected'] = True
+                self.inc('http_connections_opened')
+            elif name == 'connection.start_tls.complete':
+                self.inc('http_tls_handshakes')
+            elif name.endswith('.send_request_headers.started'):
+                self.inc('http_requests')
+                if name.startswith('http2.'):
+                    self.inc('http2_requests')
+                if not state['connected']:
+                    self.inc('http_connections_reused')
+                # Repetições na mesma requisição (redirect) contam de novo
+                state['connected'] = False
+        return trace
+
+    def on_request(self, request):
+        request.extensions['trace'] = self._tracer()
+
+    async def on_request_async(self, request):
+        trace = self._tracer()
+
+        async def atrace(name, info):
+            trace(name, info)
+        request.extensions['trace'] = atrace
+
+STATS = ConnectionStats()
+
+def client_options(asynchronous=False, max_connections=POOL_MAX_CONNECTIONS,
+                   max_keepalive=POOL_MAX_KEEPALIVE, stats=STATS):
+    """Argumentos de httpx.Client/AsyncClient com o pool e os timeouts do projeto"""
+    import httpx
+    hook = stats.on_request_async if asynchronous else stats.on_request
+    return {
+        'limits': httpx.Limits(max_connections=max_connections,
+                               max_keepalive_connections=min(max_keepalive, max_connections),
+                               keepalive_expiry=KEEPALIVE_EXPIRY),
+        'timeout': httpx.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT,
+                                 write=WRITE_TIMEOUT, pool=POOL_TIMEOUT),
+        'http2': http2_available(),
+        'event_hooks': {'request': [hook]}
+    }
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def shared_http_client():
+    """O httpx.Client único da aplicação (pool de conexões compartilhado)
+
+    Login, posts, uploads de blob (vídeos e miniaturas), consultas e cards
+    de link reaproveitam as mesmas conexões, inclusive entre importações
+    seguidas na interface gráfica.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            import httpx
+            options = client_options()
+            _shared_client = httpx.Client(follow_redirects=True, **options)
+            logger.info("Transporte HTTP compartilhado criado", extra={'http2': options['http2']})
+        return _shared_client
+
+def shared_request():
+    """`Request` novo do atproto sobre o pool compartilhado
+
+    Cada `Client` precisa do seu: o atproto registra no `Request` a fonte
+    dos cabeçalhos de autenticação do cliente, e um objeto comum misturaria
+    as sessões (o Authorization do último login valeria para todos). Só o
+    httpx.Client, com as conexões e os contadores de `STATS`, é comum.
+    """
+    return _shared_pool_request_class()(shared_http_client())
+
+@functools.lru_cache(maxsize=None)
+def _shared_pool_request_class():
+    # O atproto só é importado no primeiro login (ver `script.create_client`)
+    from atproto_client.request import Request
+
+    class SharedPoolRequest(Request):
+        def __init__(self, http_client):
+            # Sem Request.__init__, que abriria um httpx.Client próprio
+            super(Request, self).__init__()
+            self._client = http_client
+            self._client_kwargs = {}
+
+        def _new_instance(self):
+            return type(self)(self._client)
+
+        def close(self):
+            # O pool continua em uso pelos outros clientes
+            pass
+
+    return SharedPoolRequest